@@ -17,6 +17,8 @@ def free_mortgage(player, asset, current_gameboard):
     purchaseable an Exception will automatically be raised.
     :return: successful action code if the player has succeeded in freeing the mortgage on asset, otherwise failure code
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player, asset)
     logger.debug(player.player_name+' is attempting to free up mortgage on asset '+asset.name)
     if asset.owned_by != player:
         logger.debug(player.player_name+' is trying to free up mortgage on property that is not theirs. Returning failure code')
@@ -36,7 +38,7 @@ def free_mortgage(player, asset, current_gameboard):
         return flag_config_dict['successful_action']
 
 
-def make_sell_property_offer(from_player, asset, to_player, price):
+def make_sell_property_offer(from_player, asset, to_player, price, current_gameboard=None):
     """
     Action for one player to make an offer to another player to see an asset they possess at an offering price. Note that
     the property is only sold and exchanges hands if to_player invokes accept_sell_property_offer when it is their turn next
@@ -44,6 +46,8 @@ def make_sell_property_offer(from_player, asset, to_player, price):
     :param asset: purchaseable Location instance. The asset on which the offer is being made.
     :param to_player: Player instance. The player to whom the offer is being made.
     :param price: An integer. The price at which from_player is offering to sell asset to to_player
+    :param current_gameboard: A dict. The global data structure representing the current game board. Only needed to
+    save to_player onto the undo stack (see undo_stack.py) when the action is called directly instead of through a move.
     :return: successful action code if the player succeeds in making the offer (doesn't mean the other player has to accept), otherwise failure code
     """
 
@@ -59,6 +63,8 @@ def make_sell_property_offer(from_player, asset, to_player, price):
         return flag_config_dict['failure_code']
     else:
         logger.debug('Instantiating data structures outstanding_property_offer and setting is_property_offer_outstanding to True to enable property offer to '+to_player.player_name)
+        if current_gameboard is not None and current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(to_player)
         to_player.outstanding_property_offer['asset'] = asset
         to_player.outstanding_property_offer['from_player'] = from_player
         to_player.outstanding_property_offer['price'] = price
@@ -77,6 +83,8 @@ def sell_property(player, asset, current_gameboard):
     :param current_gameboard: A dict. The global data structure representing the current game board.
     :return: successful action code if the sale is successful, failure code otherwise.
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player, asset)
 
     if asset.owned_by != player:
         logger.debug(player.player_name+' does not own this property and cannot sell it. Returning failure code')
@@ -94,27 +102,20 @@ def sell_property(player, asset, current_gameboard):
             return flag_config_dict['failure_code']
         else:
             # add to game history
-            current_gameboard['history']['function'].append(asset.transfer_property_to_bank)
-            params = dict()
-            params['self'] = asset
-            params['player'] = player
-            params['current_gameboard'] = current_gameboard
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(cash_due)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(asset.transfer_property_to_bank,
+                                                    ('self', 'player', 'current_gameboard'),
+                                                    (asset, player, current_gameboard), cash_due,
+                                                    current_gameboard['time_step_indicator'])
 
             logger.debug('Transfer successful. Paying player what they are due for the property and returning successful action code...')
             code = player.receive_cash(cash_due, current_gameboard, bank_flag=True)
             # add to game history
             if code == flag_config_dict['successful_action']:
-                current_gameboard['history']['function'].append(player.receive_cash)
-                params = dict()
-                params['self'] = player
-                params['amount'] = cash_due
-                params['description'] = 'sell property'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                        (player, cash_due, 'sell property'), code,
+                                                        current_gameboard['time_step_indicator'])
                 return flag_config_dict['successful_action']     # property has been successfully sold
             else:
                 logger.debug("Not sure what happened! Something broke although bank had sufficient funds !")
@@ -132,6 +133,8 @@ def sell_house_hotel(player, asset, current_gameboard, sell_house=True, sell_hot
     :param sell_hotel: A boolean. True if player wants to sell a hotel on asset.
     :return: successful action code if sale goes through, otherwise failure code
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player, asset, current_gameboard['bank'])
 
     if asset.owned_by != player:
         logger.debug(player.player_name+' does not own this property and cannot make an offer. Returning failure code')
@@ -173,14 +176,10 @@ def sell_house_hotel(player, asset, current_gameboard, sell_house=True, sell_hot
 
                 current_gameboard['bank'].total_hotels += 1   #incrementing the bank's total_hotels number since a hotel has been returned.
                 # add to game history
-                current_gameboard['history']['function'].append(player.receive_cash)
-                params = dict()
-                params['self'] = player
-                params['amount'] = (asset.price_per_house*(current_gameboard['bank'].house_limit_before_hotel + 1))*current_gameboard['bank'].hotel_sell_percentage   # changed hardcoded value to a bank parameter
-                params['description'] = 'sell improvements'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                        (player, (asset.price_per_house*(current_gameboard['bank'].house_limit_before_hotel + 1))*current_gameboard['bank'].hotel_sell_percentage,   # changed hardcoded value to a bank parameter
+                                                         'sell improvements'), code, current_gameboard['time_step_indicator'])
 
                 logger.debug('Updating houses and hotels on the asset')
                 asset.num_houses = 0 # this should already be 0 but just in case
@@ -219,14 +218,10 @@ def sell_house_hotel(player, asset, current_gameboard, sell_house=True, sell_hot
 
                 current_gameboard['bank'].total_houses += 1   #incrementing the bank's total_houses number since a house has been returned.
                 # add to game history
-                current_gameboard['history']['function'].append(player.receive_cash)
-                params = dict()
-                params['self'] = player
-                params['amount'] = asset.price_per_house * current_gameboard['bank'].house_sell_percentage    # changed hardcoded value to a bank parameter
-                params['description'] = 'sell improvements'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                        (player, asset.price_per_house * current_gameboard['bank'].house_sell_percentage,    # changed hardcoded value to a bank parameter
+                                                         'sell improvements'), code, current_gameboard['time_step_indicator'])
 
                 logger.debug('Updating houses and hotels on the asset')
                 asset.num_houses -= 1
@@ -256,6 +251,8 @@ def accept_sell_property_offer(player, current_gameboard):
     :param current_gameboard: A dict. The global data structure representing the current game board.
     :return: successful action code if the property offer is accepted and property is successfully transferred, otherwise failure code.
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
     if not player.is_property_offer_outstanding:
         logger.debug(player.player_name+' does not have outstanding property offers to accept. Returning failure code')
         return flag_config_dict['failure_code']
@@ -273,39 +270,27 @@ def accept_sell_property_offer(player, current_gameboard):
         func(player.outstanding_property_offer['from_player'],
                            player, current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(func)
-        params = dict()
-        params['self'] = func_asset
-        params['from_player'] = player.outstanding_property_offer['from_player']
-        params['to_player'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(func, ('self', 'from_player', 'to_player', 'current_gameboard'),
+                                                (func_asset, player.outstanding_property_offer['from_player'], player, current_gameboard),
+                                                None, current_gameboard['time_step_indicator'])
 
         logger.debug('Initiating cash transfer from one player to another')
         player.charge_player(player.outstanding_property_offer['price'], current_gameboard, bank_flag=False)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = player.outstanding_property_offer['price']
-        params['description'] = 'accept sell property offer'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                (player, player.outstanding_property_offer['price'], 'accept sell property offer'),
+                                                None, current_gameboard['time_step_indicator'])
 
         code = player.outstanding_property_offer['from_player'].receive_cash(player.outstanding_property_offer['price'], current_gameboard, bank_flag=False)
         # add to game history
         if code == flag_config_dict['successful_action']:
-            current_gameboard['history']['function'].append(player.outstanding_property_offer['from_player'].receive_cash)
-            params = dict()
-            params['self'] = player.outstanding_property_offer['from_player']
-            params['amount'] = player.outstanding_property_offer['price']
-            params['description'] = 'sell property'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(code)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.outstanding_property_offer['from_player'].receive_cash,
+                                                    ('self', 'amount', 'description'),
+                                                    (player.outstanding_property_offer['from_player'], player.outstanding_property_offer['price'], 'sell property'),
+                                                    code, current_gameboard['time_step_indicator'])
         else:
             logger.debug("Not sure what happened! Something broke!")
             logger.error("Exception")
@@ -346,6 +331,8 @@ def mortgage_property(player, asset, current_gameboard):
     :param asset:  Purchaseable Location instance (railroad, utility or real estate).
     :return: successful action code if the mortgage has gone through, failure code otherwise.
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player, asset)
     if asset.owned_by != player:
         logger.debug(player.player_name+' is trying to mortgage property that is not theirs. Returning failure code')
         return flag_config_dict['failure_code']
@@ -363,14 +350,10 @@ def mortgage_property(player, asset, current_gameboard):
             code = player.receive_cash(asset.mortgage, current_gameboard, bank_flag=True)
             # add to game history
             if code == flag_config_dict['successful_action']:
-                current_gameboard['history']['function'].append(player.receive_cash)
-                params = dict()
-                params['self'] = player
-                params['amount'] = asset.mortgage
-                params['description'] = 'mortgage property'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                        (player, asset.mortgage, 'mortgage property'), code,
+                                                        current_gameboard['time_step_indicator'])
 
                 logger.debug("Property has been mortgaged and player has received cash. Returning successful action code")
                 return flag_config_dict['successful_action'] # property has been successfully mortgaged
@@ -397,6 +380,8 @@ def improve_property(player, asset, current_gameboard, add_house=True, add_hotel
     :param add_hotel: A Boolean. True if you want to add a hotel to asset.
     :return: successful action code if player has successfully managed to improve property or failure code otherwise.
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player, asset, current_gameboard['bank'])
     if asset.owned_by != player or asset.is_mortgaged:
         # these are the usual conditions that we verify before allowing any improvement to proceed
         logger.debug(player.player_name+' does not own this property, or it is mortgaged. Returning failure code')
@@ -445,14 +430,10 @@ def improve_property(player, asset, current_gameboard, add_house=True, add_hotel
                 current_gameboard['bank'].total_houses += asset.num_houses
                 logger.debug('Bank now has ' + str(current_gameboard['bank'].total_houses) + ' houses and ' + str(current_gameboard['bank'].total_hotels) + ' hotels left.')
                 # add to game history
-                current_gameboard['history']['function'].append(player.charge_player)
-                params = dict()
-                params['self'] = player
-                params['amount'] = asset.price_per_house
-                params['description'] = 'improvements'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                        (player, asset.price_per_house, 'improvements'), None,
+                                                        current_gameboard['time_step_indicator'])
 
                 logger.debug('Updating houses and hotels on the asset')
                 asset.num_houses = 0
@@ -493,14 +474,10 @@ def improve_property(player, asset, current_gameboard, add_house=True, add_hotel
                 current_gameboard['bank'].total_houses -= 1
                 logger.debug('Bank now has ' + str(current_gameboard['bank'].total_houses) + ' houses and ' + str(current_gameboard['bank'].total_hotels) + ' hotels left.')
                 # add to game history
-                current_gameboard['history']['function'].append(player.charge_player)
-                params = dict()
-                params['self'] = player
-                params['amount'] = asset.price_per_house
-                params['description'] = 'improvements'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                        (player, asset.price_per_house, 'improvements'), None,
+                                                        current_gameboard['time_step_indicator'])
 
                 logger.debug('Updating houses and hotels on the asset')
                 asset.num_houses += 1
@@ -529,6 +506,9 @@ def use_get_out_of_jail_card(player, current_gameboard):
     :param current_gameboard: A dict. The global data structure representing the current game board.
     :return: successful action code if the player has successfully used get out of jail card, or failure code otherwise.
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
+        current_gameboard['undo_stack'].save_items(current_gameboard, 'chance_cards', 'community_chest_cards')
     import copy
     if not player.currently_in_jail:
         logger.debug('Player is not currently in jail and cannot use the card. Returning failure code')
@@ -563,17 +543,15 @@ def pay_jail_fine(player, current_gameboard):
     :param player: Player instance.
     :return: successful action code if the fine payment succeeds, otherwise failure code
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
     if player.current_cash >= current_gameboard['bank'].jail_fine and player.currently_in_jail:
         player.charge_player(current_gameboard['bank'].jail_fine, current_gameboard, bank_flag=True)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = current_gameboard['bank'].jail_fine
-        params['description'] = 'jail fine'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                (player, current_gameboard['bank'].jail_fine, 'jail fine'), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug('Player has been charged the fine. Setting currently_in_status to False and returning successful action code')
         player.currently_in_jail = False
@@ -587,7 +565,8 @@ def roll_die(die_objects, choice, current_gameboard):
     """
     The function takes a vector of Dice objects and for each object, samples a value. It returns a list of sampled die values.
     :param die_objects: A vector of Dice objects.
-    :param choice: The numpy choice function.
+    :param choice: The numpy choice function. In gameplay this is the choice method of the game's own dice generator
+    (current_gameboard['choice_function']).
     :return: the numbers that get rolled on the dice as a list.
     """
     logger.debug('rolling die...')
@@ -615,16 +594,15 @@ def buy_property(player, asset, current_gameboard):
     :return: successful action code if player has succeeded in buying the property, failure code if either the player has failed OR if the property ended
     up going to auction (in the latter case, the player may still succeed in obtaining the asset!)
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
     if asset.owned_by != current_gameboard['bank']:
         logger.debug(asset.name+' is not owned by Bank! Resetting option_to_buy for player and returning code failure code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config_dict['failure_code']
 
@@ -634,60 +612,42 @@ def buy_property(player, asset, current_gameboard):
         starting_player_index = (index_current_player + 1) % len(current_gameboard['players'])  # the next player's index. this player will start the auction
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' is going up for auction since '+ player.player_name+ ' does not have enough cash to purchase this property. Conducting auction and returning failure code')
         Bank.auction(starting_player_index, current_gameboard, asset)
         # add to game history
-        current_gameboard['history']['function'].append(Bank.auction)
-        params = dict()
-        params['self'] = current_gameboard['bank']
-        params['starting_player_index'] = starting_player_index
-        params['current_gameboard'] = current_gameboard
-        params['asset'] = asset
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(Bank.auction,
+                                                ('self', 'starting_player_index', 'current_gameboard', 'asset'),
+                                                (current_gameboard['bank'], starting_player_index, current_gameboard, asset),
+                                                None, current_gameboard['time_step_indicator'])
 
         return flag_config_dict['failure_code'] # this is a failure code even though you may still succeed in buying the property at auction
     else:
         logger.debug('Charging '+player.player_name+ ' amount '+str(asset.price)+' for asset '+asset.name)
         player.charge_player(asset.price, current_gameboard, bank_flag=True)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = asset.price
-        params['description'] = 'buy property'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                (player, asset.price, 'buy property'), None,
+                                                current_gameboard['time_step_indicator'])
 
         asset.update_asset_owner(player, current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(asset.update_asset_owner)
-        params = dict()
-        params['self'] = asset
-        params['player'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(asset.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                (asset, player, current_gameboard), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' ownership has been updated! Resetting option_to_buy for player and returning code successful action code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config_dict['successful_action']
 
@@ -721,6 +681,8 @@ def make_trade_offer(from_player, offer, to_player, current_gameboard=None):
 
     else:
         logger.debug('Instantiating data structures outstanding_trade_offer and setting is_trade_offer_outstanding to True to enable trade offer to '+to_player.player_name)
+        if current_gameboard is not None and current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(to_player)
         offer_prop_set = set()
         if len(offer['property_set_offered'])==0:
             logger.debug(from_player.player_name + ' has no properties to offer to ' + to_player.player_name)
@@ -781,6 +743,8 @@ def accept_trade_offer(player, current_gameboard):
     - if the properties involved in the trade are improved.
     - if the properties involved in the trade are mortgaged.
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
     if player.outstanding_trade_offer['from_player'].status == 'lost':
         logger.debug("I have an outstanding trade offer that was made to me by a player that has lost the game! Cannot process trade offer. Returning failure code.")
         return flag_config_dict['failure_code']
@@ -829,51 +793,34 @@ def accept_trade_offer(player, current_gameboard):
                 func = func_asset.transfer_property_between_players
                 func(player.outstanding_trade_offer['from_player'], player, current_gameboard)
                 # add to game history
-                current_gameboard['history']['function'].append(func)
-                params = dict()
-                params['self'] = func_asset
-                params['from_player'] = player.outstanding_trade_offer['from_player']
-                params['to_player'] = player
-                params['current_gameboard'] = current_gameboard
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(func, ('self', 'from_player', 'to_player', 'current_gameboard'),
+                                                        (func_asset, player.outstanding_trade_offer['from_player'], player, current_gameboard),
+                                                        None, current_gameboard['time_step_indicator'])
 
             for item in player.outstanding_trade_offer['property_set_wanted']:
                 func_asset = item
                 func = func_asset.transfer_property_between_players
                 func(player, player.outstanding_trade_offer['from_player'], current_gameboard)
                 # add to game history
-                current_gameboard['history']['function'].append(func)
-                params = dict()
-                params['self'] = func_asset
-                params['from_player'] = player
-                params['to_player'] = player.outstanding_trade_offer['from_player']
-                params['current_gameboard'] = current_gameboard
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(func, ('self', 'from_player', 'to_player', 'current_gameboard'),
+                                                        (func_asset, player, player.outstanding_trade_offer['from_player'], current_gameboard),
+                                                        None, current_gameboard['time_step_indicator'])
 
             player.charge_player(player.outstanding_trade_offer['cash_wanted'], current_gameboard, bank_flag=False)
-            current_gameboard['history']['function'].append(player.charge_player)
-            params = dict()
-            params['self'] = player
-            params['amount'] = player.outstanding_trade_offer['cash_wanted']
-            params['description'] = 'trade'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                    (player, player.outstanding_trade_offer['cash_wanted'], 'trade'), None,
+                                                    current_gameboard['time_step_indicator'])
 
             code = player.outstanding_trade_offer['from_player'].receive_cash(player.outstanding_trade_offer['cash_wanted'], current_gameboard, bank_flag=False)
             if code == flag_config_dict['successful_action']:
-                current_gameboard['history']['function'].append(player.outstanding_trade_offer['from_player'].receive_cash)
-                params = dict()
-                params['self'] = player.outstanding_trade_offer['from_player']
-                params['amount'] = player.outstanding_trade_offer['cash_wanted']
-                params['description'] = 'trade'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.outstanding_trade_offer['from_player'].receive_cash,
+                                                        ('self', 'amount', 'description'),
+                                                        (player.outstanding_trade_offer['from_player'], player.outstanding_trade_offer['cash_wanted'], 'trade'),
+                                                        code, current_gameboard['time_step_indicator'])
             else:
                 logger.debug("Not sure what happened! Something broke!")
                 logger.error("Exception")
@@ -881,28 +828,21 @@ def accept_trade_offer(player, current_gameboard):
 
             code = player.receive_cash(player.outstanding_trade_offer['cash_offered'], current_gameboard, bank_flag=False)
             if code == flag_config_dict['successful_action']:
-                current_gameboard['history']['function'].append(player.receive_cash)
-                params = dict()
-                params['self'] = player
-                params['amount'] = player.outstanding_trade_offer['cash_offered']
-                params['description'] = 'trade'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                        (player, player.outstanding_trade_offer['cash_offered'], 'trade'),
+                                                        code, current_gameboard['time_step_indicator'])
             else:
                 logger.debug("Not sure what happened! Something broke!")
                 logger.error("Exception")
                 raise Exception
 
             player.outstanding_trade_offer['from_player'].charge_player(player.outstanding_trade_offer['cash_offered'], current_gameboard, bank_flag=False)
-            current_gameboard['history']['function'].append(player.outstanding_trade_offer['from_player'].charge_player)
-            params = dict()
-            params['self'] = player.outstanding_trade_offer['from_player']
-            params['amount'] = player.outstanding_trade_offer['cash_offered']
-            params['description'] = 'trade'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.outstanding_trade_offer['from_player'].charge_player,
+                                                    ('self', 'amount', 'description'),
+                                                    (player.outstanding_trade_offer['from_player'], player.outstanding_trade_offer['cash_offered'], 'trade'),
+                                                    None, current_gameboard['time_step_indicator'])
 
             logger.debug('Transaction successful. Nulling outstanding trade offers data structures and returning successful action code')
             player.is_trade_offer_outstanding = False
@@ -983,6 +923,8 @@ def post_roll_arbitrary_action(from_player=None, to_player=None, action_params_d
 
     """
     if 'mortgage_buy_property' in current_gameboard:
+        if current_gameboard['undo_stack'] is not None and isinstance(action_params_dict['location'], Location):
+            current_gameboard['undo_stack'].save(from_player, action_params_dict['location'], current_gameboard['bank'])
         if 'mortgage_buy_property_installments' not in from_player.agent._agent_memory:
             from_player.agent._agent_memory['mortgage_buy_property_installments'] = dict()
         if isinstance(action_params_dict['location'], Location):
@@ -994,12 +936,9 @@ def post_roll_arbitrary_action(from_player=None, to_player=None, action_params_d
                         from_player.player_name + ' is not physically on ' + asset.name + ' position, Resetting option_to_buy for player and returning code failure code')
                     from_player.reset_option_to_buy()
                     # add to game history
-                    current_gameboard['history']['function'].append(from_player.reset_option_to_buy)
-                    params = dict()
-                    params['self'] = from_player
-                    current_gameboard['history']['param'].append(params)
-                    current_gameboard['history']['return'].append(None)
-                    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                    if current_gameboard['history'].full:
+                        current_gameboard['history'].record(from_player.reset_option_to_buy, ('self',), (from_player,),
+                                                            None, current_gameboard['time_step_indicator'])
                     return flag_config_dict['failure_code']
                 # check property belongs to bank
                 if asset.owned_by != current_gameboard['bank']:
@@ -1007,12 +946,9 @@ def post_roll_arbitrary_action(from_player=None, to_player=None, action_params_d
                         asset.name + ' is not owned by Bank! Resetting option_to_buy for player and returning code failure code')
                     from_player.reset_option_to_buy()
                     # add to game history
-                    current_gameboard['history']['function'].append(from_player.reset_option_to_buy)
-                    params = dict()
-                    params['self'] = from_player
-                    current_gameboard['history']['param'].append(params)
-                    current_gameboard['history']['return'].append(None)
-                    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                    if current_gameboard['history'].full:
+                        current_gameboard['history'].record(from_player.reset_option_to_buy, ('self',), (from_player,),
+                                                            None, current_gameboard['time_step_indicator'])
 
                     return flag_config_dict['failure_code']
 
@@ -1044,33 +980,22 @@ def post_roll_arbitrary_action(from_player=None, to_player=None, action_params_d
                         current_gameboard['mortgage_buy_property'][
                             'down_payment']) + ', the full price of the asset is: ' + str(
                         asset.price))
-                current_gameboard['history']['function'].append(from_player.charge_player)
-                params = dict()
-                params['self'] = from_player
-                params['amount'] = current_gameboard['mortgage_buy_property']['down_payment']
-                params['description'] = 'mortgage to purchase property down-payment'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(from_player.charge_player, ('self', 'amount', 'description'),
+                                                        (from_player, current_gameboard['mortgage_buy_property']['down_payment'], 'mortgage to purchase property down-payment'),
+                                                        None, current_gameboard['time_step_indicator'])
                 # update asset owner and add log to game history
                 asset.update_asset_owner(from_player, current_gameboard)
-                current_gameboard['history']['function'].append(asset.update_asset_owner)
-                params = dict()
-                params['self'] = asset
-                params['player'] = from_player
-                params['current_gameboard'] = current_gameboard
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(asset.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                        (asset, from_player, current_gameboard), None,
+                                                        current_gameboard['time_step_indicator'])
                 logger.debug(
                     asset.name + ' ownership has been updated! Resetting option_to_buy for player and returning code successful action code')
                 from_player.reset_option_to_buy()
-                current_gameboard['history']['function'].append(from_player.reset_option_to_buy)
-                params = dict()
-                params['self'] = from_player
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(from_player.reset_option_to_buy, ('self',), (from_player,), None,
+                                                        current_gameboard['time_step_indicator'])
                 # set asset to mortgage status
                 if asset.owned_by != from_player:
                     logger.debug(
@@ -1237,8 +1162,6 @@ def accept_arbitrary_interaction(from_player, to_player, interaction_id, decisio
     if from_player == to_player:
         logger.debug(f'{to_player} cannot accept/reject offer from itself')
         return flag_config_dict['failure_code']
-    current_gameboard['history']['function'].append(to_player.make_out_of_turn_moves)
-    params = dict()
     detail_params = dict()
     detail_params['interaction_id'] = interaction_id
     detail_params['from_player'] = from_player.player_name
@@ -1246,14 +1169,13 @@ def accept_arbitrary_interaction(from_player, to_player, interaction_id, decisio
     detail_params['location'] = from_player.agent._agent_memory['free_rent'][interaction_id]['location'].name
     detail_params['to_location'] = from_player.agent._agent_memory['free_rent'][interaction_id]['to_location'].name
     detail_params['decision'] = decision
-    params['interactions'] = detail_params
     if decision:
-        params['description'] = 'accept free rent interaction offer'
+        description = 'accept free rent interaction offer'
     else:
-        params['description'] = 'reject free rent interaction offer'
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        description = 'reject free rent interaction offer'
+    if current_gameboard['history'].decisions:
+        current_gameboard['history'].record(to_player.make_out_of_turn_moves, ('interactions', 'description'),
+                                            (detail_params, description), None, current_gameboard['time_step_indicator'])
 
     if decision:  # if accept the offer
 
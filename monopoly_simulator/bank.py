@@ -85,15 +85,11 @@ class Bank(object):
             proposed_bid = bidding_player.agent.make_bid(bidding_player, current_gameboard,
                                 asset, current_bid)
             # add to game history
-            current_gameboard['history']['function'].append(bidding_player.agent.make_bid)
-            params = dict()
-            params['player'] = bidding_player
-            params['current_gameboard'] = current_gameboard
-            params['asset'] = asset
-            params['current_bid'] = current_bid
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(proposed_bid)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(bidding_player.agent.make_bid,
+                                                    ('player', 'current_gameboard', 'asset', 'current_bid'),
+                                                    (bidding_player, current_gameboard, asset, current_bid), proposed_bid,
+                                                    current_gameboard['time_step_indicator'])
 
             logger.debug(bidding_player.player_name+' proposed bid '+str(proposed_bid))
 
@@ -117,25 +113,17 @@ class Bank(object):
         if winning_player:
             winning_player.charge_player(current_bid, current_gameboard, bank_flag=True) # if it got here then current_bid is non-zero.
             # add to game history
-            current_gameboard['history']['function'].append(winning_player.charge_player)
-            params = dict()
-            params['self'] = winning_player
-            params['amount'] = current_bid
-            params['description'] = 'auction'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(winning_player.charge_player, ('self', 'amount', 'description'),
+                                                    (winning_player, current_bid, 'auction'), None,
+                                                    current_gameboard['time_step_indicator'])
 
             asset.update_asset_owner(winning_player, current_gameboard)
             # add to game history
-            current_gameboard['history']['function'].append(asset.update_asset_owner)
-            params = dict()
-            params['self'] = asset
-            params['player'] = winning_player
-            params['current_gameboard'] = current_gameboard
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(asset.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                    (asset, winning_player, current_gameboard), None,
+                                                    current_gameboard['time_step_indicator'])
         else:
             logger.debug('Auction did not succeed in a sale.')
         return
@@ -1,4 +1,3 @@
-import numpy as np
 from monopoly_simulator.location import RailroadLocation
 from monopoly_simulator.flag_config import flag_config_dict
 from monopoly_simulator import diagnostics
@@ -20,6 +19,8 @@ def _set_send_to_jail(player, current_gameboard):
     :param current_gameboard: The global game board data structure
     :return: None
     """
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
     player.currently_in_jail = True
 
 
@@ -33,13 +34,9 @@ def go_to_jail(player, current_gameboard):
     logger.debug('execute go_to_jail action for '+player.player_name)
     player.send_to_jail(current_gameboard)
     # add to game history
-    current_gameboard['history']['function'].append(player.send_to_jail)
-    params = dict()
-    params['self'] = player
-    params['current_gameboard'] = current_gameboard
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.send_to_jail, ('self', 'current_gameboard'), (player, current_gameboard),
+                                            None, current_gameboard['time_step_indicator'])
 
 
 def _set_to_sorted_list_func(set_cards):
@@ -67,38 +64,28 @@ def pick_card_from_community_chest(player, current_gameboard):
     :return: None
     """
     logger.debug(player.player_name+' is picking card from community chest.')
-    card_rand = np.random.RandomState(current_gameboard['card_seed'])
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save_items(current_gameboard, 'community_chest_cards', 'picked_community_chest_cards')
     set_cc_cards_copy = current_gameboard['community_chest_cards'].copy()
     list_community_chest_cards = _set_to_sorted_list_func(set_cc_cards_copy)
-    card = card_rand.choice(list_community_chest_cards)
+    card = list_community_chest_cards[current_gameboard['card_generator'].integers(len(list_community_chest_cards))]
     current_gameboard['picked_community_chest_cards'].append(current_gameboard['community_chest_card_objects'][card.name])
-    # card = card_rand.choice(list(current_gameboard['community_chest_cards']))
-    current_gameboard['card_seed'] += 1
     logger.debug(player.player_name+' picked card '+card.name)
     if card.name == 'get_out_of_jail_free':
         logger.debug('removing get_out_of_jail card from community chest pack')
         current_gameboard['community_chest_cards'].remove(card)
         card.action(player, card, current_gameboard, pack='community_chest')
-        current_gameboard['history']['function'].append(card.action)
-        params = dict()
-        params['player'] = player
-        params['card'] = card
-        params['current_gameboard'] = current_gameboard
-        params['pack'] = 'community_chest'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(card.action, ('player', 'card', 'current_gameboard', 'pack'),
+                                                (player, card, current_gameboard, 'community_chest'), None,
+                                                current_gameboard['time_step_indicator'])
     else:
         card.action(player, card, current_gameboard) # all card actions except get out of jail free must take this signature
         # add to game history
-        current_gameboard['history']['function'].append(card.action)
-        params = dict()
-        params['player'] = player
-        params['card'] = card
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(card.action, ('player', 'card', 'current_gameboard'),
+                                                (player, card, current_gameboard), None,
+                                                current_gameboard['time_step_indicator'])
 
 
 def pick_card_from_chance(player, current_gameboard):
@@ -110,38 +97,28 @@ def pick_card_from_chance(player, current_gameboard):
     :return: None
     """
     logger.debug(player.player_name+ ' is picking card from chance.')
-    card_rand = np.random.RandomState(current_gameboard['card_seed'])
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save_items(current_gameboard, 'chance_cards', 'picked_chance_cards')
     set_chance_cards_copy = current_gameboard['chance_cards'].copy()
     list_chance_cards = _set_to_sorted_list_func(set_chance_cards_copy)
-    card = card_rand.choice(list_chance_cards)
+    card = list_chance_cards[current_gameboard['card_generator'].integers(len(list_chance_cards))]
     current_gameboard['picked_chance_cards'].append(current_gameboard['chance_card_objects'][card.name])
-    # card = card_rand.choice(list(current_gameboard['chance_cards']))
-    current_gameboard['card_seed'] += 1
     logger.debug(player.player_name+ ' picked card '+ card.name)
     if card.name == 'get_out_of_jail_free':
         logger.debug('removing get_out_of_jail card from chance pack')
         current_gameboard['chance_cards'].remove(card)
         card.action(player, card, current_gameboard, pack='chance')
-        current_gameboard['history']['function'].append(card.action)
-        params = dict()
-        params['player'] = player
-        params['card'] = card
-        params['current_gameboard'] = current_gameboard
-        params['pack'] = 'chance'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(card.action, ('player', 'card', 'current_gameboard', 'pack'),
+                                                (player, card, current_gameboard, 'chance'), None,
+                                                current_gameboard['time_step_indicator'])
     else:
         card.action(player, card, current_gameboard) # all card actions except get out of jail free must take this signature
         # add to game history
-        current_gameboard['history']['function'].append(card.action)
-        params = dict()
-        params['player'] = player
-        params['card'] = card
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(card.action, ('player', 'card', 'current_gameboard'),
+                                                (player, card, current_gameboard), None,
+                                                current_gameboard['time_step_indicator'])
 
 
 def move_player(player, card, current_gameboard):
@@ -159,13 +136,9 @@ def move_player(player, card, current_gameboard):
     if new_position == jail_position:
         player.send_to_jail(current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(player.send_to_jail)
-        params = dict()
-        params['self'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.send_to_jail, ('self', 'current_gameboard'),
+                                                (player, current_gameboard), None, current_gameboard['time_step_indicator'])
     else:
         _move_player__check_for_go(player, new_position, current_gameboard)
 
@@ -179,6 +152,8 @@ def set_get_out_of_jail_card_status(player, card, current_gameboard, pack):
     :return: None
     """
     logger.debug('executing set_get_out_of_jail_card_status for '+player.player_name)
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
     if pack == 'community_chest' and card.name == 'get_out_of_jail_free': # remember, this is an object equality test
         player.has_get_out_of_jail_community_chest_card = True
         logger.debug(player.player_name+' now has get_out_of_jail community_chest card')
@@ -203,26 +178,18 @@ def bank_cash_transaction(player, card, current_gameboard):
     if card.amount < 0:
         player.charge_player(-1*card.amount, current_gameboard, bank_flag=True)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = -1*card.amount
-        params['description'] = 'bank cash transaction'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                (player, -1*card.amount, 'bank cash transaction'), None,
+                                                current_gameboard['time_step_indicator'])
     elif card.amount > 0:
         code = player.receive_cash(card.amount, current_gameboard, bank_flag=True)
         # add to game history
         if code == flag_config_dict['successful_action']:
-            current_gameboard['history']['function'].append(player.receive_cash)
-            params = dict()
-            params['self'] = player
-            params['amount'] = card.amount
-            params['description'] = 'bank cash transaction'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(code)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                    (player, card.amount, 'bank cash transaction'), code,
+                                                    current_gameboard['time_step_indicator'])
         elif code == flag_config_dict['failure_code']:
             logger.debug('Transaction broke due to insufficient funds. Player does not receive the stated funds.')
     else:
@@ -248,14 +215,10 @@ def player_cash_transaction(player, card, current_gameboard):
             code = p.receive_cash(-1*card.amount_per_player, current_gameboard, bank_flag=False)
             # add to game history
             if code == flag_config_dict['successful_action']:
-                current_gameboard['history']['function'].append(p.receive_cash)
-                params = dict()
-                params['self'] = p
-                params['amount'] = -1*card.amount_per_player
-                params['description'] = 'player cash transaction'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(p.receive_cash, ('self', 'amount', 'description'),
+                                                        (p, -1*card.amount_per_player, 'player cash transaction'), code,
+                                                        current_gameboard['time_step_indicator'])
             else:
                 logger.debug("Not sure what happened! Something broke!")
                 logger.error("Exception")
@@ -263,14 +226,10 @@ def player_cash_transaction(player, card, current_gameboard):
 
             player.charge_player(-1*card.amount_per_player, current_gameboard, bank_flag=False)
             # add to game history
-            current_gameboard['history']['function'].append(player.charge_player)
-            params = dict()
-            params['self'] = player
-            params['amount'] = -1*card.amount_per_player
-            params['description'] = 'player cash transaction'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                    (player, -1*card.amount_per_player, 'player cash transaction'), None,
+                                                    current_gameboard['time_step_indicator'])
 
     elif card.amount_per_player > 0:
         for p in current_gameboard['players']:
@@ -280,14 +239,10 @@ def player_cash_transaction(player, card, current_gameboard):
             code = player.receive_cash(card.amount_per_player, current_gameboard, bank_flag=False)
             # add to game history
             if code == flag_config_dict['successful_action']:
-                current_gameboard['history']['function'].append(player.receive_cash)
-                params = dict()
-                params['self'] = player
-                params['amount'] = card.amount_per_player
-                params['description'] = 'player cash transaction'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                        (player, card.amount_per_player, 'player cash transaction'), code,
+                                                        current_gameboard['time_step_indicator'])
             else:
                 logger.debug("Not sure what happened! Something broke!")
                 logger.error("Exception")
@@ -295,14 +250,10 @@ def player_cash_transaction(player, card, current_gameboard):
 
             p.charge_player(card.amount_per_player, current_gameboard, bank_flag=False)
             # add to game history
-            current_gameboard['history']['function'].append(p.charge_player)
-            params = dict()
-            params['self'] = p
-            params['amount'] = card.amount_per_player
-            params['description'] = 'player cash transaction'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(p.charge_player, ('self', 'amount', 'description'),
+                                                    (p, card.amount_per_player, 'player cash transaction'), None,
+                                                    current_gameboard['time_step_indicator'])
 
 
 def contingent_bank_cash_transaction(player, card, current_gameboard):
@@ -317,14 +268,10 @@ def contingent_bank_cash_transaction(player, card, current_gameboard):
     logger.debug('executing contingent_bank_cash_transaction for '+ player.player_name)
     card.contingency(player, card, current_gameboard)
     # add to game history
-    current_gameboard['history']['function'].append(card.contingency)
-    params = dict()
-    params['player'] = player
-    params['card'] = card
-    params['current_gameboard'] = current_gameboard
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(card.contingency, ('player', 'card', 'current_gameboard'),
+                                            (player, card, current_gameboard), None,
+                                            current_gameboard['time_step_indicator'])
 
 
 def calculate_street_repair_cost(player, card, current_gameboard): # assesses, not just calculates
@@ -341,14 +288,9 @@ def calculate_street_repair_cost(player, card, current_gameboard): # assesses, n
     cost = player.num_total_houses*cost_per_house+player.num_total_hotels*cost_per_hotel
     player.charge_player(cost, current_gameboard, bank_flag=True)
     # add to game history
-    current_gameboard['history']['function'].append(player.charge_player)
-    params = dict()
-    params['self'] = player
-    params['amount'] = cost
-    params['description'] = 'street repair'
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                            (player, cost, 'street repair'), None, current_gameboard['time_step_indicator'])
 
 
 def move_player__check_for_go(player, card, current_gameboard):
@@ -400,14 +342,10 @@ def move_to_nearest_utility__pay_or_buy__check_for_go(player, card, current_game
         code = player.receive_cash(go_increment, current_gameboard, bank_flag=True)
         # add to game history
         if code == flag_config_dict['successful_action']:
-            current_gameboard['history']['function'].append(player.receive_cash)
-            params = dict()
-            params['self'] = player
-            params['amount'] = go_increment
-            params['description'] = 'go increment'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(code)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                    (player, go_increment, 'go increment'), code,
+                                                    current_gameboard['time_step_indicator'])
         else:
             logger.debug('Current cash balance with the bank = '+ str(current_gameboard['bank'].total_cash_with_bank))
             logger.debug("Player supposed to receive go increment, but bank has no sufficient funds, hence unable to pay player." +
@@ -415,14 +353,10 @@ def move_to_nearest_utility__pay_or_buy__check_for_go(player, card, current_game
 
     player.update_player_position(min_utility_position, current_gameboard) # update this only after checking for go
     # add to game history
-    current_gameboard['history']['function'].append(player.update_player_position)
-    params = dict()
-    params['self'] = player
-    params['new_position'] = min_utility_position
-    params['current_gameboard'] = current_gameboard
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.update_player_position, ('self', 'new_position', 'current_gameboard'),
+                                            (player, min_utility_position, current_gameboard), None,
+                                            current_gameboard['time_step_indicator'])
 
     current_loc = current_gameboard['location_sequence'][player.current_position]
 
@@ -435,41 +369,29 @@ def move_to_nearest_utility__pay_or_buy__check_for_go(player, card, current_game
         logger.debug('utility is owned by bank. Player will have option to purchase.')
         player.process_move_consequences(current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(player.process_move_consequences)
-        params = dict()
-        params['self'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.process_move_consequences, ('self', 'current_gameboard'),
+                                                (player, current_gameboard), None, current_gameboard['time_step_indicator'])
         return
     else:
         amount_due = current_gameboard['current_die_total']*10
         player.charge_player(amount_due, current_gameboard, bank_flag=False)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = amount_due
-        params['number of utilities'] = current_loc.owned_by.num_utilities_possessed
-        params['description'] = 'utility dues'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player,
+                                                ('self', 'amount', 'number of utilities', 'description'),
+                                                (player, amount_due, current_loc.owned_by.num_utilities_possessed, 'utility dues'),
+                                                None, current_gameboard['time_step_indicator'])
 
         current_owner = current_loc.owned_by
         code = current_owner.receive_cash(amount_due, current_gameboard, bank_flag=False)
         if code == flag_config_dict['successful_action']:
             # add to game history
-            current_gameboard['history']['function'].append(current_owner.receive_cash)
-            params = dict()
-            params['self'] = current_owner
-            params['amount'] = amount_due
-            params['number of utilities'] = current_loc.owned_by.num_utilities_possessed
-            params['description'] = 'utility dues'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(code)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(current_owner.receive_cash,
+                                                    ('self', 'amount', 'number of utilities', 'description'),
+                                                    (current_owner, amount_due, current_loc.owned_by.num_utilities_possessed, 'utility dues'),
+                                                    code, current_gameboard['time_step_indicator'])
         else:
             logger.debug("Not sure what happened! Something broke!")
             logger.error("Exception")
@@ -512,14 +434,10 @@ def move_to_nearest_railroad__pay_double_or_buy__check_for_go(player, card, curr
         code = player.receive_cash(go_increment, current_gameboard, bank_flag=True)
         # add to game history
         if code == flag_config_dict['successful_action']:
-            current_gameboard['history']['function'].append(player.receive_cash)
-            params = dict()
-            params['self'] = player
-            params['amount'] = go_increment
-            params['description'] = 'go increment'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(code)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                    (player, go_increment, 'go increment'), code,
+                                                    current_gameboard['time_step_indicator'])
         else:
             logger.debug('Current cash balance with the bank = '+ str(current_gameboard['bank'].total_cash_with_bank))
             logger.debug("Player supposed to receive go increment, but bank has no sufficient funds, hence unable to pay player." +
@@ -527,14 +445,10 @@ def move_to_nearest_railroad__pay_double_or_buy__check_for_go(player, card, curr
 
     player.update_player_position(min_railroad_position, current_gameboard) # update this only after checking for go
     # add to game history
-    current_gameboard['history']['function'].append(player.update_player_position)
-    params = dict()
-    params['self'] = player
-    params['new_position'] = min_railroad_position
-    params['current_gameboard'] = current_gameboard
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.update_player_position, ('self', 'new_position', 'current_gameboard'),
+                                            (player, min_railroad_position, current_gameboard), None,
+                                            current_gameboard['time_step_indicator'])
 
     current_loc = current_gameboard['location_sequence'][player.current_position]
 
@@ -547,41 +461,29 @@ def move_to_nearest_railroad__pay_double_or_buy__check_for_go(player, card, curr
         logger.debug('railroad is owned by bank. Player will have option to purchase.')
         player.process_move_consequences(current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(player.process_move_consequences)
-        params = dict()
-        params['self'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.process_move_consequences, ('self', 'current_gameboard'),
+                                                (player, current_gameboard), None, current_gameboard['time_step_indicator'])
         return
     else:
         amount_due = 2 * RailroadLocation.calculate_railroad_dues(current_loc, current_gameboard)
         player.charge_player(amount_due, current_gameboard, bank_flag=False)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = amount_due
-        params['number of railroads'] = current_loc.owned_by.num_railroads_possessed
-        params['description'] = 'railroad dues'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player,
+                                                ('self', 'amount', 'number of railroads', 'description'),
+                                                (player, amount_due, current_loc.owned_by.num_railroads_possessed, 'railroad dues'),
+                                                None, current_gameboard['time_step_indicator'])
 
         current_owner = current_loc.owned_by
         code = current_owner.receive_cash(amount_due, current_gameboard, bank_flag=False)
         if code == flag_config_dict['successful_action']:
             # add to game history
-            current_gameboard['history']['function'].append(current_owner.receive_cash)
-            params = dict()
-            params['self'] = current_owner
-            params['amount'] = amount_due
-            params['number of railroads'] = current_loc.owned_by.num_railroads_possessed
-            params['description'] = 'railroad dues'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(code)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(current_owner.receive_cash,
+                                                    ('self', 'amount', 'number of railroads', 'description'),
+                                                    (current_owner, amount_due, current_loc.owned_by.num_railroads_possessed, 'railroad dues'),
+                                                    code, current_gameboard['time_step_indicator'])
         else:
             logger.debug("Not sure what happened! Something broke!")
             logger.error("Exception")
@@ -602,14 +504,10 @@ def calculate_general_repair_cost(player, card, current_gameboard):
     cost = player.num_total_houses * cost_per_house + player.num_total_hotels * cost_per_hotel
     player.charge_player(cost, current_gameboard, bank_flag=True)
     # add to game history
-    current_gameboard['history']['function'].append(player.charge_player)
-    params = dict()
-    params['self'] = player
-    params['amount'] = cost
-    params['description'] = 'general repair'
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                            (player, cost, 'general repair'), None,
+                                            current_gameboard['time_step_indicator'])
 
 
 def move_player_relative(player, card, current_gameboard):
@@ -623,15 +521,11 @@ def move_player_relative(player, card, current_gameboard):
     logger.debug('executing move_player_relative action for '+player.player_name)
     move_player_after_die_roll(player, card.new_relative_position, current_gameboard, True)
     # add to game history
-    current_gameboard['history']['function'].append(move_player_after_die_roll)
-    params = dict()
-    params['player'] = player
-    params['rel_move'] = card.new_relative_position
-    params['current_gameboard'] = current_gameboard
-    params['check_for_go'] = True
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(move_player_after_die_roll,
+                                            ('player', 'rel_move', 'current_gameboard', 'check_for_go'),
+                                            (player, card.new_relative_position, current_gameboard, True), None,
+                                            current_gameboard['time_step_indicator'])
 
 
 def move_player_after_die_roll(player, rel_move, current_gameboard, check_for_go=True):
@@ -666,14 +560,10 @@ def move_player_after_die_roll(player, rel_move, current_gameboard, check_for_go
             code = player.receive_cash(go_increment, current_gameboard, bank_flag=True)
             # add to game history
             if code == flag_config_dict['successful_action']:
-                current_gameboard['history']['function'].append(player.receive_cash)
-                params = dict()
-                params['self'] = player
-                params['amount'] = go_increment
-                params['description'] = 'go increment'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(code)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                        (player, go_increment, 'go increment'), code,
+                                                        current_gameboard['time_step_indicator'])
             else:
                 logger.debug('Current cash balance with the bank = '+ str(current_gameboard['bank'].total_cash_with_bank))
                 logger.debug("Player supposed to receive go increment, but bank has no sufficient funds, hence unable to pay player." +
@@ -681,14 +571,10 @@ def move_player_after_die_roll(player, rel_move, current_gameboard, check_for_go
 
     player.update_player_position(new_position, current_gameboard)  # update this only after checking for go
     # add to game history
-    current_gameboard['history']['function'].append(player.update_player_position)
-    params = dict()
-    params['self'] = player
-    params['new_position'] = new_position
-    params['current_gameboard'] = current_gameboard
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.update_player_position, ('self', 'new_position', 'current_gameboard'),
+                                            (player, new_position, current_gameboard), None,
+                                            current_gameboard['time_step_indicator'])
 
 
 """
@@ -754,14 +640,10 @@ def _move_player__check_for_go(player, new_position, current_gameboard):
         code = player.receive_cash(go_increment, current_gameboard, bank_flag=True)
         # add to game history
         if code == flag_config_dict['successful_action']:
-            current_gameboard['history']['function'].append(player.receive_cash)
-            params = dict()
-            params['self'] = player
-            params['amount'] = go_increment
-            params['description'] = 'go increment'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(code)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.receive_cash, ('self', 'amount', 'description'),
+                                                    (player, go_increment, 'go increment'), code,
+                                                    current_gameboard['time_step_indicator'])
         else:
             logger.debug('Current cash balance with the bank = '+ str(current_gameboard['bank'].total_cash_with_bank))
             logger.debug("Player supposed to receive go increment, but bank has no sufficient funds, hence unable to pay player." +
@@ -769,24 +651,16 @@ def _move_player__check_for_go(player, new_position, current_gameboard):
 
     player.update_player_position(new_position, current_gameboard) # update this only after checking for go
     # add to game history
-    current_gameboard['history']['function'].append(player.update_player_position)
-    params = dict()
-    params['self'] = player
-    params['new_position'] = new_position
-    params['current_gameboard'] = current_gameboard
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.update_player_position, ('self', 'new_position', 'current_gameboard'),
+                                            (player, new_position, current_gameboard), None,
+                                            current_gameboard['time_step_indicator'])
 
     player.process_move_consequences(current_gameboard)
     # add to game history
-    current_gameboard['history']['function'].append(player.process_move_consequences)
-    params = dict()
-    params['self'] = player
-    params['current_gameboard'] = current_gameboard
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.process_move_consequences, ('self', 'current_gameboard'),
+                                            (player, current_gameboard), None, current_gameboard['time_step_indicator'])
 
 
 def check_for_game_termination(current_gameboard, tot_time):
@@ -845,6 +719,8 @@ def check_for_winner(current_gameboard):
 
 
 def set_currently_in_jail_to_false(player, current_gameboard):
+    if current_gameboard['undo_stack'] is not None:
+        current_gameboard['undo_stack'].save(player)
     player.currently_in_jail = False
 
 
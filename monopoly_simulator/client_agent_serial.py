@@ -1,4 +1,6 @@
 from monopoly_simulator.agent import Agent
+from monopoly_simulator.serialization import apply_gameboard_delta
+from monopoly_simulator.framed_socket import FramedSocket
 import socket
 import json
 import logging
@@ -283,6 +285,28 @@ class ClientAgent(Agent):
         self.conn = None
         self.logger = logger
         self.game_num = 0
+        self.current_gameboard = None   # the serialized gameboard, if the server sends only its changes (delta mode)
+        self.gameboard_version = None
+
+    def _update_gameboard(self, data_dict_from_server):
+        """
+        Keep the gameboard of a server in delta mode (see server_agent_serial.ServerAgent) up to date: a message
+        carries either the full serialized gameboard or the changes since the gameboard we have, which are applied to it
+        and put in the message as its 'current_gameboard'. Decision functions get the gameboard we keep, so they must
+        not modify it.
+        :param data_dict_from_server: A dict. The message from the server.
+        :return: A Boolean. False if the message carries changes to a gameboard we do not have (the server must then
+        send the full gameboard).
+        """
+        if 'current_gameboard' in data_dict_from_server:
+            self.current_gameboard = data_dict_from_server['current_gameboard']
+        elif self.current_gameboard is None or data_dict_from_server['base_version'] != self.gameboard_version:
+            return False
+        else:
+            apply_gameboard_delta(self.current_gameboard, data_dict_from_server['gameboard_delta'])
+            data_dict_from_server['current_gameboard'] = self.current_gameboard
+        self.gameboard_version = data_dict_from_server['gameboard_version']
+        return True
 
     def play_remote_game(self, address=('localhost', 6010), authkey=b"password"):
         """
@@ -291,31 +315,21 @@ class ClientAgent(Agent):
         @param authkey: Byte string, the password used to authenticate the client. Must be same as server's authkey.
             Defaults to "password"
         """
-        self.conn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.conn.connect((address[0], address[1]))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.connect((address[0], address[1]))
+        self.conn = FramedSocket(sock)
 
         result = None
-        exception = []
         while True:
 
-            data_from_server = self.conn.recv(500000)
-            data_from_server = data_from_server.decode("utf-8")
-            # data_dict_from_server = json.loads(data_from_server)
-
-            # bug fixed
-            try:
-                data_dict_from_server = json.loads(data_from_server)
-            except ValueError:
-                exception.append(data_from_server)
-                try:
-                    print(data_from_server)
-                    print('combination:', ''.join(exception))
-                    data_dict_from_server = json.loads(''.join(exception))
-                    exception.clear()
-                except ValueError:
-                    continue
-                print(Exception, ': ', type(data_from_server), data_from_server)
-            #
+            data_from_server = self.conn.recv_message()   # always one whole message (see framed_socket.py)
+            data_dict_from_server = json.loads(data_from_server)
+
+            if 'gameboard_version' in data_dict_from_server and not self._update_gameboard(data_dict_from_server):
+                self.logger.debug('Cannot apply the gameboard changes. Asking the server for the full gameboard.')
+                self.conn.send_message(json.dumps({'function': 'resync_gameboard'}))
+                continue
+
             func_name = data_dict_from_server['function']
 
             if func_name == "start_tournament":
@@ -365,14 +379,14 @@ class ClientAgent(Agent):
 
             # Send the results back to server agent
             if isinstance(result, int):
-                self.conn.sendall(bytes(str(result), encoding="utf-8"))
+                self.conn.send_message(str(result))
             elif isinstance(result, float):
-                self.conn.sendall(bytes(str(result), encoding="utf-8"))
+                self.conn.send_message(str(result))
             elif isinstance(result, bool):
-                self.conn.sendall(bytes(str(result), encoding="utf-8"))
+                self.conn.send_message(str(result))
             else:
                 json_serial_return_to_server = json.dumps(result)
-                self.conn.sendall(bytes(json_serial_return_to_server, encoding="utf-8"))
+                self.conn.send_message(json_serial_return_to_server)
 
             if func_name == "end_tournament":
                 self.conn.close()
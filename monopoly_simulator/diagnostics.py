@@ -66,6 +66,30 @@ def print_player_net_worths_and_cash_bal(game_elements):
         logger.debug(pl.player_name + ' has a cash balance of $' + str(pl.current_cash) + ' and a net worth of $' + str(networth_p1ayer))
 
 
+def compute_player_net_worths(game_elements):
+    """
+    Compute the net worth of every player, the same way print_player_net_worths does (liquidating properties based on
+    then prices and adding cash balance).
+    :param game_elements: A dict. Specifies global gameboard data structure
+    :return: A dict. Key is the player name, value is the net worth of that player.
+    """
+    net_worths = dict()
+    for pl in game_elements['players']:
+        networth_player = pl.current_cash
+        if pl.assets:
+            for prop in pl.assets:
+                if prop.loc_class == 'real_estate':
+                    networth_player += prop.price
+                    networth_player += prop.num_houses*prop.price_per_house
+                    networth_player += prop.num_hotels*prop.price_per_house*(game_elements['bank'].house_limit_before_hotel + 1)
+                elif prop.loc_class == 'railroad':
+                    networth_player += prop.price
+                elif prop.loc_class == 'utility':
+                    networth_player += prop.price
+        net_worths[pl.player_name] = networth_player
+    return net_worths
+
+
 def print_player_net_worths(game_elements):
     """
     Print only net worth of the players. Calculated by liquidating properties (based on then prices) and adding cash balance.
@@ -0,0 +1,59 @@
+"""
+This file contains the message framing of the socket agent protocol (server_agent_serial.py, client_agent_serial.py).
+TCP is a stream, so a message can arrive in any number of pieces, and several messages can arrive in one piece. Every
+message is therefore sent as a 4 byte header holding the length of the payload (big endian) followed by the payload
+(the message encoded as utf-8). The receiver reads the header, then exactly that many bytes, with recv_into into a
+buffer that is kept between messages (and only grown when a message does not fit), so a message of any size is
+reassembled without concatenating pieces and parsed once.
+"""
+
+import struct
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.framed_socket')
+
+header = struct.Struct('!I')   # the length of the payload in bytes
+
+
+class FramedSocket(object):
+    def __init__(self, sock, buffer_size=65536):
+        """
+        :param sock: A connected socket.
+        :param buffer_size: An integer. The initial size of the receive buffer in bytes.
+        """
+        self.sock = sock
+        self.buffer = bytearray(max(buffer_size, header.size))
+
+    def send_message(self, message):
+        """
+        Send a message.
+        :param message: A string.
+        :return: None
+        """
+        payload = message.encode('utf-8')
+        # header and payload go out in one call: a separate small send can be held back by Nagle's algorithm
+        self.sock.sendall(header.pack(len(payload)) + payload)
+
+    def recv_message(self):
+        """
+        Wait for the next message.
+        :return: A string. The message.
+        """
+        (length,) = header.unpack(self._recv_exactly(header.size))
+        if length > len(self.buffer):
+            self.buffer = bytearray(max(length, 2 * len(self.buffer)))
+        return str(self._recv_exactly(length), 'utf-8')
+
+    def _recv_exactly(self, num_bytes):
+        view = memoryview(self.buffer)[:num_bytes]
+        received = 0
+        while received < num_bytes:
+            num_received = self.sock.recv_into(view[received:], num_bytes - received)
+            if num_received == 0:
+                logger.error('The connection was closed in the middle of a message.')
+                logger.error("Exception")
+                raise Exception
+            received += num_received
+        return view
+
+    def close(self):
+        self.sock.close()
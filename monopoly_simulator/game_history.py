@@ -0,0 +1,365 @@
+"""
+This file contains the compact game history that is stored in game_elements['history']. Every action of the game
+(player.py, action_choices.py, card_utility_actions.py, bank.py, location.py, the gameplay loops, novelties) records
+one event:
+    game_elements['history'].record(function, param_names, param_values, return_value, time_step)
+
+Instead of appending a bound method, a freshly built params dict and the return value to four parallel python lists,
+an event is stored in a few array backed columns:
+    - an event type code (one per distinct function and tuple of param names),
+    - the time step,
+    - the interned code of the return value,
+    - the interned codes of the param values (and of the object a bound method is bound to), in one flat column.
+Values are interned: a player, a location or the gameboard is stored once per game and every event refers to it by a
+small integer, and so are numbers and strings. Lists, tuples, sets and dicts (other than the gameboard itself) are
+interned by content, as the codes of their items. An event therefore costs a few dozen bytes instead of a dict, a bound
+method and four list slots.
+
+Recording an event only stages it (one tuple); staged events are interned into the columns in batches of staging_size.
+Since the headless gameplay loop clears the history every turn (disable_history), the interning work is only done when
+the history is actually kept around. Clearing the history drops the events but keeps the interned values, which grow with
+the number of distinct values of a game rather than with the number of events.
+
+How much is recorded is set by the history level (set_level):
+    - 'off': nothing,
+    - 'decisions': the decisions of the agents (make_pre_roll_move, make_out_of_turn_move, make_post_roll_move,
+    handle_negative_cash_balance, accepting or rejecting interactions),
+    - 'summary': the decisions, the steps of the gameplay loop (out of turn moves, die rolls, moves, move consequences,
+    post roll moves, negative cash balance handling, bankruptcies) and the actions the agents executed,
+    - 'full': every event, including the bookkeeping done inside the actions (cash transfers, asset updates, card effects...).
+Every record call is guarded by the matching flag, e.g.
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(...)
+so at a lower level the skipped events cost one attribute lookup; nothing is built and thrown away.
+
+The history can be bounded to a sliding window of the most recent events (set_max_events): older events are dropped
+every time the staged events are interned, so a long game keeps a constant amount of history. Events are numbered from
+the start of the game, whether they were dropped (by the window or by clear) or not, and a reader (e.g., a remote agent)
+can ask for the events recorded since it last asked (new_event_indices), so that it only has to look at new events.
+
+Writers (e.g., a history_writer.HistoryWriter or a history_export.HistoryColumns) can be attached with add_writer: every
+batch of staged events is handed to them before the events are interned, dropped or cleared, so that a file log of the whole game can be written as the game
+goes, however much of the history is kept in memory.
+
+The legacy view of the history is still available, and is built lazily on access:
+    game_elements['history']['function'][i], ['param'][i], ['return'][i], ['time_step'][i]
+are the function (bound method) that was called, the dict of its params, its return value and the time step of the i-th
+event, exactly as they used to be stored. Containers are materialized as new lists, tuples, sets and dicts holding the
+values they held when the event was recorded.
+"""
+
+from array import array
+import types
+from collections.abc import Mapping, Sequence
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.game_history')
+
+legacy_keys = ('function', 'param', 'return', 'time_step')
+history_levels = ('off', 'decisions', 'summary', 'full')
+staging_size = 1024  # number of recorded events that are staged before they are interned into the columns
+
+
+class GameHistory(Mapping):
+    def __init__(self, level='full', max_events=None):
+        """
+        :param level: String. The history level, one of history_levels.
+        :param max_events: An integer or None. The size of the sliding window of events that is kept (see set_max_events).
+        """
+        self.event_types = array('H')  # event type code of every event
+        self.time_steps = array('l')  # time step of every event
+        self.returns = array('L')  # interned code of the return value of every event
+        self.arg_ends = array('L')  # every event's param codes end at this offset of args (counting the dropped args)
+        self.args = array('L')  # interned codes of the param values (and the bound object) of all the events
+        self._event_type_codes = dict()  # key is (function, is_bound_method, param names), value is its event type code
+        self._event_type_list = list()  # the (function, is_bound_method, param names) of every event type code
+        self._value_codes = dict()  # key is a value key (see _intern), value is the code of the value
+        self._value_list = list()  # the value (or for a container, the codes of its items) of every code
+        self._value_builders = dict()  # key is the code of a container, value is the type it is materialized as
+        self._identity_codes = dict()  # key is id() of a value held in _value_list (so the id is not reused), value is its code
+        self._staged = list()  # the (function, param_names, param_values, return_value, time_step) of events not interned yet
+        self._events_dropped = 0  # number of events dropped from the front of the history since the game started
+        self._args_dropped = 0  # number of param codes dropped along with them
+        self._cursors = dict()  # key is a reader, value is the number (counted from the start of the game) of the next event it has not read
+        self.writers = list()  # objects that get every batch of events (see add_writer)
+        self.set_level(level)
+        self.set_max_events(max_events)
+
+    def set_max_events(self, max_events):
+        """
+        Bound the history to a sliding window of the most recent events. Since events are dropped when the staged events
+        are interned, the history holds at most twice max_events events.
+        :param max_events: An integer, or None to keep every event (until the history is cleared).
+        :return: None
+        """
+        self.max_events = max_events
+        self._compact_at = staging_size
+        if max_events is not None:
+            self._compact_at = max(1, min(staging_size, max_events))
+        self.compact()
+
+    def add_writer(self, writer):
+        """
+        Hand every event recorded from now on to a writer. The events staged so far are handed to the current writers
+        first, so the new writer only gets new events.
+        :param writer: An object with a write_events(events) method. write_events is called with a list of
+        (function, param_names, param_values, return_value, time_step) tuples, that must not be modified (it is shared by
+        all the writers) and is not used by the history afterwards.
+        :return: None
+        """
+        self._hand_over_staged()
+        self.writers.append(writer)
+
+    def remove_writer(self, writer):
+        """
+        Hand the events staged so far to the writers, then detach the given writer. Call it at the end of the game, so
+        the writer gets the last events.
+        :param writer: A writer attached with add_writer.
+        :return: None
+        """
+        self._hand_over_staged()
+        self.writers.remove(writer)
+
+    def _hand_over_staged(self):
+        if self.writers and self._staged:
+            for writer in self.writers:
+                writer.write_events(self._staged)
+            self._staged = list()
+
+    def set_level(self, level):
+        """
+        Set the history level. The flags decisions, summary and full tell the recording code which events to record.
+        :param level: String. One of history_levels.
+        :return: None
+        """
+        if level not in history_levels:
+            logger.error("Unknown history level " + str(level) + ", expected one of " + str(history_levels))
+            logger.error("Exception")
+            raise Exception
+        self.level = level
+        self.decisions = history_levels.index(level) >= history_levels.index('decisions')
+        self.summary = history_levels.index(level) >= history_levels.index('summary')
+        self.full = level == 'full'
+
+    def record(self, function, param_names, param_values, return_value, time_step):
+        """
+        Record an event. The event is staged as it is and interned into the columns together with the next staged events
+        (see compact).
+        :param function: The function (or bound method) that was called.
+        :param param_names: A tuple of param names. Use a tuple literal, so that it is a constant of the calling code.
+        :param param_values: A tuple of the param values, in the order of param_names.
+        :param return_value: The return value of the call.
+        :param time_step: The time step indicator of the gameboard.
+        :return: None
+        """
+        self._staged.append((function, param_names, param_values, return_value, time_step))
+        if len(self._staged) >= self._compact_at:
+            self.compact()
+
+    def compact(self):
+        """
+        Intern the staged events into the columns, then drop the events that fall out of the window (if any).
+        :return: None
+        """
+        staged = self._staged
+        for event in staged:
+            self._compact_event(*event)
+        self._staged = list()
+        if self.writers and staged:
+            for writer in self.writers:
+                writer.write_events(staged)
+        if self.max_events is not None and len(self.event_types) > self.max_events:
+            self._drop_events(len(self.event_types) - self.max_events)
+
+    def _drop_events(self, num_events):
+        args_end = self.arg_ends[num_events - 1] - self._args_dropped
+        del self.args[:args_end]
+        del self.event_types[:num_events]
+        del self.time_steps[:num_events]
+        del self.returns[:num_events]
+        del self.arg_ends[:num_events]
+        self._args_dropped += args_end
+        self._events_dropped += num_events
+
+    def _compact_event(self, function, param_names, param_values, return_value, time_step):
+        identity_codes = self._identity_codes
+        args = self.args
+        if isinstance(function, types.MethodType):
+            event_type_key = (function.__func__, True, param_names)
+            code = identity_codes.get(id(function.__self__))
+            args.append(self._intern(function.__self__) if code is None else code)
+        else:
+            event_type_key = (function, False, param_names)
+        event_type = self._event_type_codes.get(event_type_key)
+        if event_type is None:
+            event_type = len(self._event_type_list)
+            self._event_type_codes[event_type_key] = event_type
+            self._event_type_list.append(event_type_key)
+        for value in param_values:
+            code = identity_codes.get(id(value))
+            args.append(self._intern(value) if code is None else code)
+        code = identity_codes.get(id(return_value))
+        self.returns.append(self._intern(return_value) if code is None else code)
+        self.event_types.append(event_type)
+        self.time_steps.append(time_step)
+        self.arg_ends.append(len(args) + self._args_dropped)
+
+    def _intern(self, value):
+        code = self._identity_codes.get(id(value))
+        if code is not None:
+            return code
+        value_type = type(value)
+        if value_type is list or value_type is tuple:
+            items = tuple([self._intern(item) for item in value])
+        elif value_type is set or value_type is frozenset:
+            items = frozenset([self._intern(item) for item in value])
+        elif value_type is dict and 'type' not in value:  # the gameboard (which has a 'type') is interned by identity
+            items = tuple([(self._intern(k), self._intern(v)) for k, v in value.items()])
+        else:
+            items = None
+        if items is not None:
+            key = (value_type, items)
+            code = self._value_codes.get(key)
+        else:
+            items = value
+            key = (value_type, value)
+            try:
+                code = self._value_codes.get(key)
+            except TypeError:  # other unhashable values are interned by identity (the table keeps them alive)
+                key = id(value)
+                code = self._value_codes.get(key)
+        if code is None:
+            code = len(self._value_list)
+            self._value_codes[key] = code
+            self._value_list.append(items)
+            if items is value:
+                self._identity_codes[id(value)] = code
+            else:
+                self._value_builders[code] = value_type
+        return code
+
+    def _value(self, code):
+        value_type = self._value_builders.get(code)
+        if value_type is None:
+            return self._value_list[code]
+        if value_type is dict:
+            return {self._value(k): self._value(v) for k, v in self._value_list[code]}
+        return value_type([self._value(item) for item in self._value_list[code]])
+
+    def num_events(self):
+        """
+        :return: An integer. The number of recorded events.
+        """
+        return len(self.event_types) + len(self._staged)
+
+    def first_event_number(self):
+        """
+        :return: An integer. The number (counted from the start of the game) of the event at index 0, i.e., the number of
+        events dropped so far by clear or by the window.
+        """
+        return self._events_dropped
+
+    def clear(self):
+        """
+        Forget every recorded event. The interned values are kept: they grow with the number of distinct values of the
+        game (players, locations, amounts...), not with the number of events, and are mostly reused by the next events.
+        :return: None
+        """
+        self._events_dropped += self.num_events()
+        self._args_dropped += len(self.args)
+        del self.event_types[:]
+        del self.time_steps[:]
+        del self.returns[:]
+        del self.arg_ends[:]
+        del self.args[:]
+        self._hand_over_staged()
+        del self._staged[:]
+
+    def new_event_indices(self, reader):
+        """
+        The events recorded since the given reader last called this function (or since the start of the game), and move
+        the reader's cursor past them. Events that were dropped before the reader got to them are skipped.
+        :param reader: A hashable that identifies the reader, e.g., a player name.
+        :return: A range of indices of the events (as used by the legacy view, e.g., history['param'][idx]).
+        """
+        end = self._events_dropped + self.num_events()
+        start = max(self._cursors.get(reader, 0), self._events_dropped)
+        self._cursors[reader] = end
+        return range(start - self._events_dropped, end - self._events_dropped)
+
+    def get_event(self, idx):
+        """
+        Materialize the legacy view of an event.
+        :param idx: An integer. The index of the event.
+        :return: A dict with the keys function, param, return and time_step.
+        """
+        return {'function': self.get_function(idx), 'param': self.get_params(idx), 'return': self.get_return(idx),
+                'time_step': self.get_time_step(idx)}
+
+    def _args_start(self, idx):
+        if idx == 0:
+            return 0
+        return self.arg_ends[idx - 1] - self._args_dropped
+
+    def get_function(self, idx):
+        if idx >= len(self.event_types):
+            return self._staged[idx - len(self.event_types)][0]
+        function, is_bound_method, param_names = self._event_type_list[self.event_types[idx]]
+        if is_bound_method:
+            return types.MethodType(function, self._value(self.args[self._args_start(idx)]))
+        return function
+
+    def get_params(self, idx):
+        if idx >= len(self.event_types):
+            function, param_names, param_values, return_value, time_step = self._staged[idx - len(self.event_types)]
+            return dict(zip(param_names, param_values))
+        function, is_bound_method, param_names = self._event_type_list[self.event_types[idx]]
+        start = self._args_start(idx)
+        if is_bound_method:
+            start += 1
+        params = dict()
+        for i in range(len(param_names)):
+            params[param_names[i]] = self._value(self.args[start + i])
+        return params
+
+    def get_return(self, idx):
+        if idx >= len(self.event_types):
+            return self._staged[idx - len(self.event_types)][3]
+        return self._value(self.returns[idx])
+
+    def get_time_step(self, idx):
+        if idx >= len(self.event_types):
+            return self._staged[idx - len(self.event_types)][4]
+        return self.time_steps[idx]
+
+    def __getitem__(self, key):
+        if key not in legacy_keys:
+            raise KeyError(key)
+        return _HistoryColumn(self, key)
+
+    def __iter__(self):
+        return iter(legacy_keys)
+
+    def __len__(self):
+        return len(legacy_keys)
+
+
+class _HistoryColumn(Sequence):
+    """
+    A read only, lazily materialized column of the legacy history view.
+    """
+    def __init__(self, history, key):
+        self.history = history
+        self.getter = getattr(history, 'get_' + {'function': 'function', 'param': 'params', 'return': 'return',
+                                                'time_step': 'time_step'}[key])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.getter(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError('history index out of range')
+        return self.getter(idx)
+
+    def __len__(self):
+        return self.history.num_events()
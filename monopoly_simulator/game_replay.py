@@ -0,0 +1,428 @@
+"""
+This file contains the compact replay record of a game and the replay engine that plays a game back from it.
+
+A replay record holds everything that drives a game from the outside:
+    - the game seed and the order the players were shuffled into,
+    - the die rolls (in the order they were rolled) and the card draws (the index drawn from the sorted card pack),
+    as small integer arrays,
+    - every agent decision, in the order they were made, as [decision point, player, return value], where the decision
+    point is an index into decision_points, the player an index into the sorted player names, and the return value is
+    what the agent returned (e.g., the action name and its params) in a compact encoding: players, locations and the
+    gameboard are written as "@player:<name>", "@location:<name>" and "@gameboard", sets and tuples as {"@set": [...]}
+    and {"@tuple": [...]},
+    - the gameboard keys agents set (or deleted) while making a decision, as [decision index, {key: value}] in the same
+    encoding (a deleted key has the value "@deleted"). Some agents leave part of their decision on the gameboard, e.g.,
+    background_agent_v3_1_interaction_make_offer puts the free rent interaction it asks for in
+    gameboard['free_rent_interaction'], which make_arbitrary_interaction then reads.
+
+To record a game, pass a ReplayRecorder to gameplay.simulate_game_instance (replay=...); recorder.record is the record
+once the game is over. dumps_replay packs a record into a zlib compressed string of bytes, loads_replay unpacks it.
+
+To replay a game, use replay_game(record). It sets up a fresh board and passes a ReplayDriver to
+simulate_game_instance: the player order, die rolls and card draws are taken from the record instead of the random
+generators, and every agent decision is answered from the record without calling the agent, setting the gameboard keys
+the agent set during that decision. A replay is therefore much faster than the original game, and it does not depend on
+the agent code (or on numpy's random streams) staying the same. Only keys of the gameboard itself are recorded: an agent
+that changes the board in any other way during a decision (e.g., edits a dict stored on the gameboard in place, or a
+player or location) cannot be replayed faithfully.
+If the game asks for a decision, die roll or card draw that does not match the record (e.g., the game engine changed),
+the replay stops with an exception. Novelty injected into the original game is not part of the record; pass the same
+novelty injection function to replay_game.
+"""
+
+import functools
+import json
+import zlib
+import numpy as np
+from monopoly_simulator.player import Player
+from monopoly_simulator.location import Location
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.game_replay')
+
+replay_version = 2
+decision_points = ('handle_negative_cash_balance', 'make_pre_roll_move', 'make_out_of_turn_move', 'make_post_roll_move',
+                   'make_buy_property_decision', 'make_bid')
+
+
+def _new_record(seed):
+    record = dict()
+    record['version'] = replay_version
+    record['seed'] = int(seed)
+    record['player_order'] = list()
+    record['die_rolls'] = list()
+    record['card_draws'] = list()
+    record['decisions'] = list()
+    record['gameboard_writes'] = list()
+    return record
+
+
+class ReplayRecorder(object):
+    """
+    Records the replay record of a game. Pass it to gameplay.simulate_game_instance; the record is in self.record once
+    the game is over.
+    """
+    def __init__(self):
+        self.record = None
+        self._wrapped_agents = list()  # (agent, decision point, original function) of every wrapped agent function
+
+    def attach(self, game_elements):
+        """
+        Start recording. Called by simulate_game_instance right after the game's random streams are initialized.
+        :param game_elements: A dict. The gameboard.
+        :return: None
+        """
+        record = _new_record(game_elements['seed'])
+        self.record = record
+        player_order_generator = game_elements['player_order_generator']
+        choice_function = game_elements['choice_function']
+        card_generator = game_elements['card_generator']
+
+        def shuffle(players):
+            player_order_generator.shuffle(players)
+            record['player_order'] = [p.player_name for p in players]
+
+        def choice(a, p=None):
+            value = choice_function(a=a, p=p)
+            record['die_rolls'].append(int(value))
+            return value
+
+        def integers(n):
+            value = card_generator.integers(n)
+            record['card_draws'].append(int(value))
+            return value
+
+        game_elements['player_order_generator'] = _Stream(shuffle=shuffle)
+        game_elements['choice_function'] = choice
+        game_elements['card_generator'] = _Stream(integers=integers)
+
+        player_names = sorted(p.player_name for p in game_elements['players'])
+        for player in game_elements['players']:
+            for point in range(len(decision_points)):
+                function = getattr(player.agent, decision_points[point])
+                self._wrapped_agents.append((player.agent, decision_points[point], function))
+                setattr(player.agent, decision_points[point],
+                        self._recording_function(function, point, player_names.index(player.player_name),
+                                                 game_elements))
+
+    def _recording_function(self, function, point, player_index, game_elements):
+        decisions = self.record['decisions']
+        gameboard_writes = self.record['gameboard_writes']
+
+        @functools.wraps(function)
+        def recording_function(*args):
+            keys_before = list(game_elements)
+            values_before = list(game_elements.values())
+            result = function(*args)
+            # almost every decision leaves the gameboard alone, which these list comparisons (identity first) tell quickly
+            if keys_before != list(game_elements) or values_before != list(game_elements.values()):
+                gameboard_before = dict(zip(keys_before, values_before))
+                writes = dict()
+                for k, v in game_elements.items():
+                    if k not in gameboard_before or gameboard_before[k] is not v:
+                        writes[k] = _encode_value(v)
+                for k in gameboard_before:
+                    if k not in game_elements:
+                        writes[k] = '@deleted'
+                gameboard_writes.append([len(decisions), writes])
+            decisions.append([point, player_index, _encode_value(result)])
+            return result
+        return recording_function
+
+    def detach(self, game_elements):
+        """
+        Stop recording: the agents get their own decision functions back, and the die rolls and card draws of the record
+        become integer arrays. Called by simulate_game_instance at the end of the game.
+        :param game_elements: A dict. The gameboard.
+        :return: None
+        """
+        for agent, name, function in self._wrapped_agents:
+            setattr(agent, name, function)
+        self._wrapped_agents = list()
+        self.record['die_rolls'] = np.array(self.record['die_rolls'], dtype=np.int16)
+        self.record['card_draws'] = np.array(self.record['card_draws'], dtype=np.int16)
+
+
+class ReplayDriver(object):
+    """
+    Drives a game from a replay record (see replay_game).
+    """
+    def __init__(self, record):
+        """
+        :param record: A dict. A replay record (see ReplayRecorder and loads_replay).
+        """
+        if record['version'] != replay_version:
+            logger.error("Cannot replay a record of version " + str(record['version']))
+            logger.error("Exception")
+            raise Exception
+        self.record = record
+        self.num_decisions = 0
+        self.num_die_rolls = 0
+        self.num_card_draws = 0
+        self._wrapped_agents = list()
+        self._gameboard_writes = dict()  # key is a decision index, value is the gameboard keys set during that decision
+        for decision_index, writes in record['gameboard_writes']:
+            self._gameboard_writes[decision_index] = writes
+
+    def attach(self, game_elements):
+        """
+        Take the game's random streams and agent decisions from the record. Called by simulate_game_instance right after
+        the game's random streams are initialized.
+        :param game_elements: A dict. The gameboard.
+        :return: None
+        """
+        record = self.record
+        die_rolls = record['die_rolls']
+        card_draws = record['card_draws']
+
+        def shuffle(players):
+            players.sort(key=lambda p: record['player_order'].index(p.player_name))
+
+        def choice(a, p=None):
+            if self.num_die_rolls >= len(die_rolls) or int(die_rolls[self.num_die_rolls]) not in list(a):
+                _diverged('die roll ' + str(self.num_die_rolls))
+            self.num_die_rolls += 1
+            return int(die_rolls[self.num_die_rolls - 1])
+
+        def integers(n):
+            if self.num_card_draws >= len(card_draws) or int(card_draws[self.num_card_draws]) >= n:
+                _diverged('card draw ' + str(self.num_card_draws))
+            self.num_card_draws += 1
+            return int(card_draws[self.num_card_draws - 1])
+
+        game_elements['player_order_generator'] = _Stream(shuffle=shuffle)
+        game_elements['choice_function'] = choice
+        game_elements['card_generator'] = _Stream(integers=integers)
+
+        player_names = sorted(p.player_name for p in game_elements['players'])
+        for player in game_elements['players']:
+            for point in range(len(decision_points)):
+                function = getattr(player.agent, decision_points[point])
+                self._wrapped_agents.append((player.agent, decision_points[point], function))
+                setattr(player.agent, decision_points[point],
+                        self._replaying_function(function, point, player_names.index(player.player_name), game_elements))
+
+    def _replaying_function(self, function, point, player_index, game_elements):
+        decisions = self.record['decisions']
+
+        @functools.wraps(function)
+        def replaying_function(*args):
+            if self.num_decisions >= len(decisions) or decisions[self.num_decisions][0] != point or \
+                    decisions[self.num_decisions][1] != player_index:
+                _diverged('decision ' + str(self.num_decisions) + ' (' + decision_points[point] + ')')
+            self.num_decisions += 1
+            for k, v in self._gameboard_writes.get(self.num_decisions - 1, dict()).items():
+                if v == '@deleted':
+                    game_elements.pop(k, None)
+                else:
+                    game_elements[k] = _decode_value(v, game_elements)
+            return _decode_value(decisions[self.num_decisions - 1][2], game_elements)
+        return replaying_function
+
+    def detach(self, game_elements):
+        """
+        Give the agents their own decision functions back. Called by simulate_game_instance at the end of the game.
+        :param game_elements: A dict. The gameboard.
+        :return: None
+        """
+        for agent, name, function in self._wrapped_agents:
+            setattr(agent, name, function)
+        self._wrapped_agents = list()
+        if self.num_decisions != len(self.record['decisions']) or self.num_die_rolls != len(self.record['die_rolls']) or \
+                self.num_card_draws != len(self.record['card_draws']):
+            logger.debug('The replayed game ended before the end of its replay record.')
+
+
+class _Stream(object):
+    """
+    Stands in for one of the game's random generators (see initialize_game_elements.initialize_random_streams); only
+    the methods the game engine calls on it are given.
+    """
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+def _diverged(what):
+    logger.error("The replayed game does not match its replay record at " + what)
+    logger.error("Exception")
+    raise Exception
+
+
+def _encode_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return '@' + value if value.startswith('@') else value
+    if isinstance(value, Player):
+        return '@player:' + value.player_name
+    if isinstance(value, Location):
+        return '@location:' + value.name
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, dict):
+        if 'type' in value:   # the gameboard
+            return '@gameboard'
+        return {k: _encode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_encode_value(item) for item in value]
+    if isinstance(value, tuple):
+        return {'@tuple': [_encode_value(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'@set': [_encode_value(item) for item in value]}
+    logger.error("Cannot record the agent decision value " + str(value) + " in a replay record")
+    logger.error("Exception")
+    raise Exception
+
+
+def _decode_value(value, game_elements):
+    if isinstance(value, str):
+        if value.startswith('@@'):
+            return value[1:]
+        if value == '@gameboard':
+            return game_elements
+        if value.startswith('@player:'):
+            for p in game_elements['players']:
+                if p.player_name == value[len('@player:'):]:
+                    return p
+        if value.startswith('@location:'):
+            return game_elements['location_objects'][value[len('@location:'):]]
+        return value
+    if isinstance(value, list):
+        return [_decode_value(item, game_elements) for item in value]
+    if isinstance(value, dict):
+        if '@tuple' in value:
+            return tuple(_decode_value(item, game_elements) for item in value['@tuple'])
+        if '@set' in value:
+            return set(_decode_value(item, game_elements) for item in value['@set'])
+        return {k: _decode_value(v, game_elements) for k, v in value.items()}
+    return value
+
+
+def _byte_planes(values, dtype):
+    # all the first bytes of the values, then all the second bytes etc.: small integers and dyadic floats (bids) leave
+    # whole planes at zero, which compress to almost nothing
+    values = np.asarray(values, dtype=dtype)
+    return values.view(np.uint8).reshape(-1, values.itemsize).T.tobytes()
+
+
+def _from_byte_planes(data, offset, num_values, dtype):
+    itemsize = np.dtype(dtype).itemsize
+    planes = np.frombuffer(data, dtype=np.uint8, count=num_values * itemsize, offset=offset).reshape(itemsize, num_values)
+    return planes.T.copy().view(dtype).reshape(num_values), offset + num_values * itemsize
+
+
+def dumps_replay(record):
+    """
+    Pack a replay record into bytes. Decisions that return a number (bids) are stored as a float column; every other
+    distinct decision value (e.g., skipping the turn) is stored once, as json. The decisions themselves become integer
+    columns (decision point and player, value index), stored as byte planes along with the die rolls and card draws. All
+    of it is zlib compressed, which takes a game to a KB or two.
+    :param record: A dict. A replay record.
+    :return: Bytes.
+    """
+    value_codes = dict()  # key is the json of a decision value, value is its index in values
+    values = list()
+    numbers = list()
+    decision_codes = list()
+    value_indices = list()
+    for point, player_index, value in record['decisions']:
+        decision_codes.append(point * 16 + player_index)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            numbers.append(value)
+            value_indices.append(0)
+            continue
+        value_json = json.dumps(value, separators=(',', ':'))
+        if value_json not in value_codes:
+            value_codes[value_json] = len(values) + 1   # 0 stands for the next number
+            values.append(value)
+        value_indices.append(value_codes[value_json])
+    header = dict()
+    for k, v in record.items():
+        if k not in ['die_rolls', 'card_draws', 'decisions']:
+            header[k] = v
+    header['decision_values'] = values
+    header['number_types'] = ''.join('i' if isinstance(n, int) else 'f' for n in numbers)
+    header['num_decisions'] = len(record['decisions'])
+    header['num_die_rolls'] = len(record['die_rolls'])
+    header['num_card_draws'] = len(record['card_draws'])
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(len(header_bytes).to_bytes(4, 'little') + header_bytes +
+                         _byte_planes(decision_codes, '<u2') + _byte_planes(value_indices, '<u2') +
+                         _byte_planes(numbers, '<f8') + _byte_planes(record['die_rolls'], '<i2') +
+                         _byte_planes(record['card_draws'], '<i2'), 9)
+
+
+def loads_replay(data):
+    """
+    Unpack a replay record packed by dumps_replay.
+    :param data: Bytes.
+    :return: A dict. The replay record.
+    """
+    data = zlib.decompress(data)
+    offset = 4 + int.from_bytes(data[:4], 'little')
+    record = json.loads(data[4:offset].decode('utf-8'))
+    values = record.pop('decision_values')
+    number_types = record.pop('number_types')
+    num_decisions = record.pop('num_decisions')
+    decision_codes, offset = _from_byte_planes(data, offset, num_decisions, '<u2')
+    value_indices, offset = _from_byte_planes(data, offset, num_decisions, '<u2')
+    numbers, offset = _from_byte_planes(data, offset, len(number_types), '<f8')
+    record['die_rolls'], offset = _from_byte_planes(data, offset, record.pop('num_die_rolls'), '<i2')
+    record['card_draws'], offset = _from_byte_planes(data, offset, record.pop('num_card_draws'), '<i2')
+    record['decisions'] = list()
+    num_numbers = 0
+    for code, value_index in zip(decision_codes.tolist(), value_indices.tolist()):
+        if value_index == 0:
+            value = float(numbers[num_numbers])
+            if number_types[num_numbers] == 'i':
+                value = int(value)
+            num_numbers += 1
+        else:
+            value = values[value_index - 1]
+        record['decisions'].append([code // 16, code % 16, value])
+    return record
+
+
+def replay_game(record, board_prototype=None, inject_novelty_function=None, history_level='off', return_game_result=True):
+    """
+    Replay a recorded game without calling any agent.
+    :param record: A dict. The replay record (see ReplayRecorder and loads_replay).
+    :param board_prototype: A dict output by gameplay.set_up_board_prototype, or None to set the board up from the
+    game schema file.
+    :param inject_novelty_function: The function that injected novelty into the original game, or None.
+    :param history_level: String. The level of the game history of the replay (see game_history.py), e.g., 'full' to
+    look at every event of the game.
+    :param return_game_result: boolean. If True, the game result dict is returned, else the name of the winner.
+    :return: The game result dict (see gameplay.simulate_game_instance) or the name of the winner.
+    """
+    from monopoly_simulator import gameplay, initialize_game_elements
+    from monopoly_simulator.agent import Agent
+
+    player_decision_agents = dict()
+    for player_name in record['player_order']:
+        player_decision_agents[player_name] = Agent(**_replay_agent_methods())
+    if board_prototype is not None:
+        game_elements = initialize_game_elements.clone_board(board_prototype, player_decision_agents)
+    else:
+        game_elements = gameplay.set_up_board('../monopoly_game_schema_v1-2.json', player_decision_agents)
+    if inject_novelty_function:
+        inject_novelty_function(game_elements)
+    for player_name in player_decision_agents:
+        player_decision_agents[player_name].startup(game_elements)
+    return gameplay.simulate_game_instance(game_elements, np_seed=record['seed'], return_game_result=return_game_result,
+                                           history_level=history_level, replay=ReplayDriver(record))
+
+
+def _replay_agent_methods():
+    """
+    Decision functions of the agents of a replayed game. They are replaced by the ReplayDriver before the game starts,
+    so they are never called.
+    """
+    def not_replayed(*args):
+        _diverged('a decision made outside of the replayed game')
+    ans = dict()
+    for point in decision_points:
+        ans[point] = not_replayed
+    ans['type'] = "decision_agent_methods"
+    return ans
@@ -8,8 +8,10 @@ from monopoly_simulator import read_write_current_state
 import json
 from monopoly_simulator import novelty_generator
 from monopoly_simulator import diagnostics
+from monopoly_simulator import outcome_cache
 from monopoly_simulator.agent import Agent
-import xlsxwriter
+from monopoly_simulator.history_writer import HistoryWriter
+from monopoly_simulator.history_export import HistoryColumns
 from monopoly_simulator.flag_config import flag_config_dict
 from monopoly_simulator.logging_info import log_file_create
 import os
@@ -18,57 +20,39 @@ import logging
 logger = logging.getLogger('monopoly_simulator.logging_info')
 
 
-def write_history_to_file(game_board, workbook):
-    worksheet = workbook.add_worksheet()
-    col = 0
-    for key in game_board['history']:
-        if key == 'param':
-            col += 1
-            row = 0
-            worksheet.write(row, col, key)
-            worksheet.write(row, col + 1, 'current_player')
-            for item in game_board['history'][key]:
-                worksheet.write(row + 1, col, str(item))
-                try:
-                    worksheet.write(row + 1, col + 1, item['player'].player_name)
-                except:
-                    pass
-                row += 1
-            col += 1
-        else:
-            col += 1
-            row = 0
-            worksheet.write(row, col, key)
-            for item in game_board['history'][key]:
-                worksheet.write(row + 1, col, str(item))
-                row += 1
-    workbook.close()
-    print("History logged into history_log.xlsx file.")
-
-
 def disable_history(game_elements):
-    game_elements['history'] = dict()
-    game_elements['history']['function'] = list()
-    game_elements['history']['param'] = list()
-    game_elements['history']['return'] = list()
-    game_elements['history']['time_step'] = list()
+    game_elements['history'].clear()
 
 
-def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
+def simulate_game_instance(game_elements, history_log_file=None, np_seed=2, return_game_result=False, history_level=None,
+                           history_npz_file=None, replay=None):
     """
     Simulate a game instance.
     :param game_elements: The dict output by set_up_board
-    :param np_seed: The numpy seed to use to control randomness.
-    :return: None
+    :param history_log_file: String or None. If given, every event of the game history is streamed to this JSON lines
+    file while the game is played (see history_writer.py).
+    :param np_seed: The numpy seed to use to control randomness. The game draws from its own generators derived from
+    this seed (see initialize_game_elements.initialize_random_streams), the global numpy random state is not used.
+    :param return_game_result: boolean. If True, the game result dict (see _build_game_result) is returned instead of
+    the name of the winner. The game result is always stored in game_elements['game_result'].
+    :param history_level: String or None. If given, the level of the game history (see game_history.py) is set to it
+    before the game starts: 'off', 'decisions', 'summary' or 'full'.
+    :param history_npz_file: String or None. If given, the events of the game history are exported as numpy columns to
+    this compressed .npz shard at the end of the game (see history_export.py).
+    :param replay: A game_replay.ReplayRecorder to record the replay record of the game, or a game_replay.ReplayDriver to
+    play the game back from a replay record (the player order, dice, cards and agent decisions are then taken from it).
+    :return: String. the name of the player who won the game (or None), or the game result dict if return_game_result is True.
     """
     logger.debug("size of board " + str(len(game_elements['location_sequence'])))
-    np.random.seed(np_seed)
-    np.random.shuffle(game_elements['players'])
-    game_elements['seed'] = np_seed
-    game_elements['card_seed'] = np_seed
-    game_elements['choice_function'] = np.random.choice
+    initialize_game_elements.initialize_random_streams(game_elements, np_seed)
+    if replay is not None:
+        replay.attach(game_elements)
+    game_elements['player_order_generator'].shuffle(game_elements['players'])
     count_json = 0   # a counter to keep track of how many rounds the game has to be played before storing the current_state of gameboard to file.
     num_die_rolls = 0
+    num_turns = 0
+    elimination_order = list()
+    cash_cap_termination = False
     tot_time = 0
     # game_elements['go_increment'] = 100 # we should not be modifying this here. It is only for testing purposes.
     # One reason to modify go_increment is if your decision agent is not aggressively trying to monopolize. Since go_increment
@@ -80,11 +64,18 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
     current_player_index = 0
     num_active_players = 4
     winner = None
-    workbook = None
+    history_writer = None
     if history_log_file:
-        workbook = xlsxwriter.Workbook(history_log_file)
+        history_writer = HistoryWriter(history_log_file)   # every event is streamed to the file as the game goes
+        game_elements['history'].add_writer(history_writer)
+    history_columns = None
+    if history_npz_file:
+        history_columns = HistoryColumns(game_elements)
+        game_elements['history'].add_writer(history_columns)
     game_elements['start_time'] = time.time()
     game_elements['time_step_indicator'] = 0
+    if history_level is not None:
+        game_elements['history'].set_level(history_level)
 
     while num_active_players > 1:
         disable_history(
@@ -94,7 +85,10 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
             current_player_index += 1
             current_player_index = current_player_index % len(game_elements['players'])
             current_player = game_elements['players'][current_player_index]
+        if game_elements['undo_stack'] is not None:
+            game_elements['undo_stack'].save(current_player)
         current_player.status = 'current_move'
+        num_turns += 1
 
         # pre-roll for current player + out-of-turn moves for everybody else,
         # till we get num_active_players skip turns in a row.
@@ -114,13 +108,10 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
 
             oot_code = out_of_turn_player.make_out_of_turn_moves(game_elements)
             # add to game history
-            game_elements['history']['function'].append(out_of_turn_player.make_out_of_turn_moves)
-            params = dict()
-            params['self'] = out_of_turn_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(oot_code)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(out_of_turn_player.make_out_of_turn_moves, ('self', 'current_gameboard'),
+                                                (out_of_turn_player, game_elements), oot_code,
+                                                game_elements['time_step_indicator'])
 
             if oot_code == 2:
                 skip_turn += 1
@@ -135,19 +126,15 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
         logger.debug("Printing cash balance and net worth of each player: ")
         diagnostics.print_player_net_worths_and_cash_bal(game_elements)
 
-        r = action_choices.roll_die(game_elements['dies'], np.random.choice, game_elements)        # change
+        r = action_choices.roll_die(game_elements['dies'], game_elements['choice_function'], game_elements)        # change
         for i in range(len(r)):
             game_elements['die_sequence'][i].append(r[i])
 
         # add to game history
-        game_elements['history']['function'].append(action_choices.roll_die)
-        params = dict()
-        params['die_objects'] = game_elements['dies']
-        params['choice'] = np.random.choice
-        params['current_gameboard'] = game_elements
-        game_elements['history']['param'].append(params)
-        game_elements['history']['return'].append(r)
-        game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+        if game_elements['history'].summary:
+            game_elements['history'].record(action_choices.roll_die, ('die_objects', 'choice', 'current_gameboard'),
+                                            (game_elements['dies'], game_elements['choice_function'], game_elements), r,
+                                            game_elements['time_step_indicator'])
 
         num_die_rolls += 1
         game_elements['current_die_total'] = sum(r)
@@ -156,37 +143,24 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
             check_for_go = True
             game_elements['move_player_after_die_roll'](current_player, sum(r), game_elements, check_for_go)
             # add to game history
-            game_elements['history']['function'].append(game_elements['move_player_after_die_roll'])
-            params = dict()
-            params['player'] = current_player
-            params['rel_move'] = sum(r)
-            params['current_gameboard'] = game_elements
-            params['check_for_go'] = check_for_go
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(None)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(game_elements['move_player_after_die_roll'],
+                                                ('player', 'rel_move', 'current_gameboard', 'check_for_go'),
+                                                (current_player, sum(r), game_elements, check_for_go), None,
+                                                game_elements['time_step_indicator'])
 
             current_player.process_move_consequences(game_elements)
             # add to game history
-            game_elements['history']['function'].append(current_player.process_move_consequences)
-            params = dict()
-            params['self'] = current_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(None)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(current_player.process_move_consequences, ('self', 'current_gameboard'),
+                                                (current_player, game_elements), None, game_elements['time_step_indicator'])
 
             # post-roll for current player. No out-of-turn moves allowed at this point.
             current_player.make_post_roll_moves(game_elements)
             # add to game history
-            game_elements['history']['function'].append(current_player.make_post_roll_moves)
-            params = dict()
-            params['self'] = current_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(None)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(current_player.make_post_roll_moves, ('self', 'current_gameboard'),
+                                                (current_player, game_elements), None, game_elements['time_step_indicator'])
 
         else:
             # current_player.currently_in_jail = False  # the player is only allowed to skip one turn (i.e. this one)
@@ -195,26 +169,20 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
         if current_player.current_cash < 0:
             code = current_player.handle_negative_cash_balance(game_elements)
             # add to game history
-            game_elements['history']['function'].append(current_player.handle_negative_cash_balance)
-            params = dict()
-            params['self'] = current_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(code)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(current_player.handle_negative_cash_balance, ('self', 'current_gameboard'),
+                                                (current_player, game_elements), code, game_elements['time_step_indicator'])
 
             if code == flag_config_dict['failure_code'] or current_player.current_cash < 0:
                 current_player.begin_bankruptcy_proceedings(game_elements)
                 # add to game history
-                game_elements['history']['function'].append(current_player.begin_bankruptcy_proceedings)
-                params = dict()
-                params['self'] = current_player
-                params['current_gameboard'] = game_elements
-                game_elements['history']['param'].append(params)
-                game_elements['history']['return'].append(None)
-                game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+                if game_elements['history'].summary:
+                    game_elements['history'].record(current_player.begin_bankruptcy_proceedings,
+                                                    ('self', 'current_gameboard'), (current_player, game_elements), None,
+                                                    game_elements['time_step_indicator'])
 
                 num_active_players -= 1
+                elimination_order.append(current_player.player_name)
                 diagnostics.print_asset_owners(game_elements)
                 diagnostics.print_player_cash_balances(game_elements)
 
@@ -222,6 +190,8 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
                     for p in game_elements['players']:
                         if p.status != 'lost':
                             winner = p
+                            if game_elements['undo_stack'] is not None:
+                                game_elements['undo_stack'].save(p)
                             p.status = 'won'
             else:
                 current_player.status = 'waiting_for_move'
@@ -237,6 +207,7 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
             diagnostics.print_asset_owners(game_elements)
             diagnostics.print_player_cash_balances(game_elements)
             logger.debug("Game ran for " + str(tot_time) + " seconds.")
+            cash_cap_termination = True
             break
 
         #This is an example of how you may want to write out gameboard state to file.
@@ -261,8 +232,15 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
 
     logger.debug('Liquid Cash remaining with Bank = ' + str(game_elements['bank'].total_cash_with_bank))
 
-    if workbook:
-        write_history_to_file(game_elements, workbook)
+    if history_writer:
+        game_elements['history'].remove_writer(history_writer)
+        num_logged_events = history_writer.close()
+        print("History logged into " + history_log_file + " (" + str(num_logged_events) + " events).")
+    if history_columns:
+        game_elements['history'].remove_writer(history_columns)
+        history_columns.save_npz(history_npz_file)
+    if replay is not None:
+        replay.detach(game_elements)
     # let's print some numbers
     logger.debug('printing final asset owners: ')
     diagnostics.print_asset_owners(game_elements)
@@ -275,15 +253,46 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=2):
 
     if winner:
         logger.debug('We have a winner: ' + winner.player_name)
-        return winner.player_name
     else:
         winner = card_utility_actions.check_for_winner(game_elements)
         if winner is not None:
             logger.debug('We have a winner: ' + winner.player_name)
-            return winner.player_name
         else:
-            logger.debug('Game has no winner, do not know what went wrong!!!')
-            return None     # ideally should never get here
+            logger.debug('Game has no winner, do not know what went wrong!!!')     # ideally should never get here
+
+    game_elements['game_result'] = _build_game_result(game_elements, np_seed, winner, elimination_order, num_turns,
+                                                      num_die_rolls, tot_time, cash_cap_termination)
+    if return_game_result:
+        return game_elements['game_result']
+    return game_elements['game_result']['winner']
+
+
+def _build_game_result(game_elements, np_seed, winner, elimination_order, num_turns, num_die_rolls, tot_time,
+                       cash_cap_termination):
+    """
+    Summarize a finished game in a small dict that only holds json serializable values, so it can be written out as a
+    line of a results file (see tournament_runner.py) instead of parsing the winner back out of the game log.
+    :return: A dict with the keys seed, winner (player name or None), elimination_order (names of the players in the order
+    in which they went bankrupt), num_turns, num_die_rolls, final_cash and final_net_worth (dicts keyed by player name),
+    wall_time (seconds) and cash_cap_termination (True if the game was cut short by check_for_game_termination).
+    """
+    game_result = dict()
+    game_result['seed'] = int(np_seed)
+    game_result['winner'] = winner.player_name if winner is not None else None
+    game_result['elimination_order'] = elimination_order
+    game_result['num_turns'] = num_turns
+    game_result['num_die_rolls'] = num_die_rolls
+    final_cash = dict()
+    for p in game_elements['players']:
+        final_cash[p.player_name] = float(p.current_cash)
+    game_result['final_cash'] = final_cash
+    final_net_worth = dict()
+    for player_name, net_worth in diagnostics.compute_player_net_worths(game_elements).items():
+        final_net_worth[player_name] = float(net_worth)
+    game_result['final_net_worth'] = final_net_worth
+    game_result['wall_time'] = tot_time
+    game_result['cash_cap_termination'] = cash_cap_termination
+    return game_result
 
 
 def set_up_board(game_schema_file_path, player_decision_agents):
@@ -291,6 +300,20 @@ def set_up_board(game_schema_file_path, player_decision_agents):
     return initialize_game_elements.initialize_board(game_schema, player_decision_agents)
 
 
+def set_up_board_prototype(game_schema_file_path):
+    """
+    Set up a board that is never played on, but cloned (see initialize_game_elements.clone_board) for every game that
+    is played with this schema. The players of the prototype have no decision agents; these are assigned to the clones.
+    :param game_schema_file_path: String. Path to the game schema json file.
+    :return: A dict. The board prototype.
+    """
+    game_schema = json.load(open(game_schema_file_path, 'r'))
+    player_decision_agents = dict()
+    for player in game_schema['players']['player_states']['player_name']:
+        player_decision_agents[player] = None
+    return initialize_game_elements.initialize_board(game_schema, player_decision_agents)
+
+
 def inject_novelty(current_gameboard, novelty_schema=None):
     """
     Function for illustrating how we inject novelty
@@ -421,18 +444,68 @@ def play_game():
             return winner
 
 
-def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_function=None):
+def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_function=None, board_prototype=None,
+                            return_game_result=False, player_agents=None, outcome_cache_dir=None, force_recompute=False,
+                            history_level='off', history_npz_file=None):
+    """
+    Play a single tournament game. By default, background agents play in all four seats.
+    :param game_seed: The numpy seed of the game.
+    :param novelty_info: boolean that specifies if the agent will be notified when novelty is injected or not.
+    :param inject_novelty_function: function that injects novelty into the gameboard before the game starts, or None.
+    :param board_prototype: A dict output by set_up_board_prototype. If given, the gameboard is cloned from it instead of
+    being set up from the game schema file, which saves the schema parsing and board initialization for every game.
+    :param return_game_result: boolean. If True, the game result dict built by simulate_game_instance is returned instead
+    of the name of the winner.
+    :param player_agents: A dict or None. Key is a player name ('player_1' to 'player_4'), value is the agent module
+    (e.g., background_agent_v3_1) whose decision_agent_methods that player uses. Players that are missing from the dict
+    use background_agent_v3_1.
+    :param outcome_cache_dir: String or None. If given, the outcome of the game is looked up in this outcome cache (see
+    outcome_cache.py) and the game is only played if it is not cached yet; its outcome is then added to the cache.
+    :param force_recompute: boolean. If True, the game is played (and its cached outcome replaced) even if it is cached.
+    :param history_level: String. The level of the game history (see game_history.py). Tournament games do not look at
+    their history, so it is off by default.
+    :param history_npz_file: String or None. If given, the history of the game is exported to this .npz shard (see
+    history_export.py). The history is then recorded at the 'full' level (unless another level than 'off' is given),
+    and the game is played even if its outcome is cached.
+    :return: String. the name of the player who won the game, if there was a winner, otherwise None. If return_game_result
+    is True, the game result dict (or None if the agents could not be started up or shut down).
+    """
     logger.debug('seed used: ' + str(game_seed))
+    if history_npz_file is not None and history_level == 'off':
+        history_level = 'full'
+    agent_modules = dict()
+    for player_name in ['player_1', 'player_2', 'player_3', 'player_4']:
+        if player_agents is not None and player_name in player_agents:
+            agent_modules[player_name] = player_agents[player_name]
+        else:
+            agent_modules[player_name] = background_agent_v3_1
+
+    if outcome_cache_dir is not None:
+        cache_key = outcome_cache.game_cache_key(game_seed, '../monopoly_game_schema_v1-2.json', novelty_info,
+                                                 inject_novelty_function, agent_modules)
+        if not force_recompute and history_npz_file is None:
+            game_result = outcome_cache.read_cached_result(outcome_cache_dir, cache_key)
+            if game_result is not None:
+                game_result['cached'] = True
+                logger.debug('Game outcome read from outcome cache (key ' + cache_key + ').')
+                if game_result['winner'] is not None:
+                    logger.debug('We have a winner: ' + game_result['winner'])
+                logger.debug("GAME OVER")
+                if return_game_result:
+                    return game_result
+                return game_result['winner']
+
     player_decision_agents = dict()
     # for p in ['player_1','player_3']:
     #     player_decision_agents[p] = simple_decision_agent_1.decision_agent_methods
-    player_decision_agents['player_1'] = Agent(**background_agent_v3_1.decision_agent_methods)
-    player_decision_agents['player_2'] = Agent(**background_agent_v3_1.decision_agent_methods)
-    player_decision_agents['player_3'] = Agent(**background_agent_v3_1.decision_agent_methods)
-    player_decision_agents['player_4'] = Agent(**background_agent_v3_1.decision_agent_methods)
+    for player_name in ['player_1', 'player_2', 'player_3', 'player_4']:
+        player_decision_agents[player_name] = Agent(**agent_modules[player_name].decision_agent_methods)
 
-    game_elements = set_up_board('../monopoly_game_schema_v1-2.json',
-                                 player_decision_agents)
+    if board_prototype is not None:
+        game_elements = initialize_game_elements.clone_board(board_prototype, player_decision_agents)
+    else:
+        game_elements = set_up_board('../monopoly_game_schema_v1-2.json',
+                                     player_decision_agents)
 
     #Comment out the above line and uncomment the piece of code to read the gameboard state from an existing json file so that
     #the game starts from a particular game state instead of initializing the gameboard with default start values.
@@ -455,7 +528,9 @@ def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_functi
             return None
         else:
             logger.debug("Sucessfully initialized all player agents.")
-            winner = simulate_game_instance(game_elements, history_log_file=None, np_seed=game_seed)
+            winner = simulate_game_instance(game_elements, history_log_file=None, np_seed=game_seed,
+                                            return_game_result=return_game_result, history_level=history_level,
+                                            history_npz_file=history_npz_file)
             if player_decision_agents['player_1'].shutdown() == flag_config_dict['failure_code'] or \
                     player_decision_agents['player_2'].shutdown() == flag_config_dict['failure_code'] or \
                     player_decision_agents['player_3'].shutdown() == flag_config_dict['failure_code'] or \
@@ -465,7 +540,6 @@ def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_functi
             else:
                 logger.debug("All player agents have been shutdown. ")
                 logger.debug("GAME OVER")
-                return winner
     else:
         if inject_novelty_function:
             if player_decision_agents['player_1'].startup(game_elements, indicator=True) == flag_config_dict['failure_code'] or \
@@ -476,7 +550,9 @@ def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_functi
                 return None
             else:
                 logger.debug("Sucessfully initialized all player agents.")
-                winner = simulate_game_instance(game_elements, history_log_file=None, np_seed=game_seed)
+                winner = simulate_game_instance(game_elements, history_log_file=None, np_seed=game_seed,
+                                                return_game_result=return_game_result, history_level=history_level,
+                                                history_npz_file=history_npz_file)
                 if player_decision_agents['player_1'].shutdown() == flag_config_dict['failure_code'] or \
                         player_decision_agents['player_2'].shutdown() == flag_config_dict['failure_code'] or \
                         player_decision_agents['player_3'].shutdown() == flag_config_dict['failure_code'] or \
@@ -486,7 +562,6 @@ def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_functi
                 else:
                     logger.debug("All player agents have been shutdown. ")
                     logger.debug("GAME OVER")
-                    return winner
         else:
             if player_decision_agents['player_1'].startup(game_elements, indicator=False) == flag_config_dict['failure_code'] or \
                     player_decision_agents['player_2'].startup(game_elements, indicator=False) == flag_config_dict['failure_code'] or \
@@ -496,7 +571,9 @@ def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_functi
                 return None
             else:
                 logger.debug("Sucessfully initialized all player agents.")
-                winner = simulate_game_instance(game_elements, history_log_file=None, np_seed=game_seed)
+                winner = simulate_game_instance(game_elements, history_log_file=None, np_seed=game_seed,
+                                                return_game_result=return_game_result, history_level=history_level,
+                                                history_npz_file=history_npz_file)
                 if player_decision_agents['player_1'].shutdown() == flag_config_dict['failure_code'] or \
                         player_decision_agents['player_2'].shutdown() == flag_config_dict['failure_code'] or \
                         player_decision_agents['player_3'].shutdown() == flag_config_dict['failure_code'] or \
@@ -506,6 +583,10 @@ def play_game_in_tournament(game_seed, novelty_info=False, inject_novelty_functi
                 else:
                     logger.debug("All player agents have been shutdown. ")
                     logger.debug("GAME OVER")
-                    return winner
+
+    # every branch above that gets here played the game and shut the agents down
+    if outcome_cache_dir is not None:
+        outcome_cache.write_cached_result(outcome_cache_dir, cache_key, game_elements['game_result'])
+    return winner
 
 # play_game()
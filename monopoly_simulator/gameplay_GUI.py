@@ -228,11 +228,8 @@ class CreateBoardWindow(Screen):
         :return: None
         """
         logger.debug("size of board "+ str(len(self.game_elem['location_sequence'])))
-        np.random.seed(np_seed)
-        np.random.shuffle(self.game_elem['players'])
-        self.game_elem['seed'] = np_seed
-        self.game_elem['card_seed'] = np_seed
-        self.game_elem['choice_function'] = np.random.choice
+        initialize_game_elements.initialize_random_streams(self.game_elem, np_seed)
+        self.game_elem['player_order_generator'].shuffle(self.game_elem['players'])
 
         num_die_rolls = 0
         # game_elements['go_increment'] = 100 # we should not be modifying this here. It is only for testing purposes.
@@ -272,12 +269,11 @@ class CreateBoardWindow(Screen):
                         continue
                     oot_code = out_of_turn_player.make_out_of_turn_moves(self.game_elem)
                     # add to game history
-                    self.game_elem['history']['function'].append(out_of_turn_player.make_out_of_turn_moves)
-                    params = dict()
-                    params['self']=out_of_turn_player
-                    params['current_gameboard']=self.game_elem
-                    self.game_elem['history']['param'].append(params)
-                    self.game_elem['history']['return'].append(oot_code)
+                    if self.game_elem['history'].summary:
+                        self.game_elem['history'].record(out_of_turn_player.make_out_of_turn_moves,
+                                                         ('self', 'current_gameboard'),
+                                                         (out_of_turn_player, self.game_elem), oot_code,
+                                                         self.game_elem.get('time_step_indicator', 0))
 
                     if oot_code == 2:
                         skip_turn += 1
@@ -289,17 +285,15 @@ class CreateBoardWindow(Screen):
                 # but only if we're not in jail.
 
 
-                r = roll_die(self.game_elem['dies'], np.random.choice)
+                r = roll_die(self.game_elem['dies'], self.game_elem['choice_function'], self.game_elem)
                 self.dice_list = r
                 for i in range(len(r)):
                     self.game_elem['die_sequence'][i].append(r[i])
                 # add to game history
-                self.game_elem['history']['function'].append(roll_die)
-                params = dict()
-                params['die_objects'] = self.game_elem['dies']
-                params['choice'] = np.random.choice
-                self.game_elem['history']['param'].append(params)
-                self.game_elem['history']['return'].append(r)
+                if self.game_elem['history'].summary:
+                    self.game_elem['history'].record(roll_die, ('die_objects', 'choice'),
+                                                     (self.game_elem['dies'], self.game_elem['choice_function']), r,
+                                                     self.game_elem.get('time_step_indicator', 0))
 
                 num_die_rolls += 1
                 self.game_elem['current_die_total'] = sum(r)
@@ -308,33 +302,26 @@ class CreateBoardWindow(Screen):
                     check_for_go = True
                     move_player_after_die_roll(current_player, sum(r), self.game_elem, check_for_go)
                     # add to game history
-                    self.game_elem['history']['function'].append(move_player_after_die_roll)
-                    params = dict()
-                    params['player'] = current_player
-                    params['rel_move'] = sum(r)
-                    params['current_gameboard'] = self.game_elem
-                    params['check_for_go'] = check_for_go
-                    self.game_elem['history']['param'].append(params)
-                    self.game_elem['history']['return'].append(None)
+                    if self.game_elem['history'].summary:
+                        self.game_elem['history'].record(move_player_after_die_roll,
+                                                         ('player', 'rel_move', 'current_gameboard', 'check_for_go'),
+                                                         (current_player, sum(r), self.game_elem, check_for_go), None,
+                                                         self.game_elem.get('time_step_indicator', 0))
 
                     current_player.process_move_consequences(self.game_elem)
                     # add to game history
-                    self.game_elem['history']['function'].append(current_player.process_move_consequences)
-                    params = dict()
-                    params['self'] = current_player
-                    params['current_gameboard'] = self.game_elem
-                    self.game_elem['history']['param'].append(params)
-                    self.game_elem['history']['return'].append(None)
+                    if self.game_elem['history'].summary:
+                        self.game_elem['history'].record(current_player.process_move_consequences,
+                                                         ('self', 'current_gameboard'), (current_player, self.game_elem),
+                                                         None, self.game_elem.get('time_step_indicator', 0))
 
                     # post-roll for current player. No out-of-turn moves allowed at this point.
                     current_player.make_post_roll_moves(self.game_elem)
                     # add to game history
-                    self.game_elem['history']['function'].append(current_player.make_post_roll_moves)
-                    params = dict()
-                    params['self'] = current_player
-                    params['current_gameboard'] = self.game_elem
-                    self.game_elem['history']['param'].append(params)
-                    self.game_elem['history']['return'].append(None)
+                    if self.game_elem['history'].summary:
+                        self.game_elem['history'].record(current_player.make_post_roll_moves, ('self', 'current_gameboard'),
+                                                         (current_player, self.game_elem), None,
+                                                         self.game_elem.get('time_step_indicator', 0))
 
                 else:
                     current_player.currently_in_jail = False # the player is only allowed to skip one turn (i.e. this one)
@@ -342,21 +329,18 @@ class CreateBoardWindow(Screen):
                 if current_player.current_cash < 0:
                     code = current_player.agent.handle_negative_cash_balance(current_player, self.game_elem)
                     # add to game history
-                    self.game_elem['history']['function'].append(current_player.agent.handle_negative_cash_balance)
-                    params = dict()
-                    params['player'] = current_player
-                    params['current_gameboard'] = self.game_elem
-                    self.game_elem['history']['param'].append(params)
-                    self.game_elem['history']['return'].append(code)
+                    if self.game_elem['history'].decisions:
+                        self.game_elem['history'].record(current_player.agent.handle_negative_cash_balance,
+                                                         ('player', 'current_gameboard'), (current_player, self.game_elem),
+                                                         code, self.game_elem.get('time_step_indicator', 0))
                     if code == -1 or current_player.current_cash < 0:
                         current_player.begin_bankruptcy_proceedings(self.game_elem)
                         # add to game history
-                        self.game_elem['history']['function'].append(current_player.begin_bankruptcy_proceedings)
-                        params = dict()
-                        params['self'] = current_player
-                        params['current_gameboard'] = self.game_elem
-                        self.game_elem['history']['param'].append(params)
-                        self.game_elem['history']['return'].append(None)
+                        if self.game_elem['history'].summary:
+                            self.game_elem['history'].record(current_player.begin_bankruptcy_proceedings,
+                                                             ('self', 'current_gameboard'),
+                                                             (current_player, self.game_elem), None,
+                                                             self.game_elem.get('time_step_indicator', 0))
 
                         num_active_players -= 1
                         diagnostics.print_asset_owners(self.game_elem)
@@ -398,10 +382,7 @@ class CreateBoardWindow(Screen):
         return
 
     def disable_history(self):
-        self.game_elem['history'] = dict()
-        self.game_elem['history']['function'] = list()
-        self.game_elem['history']['param'] = list()
-        self.game_elem['history']['return'] = list()
+        self.game_elem['history'].clear()
 
     def update_board(self):
         self.canvas.after.clear()
@@ -9,7 +9,7 @@ import json
 from monopoly_simulator import novelty_generator
 from monopoly_simulator import diagnostics
 from monopoly_simulator.agent import Agent
-import xlsxwriter
+from monopoly_simulator.history_writer import HistoryWriter
 from monopoly_simulator.flag_config import flag_config_dict
 from monopoly_simulator.logging_info import log_file_create
 import os
@@ -20,55 +20,29 @@ import logging
 logger = logging.getLogger('monopoly_simulator.logging_info')
 
 
-def write_history_to_file(game_board, workbook):
-    worksheet = workbook.add_worksheet()
-    col = 0
-    for key in game_board['history']:
-        if key == 'param':
-            col += 1
-            row = 0
-            worksheet.write(row, col, key)
-            worksheet.write(row, col + 1, 'current_player')
-            for item in game_board['history'][key]:
-                worksheet.write(row + 1, col, str(item))
-                try:
-                    worksheet.write(row + 1, col + 1, item['player'].player_name)
-                except:
-                    pass
-                row += 1
-            col += 1
-        else:
-            col += 1
-            row = 0
-            worksheet.write(row, col, key)
-            for item in game_board['history'][key]:
-                worksheet.write(row + 1, col, str(item))
-                row += 1
-    workbook.close()
-    print("History logged into history_log.xlsx file.")
-
-
 def disable_history(game_elements):
-    game_elements['history'] = dict()
-    game_elements['history']['function'] = list()
-    game_elements['history']['param'] = list()
-    game_elements['history']['return'] = list()
-    game_elements['history']['time_step'] = list()
+    game_elements['history'].clear()
 
 
-def simulate_game_instance(game_elements, history_log_file=None, np_seed=7):
+def simulate_game_instance(game_elements, history_log_file=None, np_seed=7, history_level=None, history_window=5000):
     """
     Simulate a game instance.
     :param game_elements: The dict output by set_up_board
-    :param np_seed: The numpy seed to use to control randomness.
+    :param history_log_file: String or None. If given, every event of the game history is streamed to this JSON lines
+    file while the game is played (see history_writer.py).
+    :param np_seed: The numpy seed to use to control randomness. The game draws from its own generators derived from
+    this seed (see initialize_game_elements.initialize_random_streams), the global numpy random state is not used.
+    :param history_level: String or None. If given, the level of the game history (see game_history.py) is set to it
+    before the game starts. The history is serialized for the remote agent, whose view of the game is limited to the
+    events of that level.
+    :param history_window: An integer or None. The game history only keeps (about) this many of the most recent events.
+    Every gameboard sent to the remote agent carries the events recorded since the previous one, so the window only has
+    to cover the events between two requests to the same agent.
     :return: None
     """
     logger.debug("size of board " + str(len(game_elements['location_sequence'])))
-    np.random.seed(np_seed)
-    np.random.shuffle(game_elements['players'])
-    game_elements['seed'] = np_seed
-    game_elements['card_seed'] = np_seed
-    game_elements['choice_function'] = np.random.choice
+    initialize_game_elements.initialize_random_streams(game_elements, np_seed)
+    game_elements['player_order_generator'].shuffle(game_elements['players'])
     count_json = 0   # a counter to keep track of how many rounds the game has to be played before storing the current_state of gameboard to file.
     num_die_rolls = 0
     tot_time = 0
@@ -82,11 +56,15 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=7):
     current_player_index = 0
     num_active_players = 4
     winner = None
-    workbook = None
+    history_writer = None
     if history_log_file:
-        workbook = xlsxwriter.Workbook(history_log_file)
+        history_writer = HistoryWriter(history_log_file)   # every event is streamed to the file as the game goes
+        game_elements['history'].add_writer(history_writer)
     game_elements['start_time'] = time.time()
     game_elements['time_step_indicator'] = 0
+    if history_level is not None:
+        game_elements['history'].set_level(history_level)
+    game_elements['history'].set_max_events(history_window)
 
     while num_active_players > 1:
         # disable_history(
@@ -116,19 +94,11 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=7):
 
             oot_code = out_of_turn_player.make_out_of_turn_moves(game_elements)
 
-            # disable history after every round if out of turn player == player_1 (i.e. TA2 player),
-            # else TA2 wont be able to capture entire history of every game round
-            if out_of_turn_player.player_name == 'player_1':
-                disable_history(game_elements)
-
             # add to game history
-            game_elements['history']['function'].append(out_of_turn_player.make_out_of_turn_moves)
-            params = dict()
-            params['self'] = out_of_turn_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(oot_code)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(out_of_turn_player.make_out_of_turn_moves, ('self', 'current_gameboard'),
+                                                (out_of_turn_player, game_elements), oot_code,
+                                                game_elements['time_step_indicator'])
 
             if oot_code == 2:
                 skip_turn += 1
@@ -143,19 +113,15 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=7):
         logger.debug("Printing cash balance and net worth of each player: ")
         diagnostics.print_player_net_worths_and_cash_bal(game_elements)
 
-        r = action_choices.roll_die(game_elements['dies'], np.random.choice, game_elements)
+        r = action_choices.roll_die(game_elements['dies'], game_elements['choice_function'], game_elements)
         for i in range(len(r)):
             game_elements['die_sequence'][i].append(r[i])
 
         # add to game history
-        game_elements['history']['function'].append(action_choices.roll_die)
-        params = dict()
-        params['die_objects'] = game_elements['dies']
-        params['choice'] = np.random.choice
-        params['current_gameboard'] = game_elements
-        game_elements['history']['param'].append(params)
-        game_elements['history']['return'].append(r)
-        game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+        if game_elements['history'].summary:
+            game_elements['history'].record(action_choices.roll_die, ('die_objects', 'choice', 'current_gameboard'),
+                                            (game_elements['dies'], game_elements['choice_function'], game_elements), r,
+                                            game_elements['time_step_indicator'])
 
         num_die_rolls += 1
         game_elements['current_die_total'] = sum(r)
@@ -164,36 +130,24 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=7):
             check_for_go = True
             game_elements['move_player_after_die_roll'](current_player, sum(r), game_elements, check_for_go)
             # add to game history
-            game_elements['history']['function'].append(game_elements['move_player_after_die_roll'])
-            params = dict()
-            params['player'] = current_player
-            params['rel_move'] = sum(r)
-            params['current_gameboard'] = game_elements
-            params['check_for_go'] = check_for_go
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(None)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(game_elements['move_player_after_die_roll'],
+                                                ('player', 'rel_move', 'current_gameboard', 'check_for_go'),
+                                                (current_player, sum(r), game_elements, check_for_go), None,
+                                                game_elements['time_step_indicator'])
 
             current_player.process_move_consequences(game_elements)
             # add to game history
-            game_elements['history']['function'].append(current_player.process_move_consequences)
-            params = dict()
-            params['self'] = current_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(None)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(current_player.process_move_consequences, ('self', 'current_gameboard'),
+                                                (current_player, game_elements), None, game_elements['time_step_indicator'])
 
             # post-roll for current player. No out-of-turn moves allowed at this point.
             current_player.make_post_roll_moves(game_elements)
             # add to game history
-            game_elements['history']['function'].append(current_player.make_post_roll_moves)
-            params = dict()
-            params['self'] = current_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(None)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(current_player.make_post_roll_moves, ('self', 'current_gameboard'),
+                                                (current_player, game_elements), None, game_elements['time_step_indicator'])
 
         else:
             # current_player.currently_in_jail = False  # the player is only allowed to skip one turn (i.e. this one)
@@ -202,23 +156,16 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=7):
         if current_player.current_cash < 0:
             code = current_player.handle_negative_cash_balance(game_elements)
             # add to game history
-            game_elements['history']['function'].append(current_player.handle_negative_cash_balance)
-            params = dict()
-            params['self'] = current_player
-            params['current_gameboard'] = game_elements
-            game_elements['history']['param'].append(params)
-            game_elements['history']['return'].append(code)
-            game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+            if game_elements['history'].summary:
+                game_elements['history'].record(current_player.handle_negative_cash_balance, ('self', 'current_gameboard'),
+                                                (current_player, game_elements), code, game_elements['time_step_indicator'])
             if code == flag_config_dict['failure_code'] or current_player.current_cash < 0:
                 current_player.begin_bankruptcy_proceedings(game_elements)
                 # add to game history
-                game_elements['history']['function'].append(current_player.begin_bankruptcy_proceedings)
-                params = dict()
-                params['self'] = current_player
-                params['current_gameboard'] = game_elements
-                game_elements['history']['param'].append(params)
-                game_elements['history']['return'].append(None)
-                game_elements['history']['time_step'].append(game_elements['time_step_indicator'])
+                if game_elements['history'].summary:
+                    game_elements['history'].record(current_player.begin_bankruptcy_proceedings,
+                                                    ('self', 'current_gameboard'), (current_player, game_elements), None,
+                                                    game_elements['time_step_indicator'])
 
                 num_active_players -= 1
                 diagnostics.print_asset_owners(game_elements)
@@ -267,8 +214,10 @@ def simulate_game_instance(game_elements, history_log_file=None, np_seed=7):
 
     logger.debug('Liquid Cash remaining with Bank = ' + str(game_elements['bank'].total_cash_with_bank))
 
-    if workbook:
-        write_history_to_file(game_elements, workbook)
+    if history_writer:
+        game_elements['history'].remove_writer(history_writer)
+        num_logged_events = history_writer.close()
+        print("History logged into " + history_log_file + " (" + str(num_logged_events) + " events).")
     # let's print some numbers
     logger.debug('printing final asset owners: ')
     diagnostics.print_asset_owners(game_elements)
@@ -0,0 +1,177 @@
+"""
+This file contains the columnar export of the game history, for analysis across many games. A HistoryColumns object is
+attached to the game history (see game_history.GameHistory.add_writer) and turns every event into one row of a few
+numeric columns:
+    - time_step: the time step of the event,
+    - event_type: a code into event_type_names (the qualified name of the function, e.g., 'Player.charge_player'),
+    - player: a code into player_names, the acting player (the 'player' param, or the player a method was called on), -1 if none,
+    - location: a code into location_names (the 'asset' param, the location a method was called on, or the location of
+    the 'new_position' param), -1 if none,
+    - amount: the 'amount' param (cash paid or received), NaN if none,
+    - description: a code into description_names (the 'description' param of cash transfers, e.g., 'rent'), -1 if none,
+    - return_code: the return value if it is an integer (e.g., the action codes of flag_config.py), no_return_code if not.
+At the end of the game the columns and the name tables are written to a compressed .npz shard (save_npz). The history
+has to be recorded at the level of the events one is interested in: cash transfers (Player.charge_player,
+Player.receive_cash) are only recorded at the 'full' level.
+
+load_history_shards concatenates the shards of many games (with a game column and merged name tables), so that e.g.
+the rent player_2 paid per game is plain array math:
+    h = load_history_shards(npz_files)
+    paid = (h['event_type'] == h['event_type_names'].index('Player.charge_player')) & \\
+           (h['description'] == h['description_names'].index('rent')) & (h['player'] == h['player_names'].index('player_2'))
+    rent_per_game = np.bincount(h['game'][paid], weights=h['amount'][paid], minlength=len(h['game_names']))
+"""
+
+from array import array
+import types
+import numpy as np
+from monopoly_simulator.player import Player
+from monopoly_simulator.location import Location
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.history_export')
+
+no_return_code = -99  # return_code of events whose return value is not an integer
+column_types = (('time_step', 'l', np.int64), ('event_type', 'l', np.int32), ('player', 'l', np.int16),
+                ('location', 'l', np.int16), ('amount', 'd', np.float64), ('description', 'l', np.int16),
+                ('return_code', 'l', np.int32))
+name_tables = ('event_type_names', 'player_names', 'location_names', 'description_names')
+
+
+class HistoryColumns(object):
+    def __init__(self, game_elements):
+        """
+        :param game_elements: A dict. The gameboard whose history is exported. Players are numbered in the order of
+        their names, locations in the order of the board.
+        """
+        self.location_sequence = game_elements['location_sequence']
+        self.columns = {name: array(typecode) for name, typecode, dtype in column_types}
+        self.names = {table: list() for table in name_tables}
+        self.codes = {table: dict() for table in name_tables}  # key is a name, value is its code in the table
+        for player_name in sorted(player.player_name for player in game_elements['players']):
+            self._code('player_names', player_name)
+        for location in self.location_sequence:
+            self._code('location_names', location.name)
+
+    def _code(self, table, name):
+        code = self.codes[table].get(name)
+        if code is None:
+            code = len(self.names[table])
+            self.codes[table][name] = code
+            self.names[table].append(name)
+        return code
+
+    def write_events(self, events):
+        """
+        Add a batch of events as rows of the columns.
+        :param events: A list of (function, param_names, param_values, return_value, time_step) tuples.
+        :return: None
+        """
+        columns = self.columns
+        for function, param_names, param_values, return_value, time_step in events:
+            bound_object = None
+            if isinstance(function, types.MethodType):
+                bound_object = function.__self__
+                function = function.__func__
+            player = -1
+            location = -1
+            amount = float('nan')
+            description = -1
+            for name, value in zip(param_names, param_values):
+                if name == 'player' and isinstance(value, Player):
+                    player = self._code('player_names', value.player_name)
+                elif name == 'asset' and isinstance(value, Location):
+                    location = self._code('location_names', value.name)
+                elif name == 'new_position' and location == -1:
+                    location = self._code('location_names', self.location_sequence[value].name)
+                elif name == 'amount':
+                    amount = float(value)
+                elif name == 'description' and isinstance(value, str):
+                    description = self._code('description_names', value)
+            if player == -1 and isinstance(bound_object, Player):
+                player = self._code('player_names', bound_object.player_name)
+            if location == -1 and isinstance(bound_object, Location):
+                location = self._code('location_names', bound_object.name)
+            return_code = no_return_code
+            if isinstance(return_value, (int, np.integer)):
+                return_code = int(return_value)
+            columns['time_step'].append(time_step)
+            columns['event_type'].append(self._code('event_type_names', function.__qualname__))
+            columns['player'].append(player)
+            columns['location'].append(location)
+            columns['amount'].append(amount)
+            columns['description'].append(description)
+            columns['return_code'].append(return_code)
+
+    def to_arrays(self):
+        """
+        :return: A dict. Key is a column or name table name, value is a numpy array.
+        """
+        arrays = dict()
+        for name, typecode, dtype in column_types:
+            arrays[name] = np.frombuffer(self.columns[name], dtype=self.columns[name].typecode).astype(dtype)
+        for table in name_tables:
+            arrays[table] = np.array(self.names[table], dtype=str)
+        return arrays
+
+    def save_npz(self, npz_file):
+        """
+        Write the columns and name tables to a compressed .npz shard.
+        :param npz_file: String. The path of the shard.
+        :return: An integer. The number of events written.
+        """
+        np.savez_compressed(npz_file, **self.to_arrays())
+        return len(self.columns['time_step'])
+
+
+def export_history(game_elements):
+    """
+    Build the columns of the events that are currently held by the game history (e.g., a history that was kept for a
+    remote agent), instead of attaching a HistoryColumns before the game starts.
+    :param game_elements: A dict. The gameboard.
+    :return: A HistoryColumns object.
+    """
+    history = game_elements['history']
+    history_columns = HistoryColumns(game_elements)
+    events = list()
+    for idx in range(history.num_events()):
+        params = history.get_params(idx)
+        events.append((history.get_function(idx), tuple(params.keys()), tuple(params.values()), history.get_return(idx),
+                       history.get_time_step(idx)))
+    history_columns.write_events(events)
+    return history_columns
+
+
+def load_history_shards(npz_files):
+    """
+    Concatenate the shards of many games. The name tables of the shards are merged (and the codes of every shard mapped
+    to the merged tables), and a game column tells which shard (index into game_names) every row comes from.
+    :param npz_files: A list of paths of .npz shards written by HistoryColumns.save_npz
+    :return: A dict. Key is a column name (plus 'game'), value is a numpy array; or a name table name (plus
+    'game_names', the paths of the shards), value is a list of names.
+    """
+    merged_names = {table: list() for table in name_tables}
+    merged_codes = {table: dict() for table in name_tables}
+    parts = {name: list() for name, typecode, dtype in column_types}
+    parts['game'] = list()
+    for game, npz_file in enumerate(npz_files):
+        with np.load(npz_file) as shard:
+            for table, column in zip(name_tables, ['event_type', 'player', 'location', 'description']):
+                mapping = list()
+                for name in shard[table].tolist():
+                    if name not in merged_codes[table]:
+                        merged_codes[table][name] = len(merged_names[table])
+                        merged_names[table].append(name)
+                    mapping.append(merged_codes[table][name])
+                mapping.append(-1)   # code -1 (none) stays -1
+                parts[column].append(np.array(mapping, dtype=shard[column].dtype)[shard[column]])
+            for name in ['time_step', 'amount', 'return_code']:
+                parts[name].append(shard[name])
+            parts['game'].append(np.full(len(shard['time_step']), game, dtype=np.int32))
+    dtypes = {name: dtype for name, typecode, dtype in column_types}
+    dtypes['game'] = np.int32
+    history = dict()
+    for name in parts:
+        history[name] = np.concatenate(parts[name]) if parts[name] else np.zeros(0, dtype=dtypes[name])
+    history.update(merged_names)
+    history['game_names'] = list(npz_files)
+    return history
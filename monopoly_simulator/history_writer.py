@@ -0,0 +1,127 @@
+"""
+This file contains the streaming history log of a game. A HistoryWriter is attached to the game history (see
+game_history.GameHistory.add_writer) and gets every batch of recorded events as the game goes; a background thread
+encodes the events and appends them to the log file, so the game loop only pays for handing a list over to a queue.
+
+The log is a JSON lines file with one event per line:
+    {"t": 12, "f": "Player.pay", "s": "@player:player_2", "p": {"amount": 50.0, "description": "tax"}, "r": 1}
+t is the time step, f the (qualified) name of the function, s the object a method was called on (if any), p the params
+and r the return value. Players, locations, cards, the bank and the gameboard are written as short references instead of
+their full state: "@player:<player name>", "@location:<location name>", "@card:<card name>", "@bank", "@gameboard", and
+other objects as "@<class name>". A string param that starts with '@' is written with a second '@' in front of it.
+Sets and tuples are written as lists, numpy numbers as plain numbers.
+"""
+
+import json
+import queue
+import threading
+import types
+import numpy as np
+from monopoly_simulator.player import Player
+from monopoly_simulator.location import Location
+from monopoly_simulator.bank import Bank
+from monopoly_simulator.card import Card
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.history_writer')
+
+
+class HistoryWriter(object):
+    def __init__(self, history_log_file, max_pending_batches=256):
+        """
+        Open the log file and start the background thread.
+        :param history_log_file: String. The path of the log file. An existing file is overwritten.
+        :param max_pending_batches: An integer. If the background thread falls this many batches of events behind, the
+        game waits for it, so a slow disk cannot make the pending events grow without bound.
+        """
+        self.history_log_file = history_log_file
+        self.file = open(history_log_file, 'w')
+        self.pending = queue.Queue(maxsize=max_pending_batches)
+        self.num_events = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._write_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def write_events(self, events):
+        """
+        Queue a batch of events to be written.
+        :param events: A list of (function, param_names, param_values, return_value, time_step) tuples. The caller must
+        not modify the list afterwards.
+        :return: None
+        """
+        self.pending.put(events)
+
+    def close(self):
+        """
+        Wait until every queued event has been written, then close the log file.
+        :return: An integer. The number of events written.
+        """
+        self.pending.put(None)
+        self.thread.join()
+        self.file.close()
+        if self.error is not None:
+            logger.error("Writing the history to " + self.history_log_file + " failed: " + repr(self.error))
+            logger.error("Exception")
+            raise Exception
+        return self.num_events
+
+    def _write_loop(self):
+        while True:
+            events = self.pending.get()
+            if events is None:
+                return
+            if self.error is not None:   # keep draining the queue so the game never blocks on a dead writer
+                continue
+            try:
+                lines = list()
+                for event in events:
+                    lines.append(json.dumps(_encode_event(*event), separators=(',', ':')))
+                self.file.write('\n'.join(lines) + '\n')
+                self.num_events += len(events)
+            except Exception as e:
+                self.error = e
+
+
+def _encode_event(function, param_names, param_values, return_value, time_step):
+    event = dict()
+    event['t'] = int(time_step)
+    if isinstance(function, types.MethodType):
+        event['f'] = function.__func__.__qualname__
+        event['s'] = _encode_value(function.__self__)
+    else:
+        event['f'] = function.__qualname__
+    event['p'] = {name: _encode_value(value) for name, value in zip(param_names, param_values)}
+    event['r'] = _encode_value(return_value)
+    return event
+
+
+def _encode_value(value):
+    # containers are copied (list(...)) before they are walked: the copy is taken while holding the GIL, so the game
+    # thread cannot change a set or dict while it is being encoded
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if value.startswith('@'):
+            return '@' + value
+        return value
+    if isinstance(value, Player):
+        return '@player:' + value.player_name
+    if isinstance(value, Location):
+        return '@location:' + value.name
+    if isinstance(value, Card):
+        return '@card:' + value.name
+    if isinstance(value, Bank):
+        return '@bank'
+    if isinstance(value, (np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, dict):
+        if 'type' in value:   # the gameboard
+            return '@gameboard'
+        return {str(_encode_value(k)): _encode_value(v) for k, v in list(value.items())}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_encode_value(item) for item in list(value)]
+    if isinstance(value, (types.FunctionType, types.MethodType)):
+        return '@function:' + value.__name__
+    return '@' + type(value).__name__
@@ -1,6 +1,9 @@
 """
-The only public facing function is initialize_board. All _initialize_* functions are only for internal use. If you
+The main public facing function is initialize_board. All _initialize_* functions are only for internal use. If you
 want to play around, you could always implement your _initialize functions and replace accordingly in initialize_board!
+initialize_random_streams is called by the gameplay files once the game seed is known, right before the game is simulated.
+clone_board is a fast alternative to initialize_board when many games are played with the same schema: the board is
+initialized once (the 'board prototype') and every game gets its own clone of it.
 """
 
 from monopoly_simulator import location
@@ -9,8 +12,10 @@ from monopoly_simulator.bank import Bank
 from monopoly_simulator.card_utility_actions import * # functions from this module will be used in reflections in initialize_board,
                                     # and excluding this import will lead to run-time errors
 import sys
+import numpy as np
 from monopoly_simulator.player import Player
 from monopoly_simulator import card
+from monopoly_simulator.game_history import GameHistory
 import copy
 import logging
 logger = logging.getLogger('monopoly_simulator.logging_info.init_game_elements')
@@ -48,10 +53,124 @@ def initialize_board(game_schema, player_decision_agents):
     _initialize_schema(game_elements)
     logger.debug('Successfully instantiated schema data structures')
 
+    game_elements['undo_stack'] = None  # see undo_stack.py
     game_elements['type'] = "game_elements"
     return game_elements
 
 
+def initialize_random_streams(game_elements, np_seed):
+    """
+    Every game owns its own random number generators, so that several games can be played in the same process (threads,
+    interleaved games etc.) without interfering with each other through the global numpy random state. The game seed is
+    turned into a numpy SeedSequence, which spawns one independent stream each for the player order, the dice, the card
+    draws and the decision agents. The same seed always reproduces the same game.
+    :param game_elements: The dict output by initialize_board. It is modified in place.
+    :param np_seed: An integer. The game seed.
+    :return: None
+    """
+    seed_sequence = np.random.SeedSequence(np_seed)
+    player_order_seq, dice_seq, card_seq, agent_seq = seed_sequence.spawn(4)
+    game_elements['seed'] = np_seed
+    game_elements['player_order_generator'] = np.random.default_rng(player_order_seq)
+    game_elements['dice_generator'] = np.random.default_rng(dice_seq)
+    game_elements['card_generator'] = np.random.default_rng(card_seq)
+    game_elements['agent_generator'] = np.random.default_rng(agent_seq)  # agents that need randomness should draw from this generator
+    game_elements['choice_function'] = game_elements['dice_generator'].choice
+
+
+def clone_board(board_prototype, player_decision_agents):
+    """
+    Create a fresh game_elements dict from a board prototype, i.e. a game_elements dict output by initialize_board that
+    has never been played (its players may have None as their agents). This is much cheaper than initialize_board, since
+    no schema has to be parsed and no functions have to be resolved by reflection: every bank, location, die, card and
+    player object is shallow-copied and all references between them are re-pointed to the copies. The clone shares no
+    mutable state with the prototype, so the prototype can be cloned again for the next game.
+    :param board_prototype: A dict. game_elements output by initialize_board, before any game was played on it.
+    :param player_decision_agents: A dict. Key is a player name, value is the Agent instance assigned to that player.
+    :return: A dict. The new game_elements.
+    """
+    object_map = dict()  # key is id() of an object in the prototype, value is the corresponding object in the clone
+
+    game_elements = dict()
+    game_elements['bank'] = _clone_object(board_prototype['bank'], object_map)
+
+    location_objects = dict()
+    for name, loc in board_prototype['location_objects'].items():
+        location_objects[name] = _clone_object(loc, object_map)
+    game_elements['location_objects'] = location_objects
+    game_elements['location_sequence'] = [object_map[id(loc)] for loc in board_prototype['location_sequence']]
+    color_assets = dict()
+    for color, asset_set in board_prototype['color_assets'].items():
+        color_assets[color] = set([object_map[id(loc)] for loc in asset_set])
+    game_elements['color_assets'] = color_assets
+
+    game_elements['dies'] = [_clone_object(d, object_map) for d in board_prototype['dies']]
+    game_elements['die_sequence'] = [[] for d in board_prototype['dies']]
+
+    game_elements['chance_cards'] = set([_clone_object(c, object_map) for c in board_prototype['chance_cards']])
+    game_elements['community_chest_cards'] = set([_clone_object(c, object_map) for c in board_prototype['community_chest_cards']])
+    chance_card_objects = dict()
+    for name, c in board_prototype['chance_card_objects'].items():
+        chance_card_objects[name] = _clone_object(c, object_map)
+    game_elements['chance_card_objects'] = chance_card_objects
+    community_chest_card_objects = dict()
+    for name, c in board_prototype['community_chest_card_objects'].items():
+        community_chest_card_objects[name] = _clone_object(c, object_map)
+    game_elements['community_chest_card_objects'] = community_chest_card_objects
+    game_elements['picked_chance_cards'] = list()
+    game_elements['picked_community_chest_cards'] = list()
+
+    players = list()
+    for p in board_prototype['players']:
+        player = _clone_object(p, object_map)
+        player.change_decision_agent(player_decision_agents[p.player_name])
+        players.append(player)
+    game_elements['players'] = players
+
+    _initialize_game_history_structs(game_elements)
+    game_elements['undo_stack'] = None  # a clone never shares the undo stack of its prototype
+
+    # everything else (positions, go_increment, schemas, function pointers...) is copied over as is, or deep-copied if mutable
+    for k, v in board_prototype.items():
+        if k in game_elements:
+            continue
+        if isinstance(v, (dict, list, set)):
+            game_elements[k] = copy.deepcopy(v)
+        else:
+            game_elements[k] = v
+
+    return game_elements
+
+
+def _clone_object(obj, object_map):
+    """
+    Shallow-copy obj, give the copy its own copies of any dict, list or set attribute (and of the containers held directly
+    in a dict attribute, like the sets in a player's outstanding_trade_offer), and re-point attributes that refer to objects
+    that were already cloned (e.g., owned_by pointing to the bank, or a card's destination) to their clones.
+    :param obj: the object in the board prototype
+    :param object_map: A dict. Key is id() of a prototype object, value is its clone. Updated in place.
+    :return: the clone of obj
+    """
+    new_obj = copy.copy(obj)
+    for k, v in vars(new_obj).items():
+        if id(v) in object_map:
+            setattr(new_obj, k, object_map[id(v)])
+        elif isinstance(v, dict):
+            new_dict = dict()
+            for k1, v1 in v.items():
+                if isinstance(v1, (dict, list, set)):
+                    new_dict[k1] = v1.copy()
+                else:
+                    new_dict[k1] = v1
+            setattr(new_obj, k, new_dict)
+        elif isinstance(v, list):
+            setattr(new_obj, k, list(v))
+        elif isinstance(v, set):
+            setattr(new_obj, k, set(v))
+    object_map[id(obj)] = new_obj
+    return new_obj
+
+
 def _initialize_bank(game_elements):
     game_elements['bank'] = Bank()
 
@@ -343,11 +462,7 @@ def _initialize_players(game_elements, game_schema, player_decision_agents):
 
 
 def _initialize_game_history_structs(game_elements):
-    game_elements['history'] = dict()
-    game_elements['history']['function'] = list()
-    game_elements['history']['param'] = list()
-    game_elements['history']['return'] = list()
-    game_elements['history']['time_step'] = list()
+    game_elements['history'] = GameHistory()
 
 
 def _initialize_schema(game_elements):
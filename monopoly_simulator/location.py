@@ -47,6 +47,9 @@ class Location(object):
         if self.is_mortgaged:
             cash_owed = self.calculate_mortgage_owed(self, current_gameboard)
 
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self, player)
+
         if cash_due >= cash_owed:
             if current_gameboard['bank'].total_cash_with_bank < cash_due - cash_owed:    # i.e. bank does not have enough money to pay the player what is due
                 logger.debug("Bank has insufficient funds!!!  Rejected Transaction!!")
@@ -56,13 +59,9 @@ class Location(object):
                 if self.is_mortgaged:
                     self.is_mortgaged = False
                 # add to game history
-                current_gameboard['history']['function'].append(player.remove_asset)
-                params = dict()
-                params['self'] = player
-                params['asset'] = self
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.remove_asset, ('self', 'asset'), (player, self), None,
+                                                        current_gameboard['time_step_indicator'])
                 self.owned_by = current_gameboard['bank']
                 return cash_due - cash_owed
 
@@ -71,13 +70,9 @@ class Location(object):
             if self.is_mortgaged:
                 self.is_mortgaged = False
             # add to game history
-            current_gameboard['history']['function'].append(player.remove_asset)
-            params = dict()
-            params['self'] = player
-            params['asset'] = self
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.remove_asset, ('self', 'asset'), (player, self), None,
+                                                    current_gameboard['time_step_indicator'])
             self.owned_by = current_gameboard['bank']
             return 0 # foreclosure.
 
@@ -103,14 +98,10 @@ class Location(object):
 
         self.update_asset_owner(to_player, current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(self.update_asset_owner)
-        params = dict()
-        params['self'] = self
-        params['player'] = to_player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(self.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                (self, to_player, current_gameboard), None,
+                                                current_gameboard['time_step_indicator'])
 
     def update_asset_owner(self, player, current_gameboard):
         """
@@ -123,6 +114,8 @@ class Location(object):
         :return: None
         """
         logger.debug('attempting to update asset '+ self.name+ ' to reflect new owner: '+ player.player_name)
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self, player, self.owned_by)
         if self.loc_class == 'real_estate' or self.loc_class == 'railroad' or self.loc_class == 'utility':
             if self.owned_by == player:
                 logger.debug(player.player_name+' already owns this asset! Raising exception...')
@@ -132,27 +125,20 @@ class Location(object):
                 logger.debug('Asset is owned by '+self.owned_by.player_name+'. Attempting to remove...')
                 self.owned_by.remove_asset(self)
                 # add to game history
-                current_gameboard['history']['function'].append(self.owned_by.remove_asset)
-                params = dict()
-                params['self'] = self.owned_by
-                params['asset'] = self
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(self.owned_by.remove_asset, ('self', 'asset'),
+                                                        (self.owned_by, self), None,
+                                                        current_gameboard['time_step_indicator'])
 
                 self.owned_by = current_gameboard['bank'] # this is temporary, but we want to enforce safe behavior
 
             self.owned_by = player
             player.add_asset(self, current_gameboard) # if the property is mortgaged, this will get reflected in the new owner's portfolio
             # add to game history
-            current_gameboard['history']['function'].append(player.add_asset)
-            params = dict()
-            params['self'] = player
-            params['asset'] = self
-            params['current_gameboard'] = current_gameboard
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(player.add_asset, ('self', 'asset', 'current_gameboard'),
+                                                    (player, self, current_gameboard), None,
+                                                    current_gameboard['time_step_indicator'])
 
             logger.debug('Asset ownership update succeeded.')
         else:
@@ -1,5 +1,8 @@
 import os
 import re
+import json
+
+results_file_name = 'tournament_results.jsonl'    # written into the tournament folder by the parallel tournaments in test_harness.py
 
 
 def generate_win_matrix(path):
@@ -11,6 +14,8 @@ def generate_win_matrix(path):
     :return: the matrix of tournaments vs winner-loser lists is returned. It will be of size number_of_tournaments * number_of_players
     """
     print("\nGenerating tournament win matrix for tournament: " + path)
+    if os.path.isfile(os.path.join(path, results_file_name)):
+        return generate_win_matrix_from_results(os.path.join(path, results_file_name))
     flag = 0
 
     for files in os.listdir(path):
@@ -68,6 +73,8 @@ def generate_rank_matrix(path):
     :return: the matrix of tournaments vs player rank lists is returned. It will be of size number_of_tournaments * number_of_players
     """
     print("\nGenerating tournament rank matrix for tournament: " + path)
+    if os.path.isfile(os.path.join(path, results_file_name)):
+        return generate_rank_matrix_from_results(os.path.join(path, results_file_name))
     flag = 0
     for files in os.listdir(path):
         if "with_novelty_num_games" in files:
@@ -141,3 +148,88 @@ def generate_rank_matrix(path):
         ret_dict['without_novelty'] = tournament_without_novelty_rank_matrix
         return ret_dict
 
+
+def read_game_results(results_file):
+    """
+    Read the game records of a tournament results file (one json line per game, see tournament_runner.py). Partially written
+    lines are skipped, and if a game was recorded more than once only its last record is kept.
+    :param results_file: path to the results file.
+    :return: list of game record dicts, sorted by game index.
+    """
+    game_records = dict()
+    with open(results_file, "r") as fileread:
+        for line in fileread:
+            try:
+                game_record = json.loads(line)
+            except ValueError:
+                continue
+            game_records[game_record['index']] = game_record
+    return [game_records[index] for index in sorted(game_records)]
+
+
+def _player_number(player_name):
+    return int(player_name.split("_")[1])
+
+
+def _split_by_novelty(game_records, matrix_function):
+    """
+    Build one matrix over all game records, or (if some of the games were played with novelty) a dict with a
+    'with_novelty' and a 'without_novelty' matrix, like generate_win_matrix and generate_rank_matrix do.
+    """
+    if not any(game_record.get('novelty') for game_record in game_records):
+        return [matrix_function(game_record) for game_record in game_records]
+    ret_dict = dict()
+    ret_dict['with_novelty'] = [matrix_function(game_record) for game_record in game_records if game_record.get('novelty')]
+    ret_dict['without_novelty'] = [matrix_function(game_record) for game_record in game_records if not game_record.get('novelty')]
+    return ret_dict
+
+
+def _win_list(game_record):
+    winner_list = [0]*4
+    if game_record['winner'] is not None:
+        winner_list[_player_number(game_record['winner'])-1] = 1
+    return winner_list
+
+
+def compute_player_ranks(game_record):
+    """
+    Rank the players of a game. The winner gets rank 1. The other players that were still in the game when it ended (this
+    only happens if the game was terminated by the cash cap) are ranked by their final net worth, and the players that went
+    bankrupt come last, the first one to go bankrupt getting the worst rank.
+    :param game_record: a game record dict (see gameplay.simulate_game_instance).
+    :return: dict. Key is the player name, value is its rank. Empty if the game has no winner.
+    """
+    ranks = dict()
+    if game_record['winner'] is None:
+        return ranks
+    survivors = [p for p in game_record['final_net_worth'] if p != game_record['winner'] and p not in game_record['elimination_order']]
+    survivors.sort(key=lambda p: game_record['final_net_worth'][p], reverse=True)
+    ranking = [game_record['winner']] + survivors + list(reversed(game_record['elimination_order']))
+    for rank in range(len(ranking)):
+        ranks[ranking[rank]] = rank + 1
+    return ranks
+
+
+def _rank_list(game_record):
+    rank_list = [0]*4
+    for player_name, rank in compute_player_ranks(game_record).items():
+        rank_list[_player_number(player_name)-1] = rank
+    return rank_list
+
+
+def generate_win_matrix_from_results(results_file):
+    """
+    Same as generate_win_matrix, but reads the winners from a tournament results file instead of parsing the game logs.
+    :param results_file: path to the tournament_results.jsonl file of a tournament.
+    :return: the matrix of tournaments vs winner-loser lists (or a dict of two such matrices if novelty was injected).
+    """
+    return _split_by_novelty(read_game_results(results_file), _win_list)
+
+
+def generate_rank_matrix_from_results(results_file):
+    """
+    Same as generate_rank_matrix, but reads the ranks from a tournament results file instead of parsing the game logs.
+    :param results_file: path to the tournament_results.jsonl file of a tournament.
+    :return: the matrix of tournaments vs player rank lists (or a dict of two such matrices if novelty was injected).
+    """
+    return _split_by_novelty(read_game_results(results_file), _rank_list)
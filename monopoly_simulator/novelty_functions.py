@@ -19,13 +19,9 @@ def alternate_contingency_function_1(player, card, current_gameboard):
     cost = player.num_total_houses * cost_per_house + player.num_total_hotels * cost_per_hotel
     player.charge_player(cost, current_gameboard, bank_flag=True)
     # add to game history
-    current_gameboard['history']['function'].append(player.charge_player)
-    params = dict()
-    params['self'] = player
-    params['amount'] = cost
-    current_gameboard['history']['param'].append(params)
-    current_gameboard['history']['return'].append(None)
-    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+    if current_gameboard['history'].full:
+        current_gameboard['history'].record(player.charge_player, ('self', 'amount'), (player, cost), None,
+                                            current_gameboard['time_step_indicator'])
 
 def buy_discount_property(player, asset, current_gameboard):
     """
@@ -45,12 +41,9 @@ def buy_discount_property(player, asset, current_gameboard):
         logger.debug(asset.name+' is not owned by Bank! Resetting option_to_buy for player and returning code failure code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['failure_code']
 
@@ -79,60 +72,42 @@ def buy_discount_property(player, asset, current_gameboard):
         starting_player_index = (index_current_player + 1) % len(current_gameboard['players'])  # the next player's index. this player will start the auction
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' is going up for auction since '+ player.player_name+ ' does not have enough cash to purchase this property. Conducting auction and returning failure code')
         bank.Bank.auction(starting_player_index, current_gameboard, asset)
         # add to game history
-        current_gameboard['history']['function'].append(bank.Bank.auction)
-        params = dict()
-        params['self'] = current_gameboard['bank']
-        params['starting_player_index'] = starting_player_index
-        params['current_gameboard'] = current_gameboard
-        params['asset'] = asset
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(bank.Bank.auction,
+                                                ('self', 'starting_player_index', 'current_gameboard', 'asset'),
+                                                (current_gameboard['bank'], starting_player_index, current_gameboard, asset),
+                                                None, current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['failure_code'] # this is a failure code even though you may still succeed in buying the property at auction
     else:
         logger.debug('Charging '+player.player_name+ ' amount '+str(asset.price)+' for asset '+asset.name)
         player.charge_player(asset.price, current_gameboard, bank_flag=True)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = asset.price
-        params['description'] = 'buy property'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                (player, asset.price, 'buy property'), None,
+                                                current_gameboard['time_step_indicator'])
 
         asset.update_asset_owner(player, current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(asset.update_asset_owner)
-        params = dict()
-        params['self'] = asset
-        params['player'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(asset.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                (asset, player, current_gameboard), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' ownership has been updated! Resetting option_to_buy for player and returning code successful action code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['successful_action']
 
@@ -152,12 +127,9 @@ def buy_property_right(player, asset, current_gameboard):
         logger.debug(asset.name+' is not owned by Bank! Resetting option_to_buy for player and returning code failure code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['failure_code']
 
@@ -178,60 +150,42 @@ def buy_property_right(player, asset, current_gameboard):
         starting_player_index = (index_current_player + 1) % len(current_gameboard['players'])  # the next player's index. this player will start the auction
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' is going up for auction since '+ player.player_name+ ' does not have enough cash to purchase this property. Conducting auction and returning failure code')
         bank.Bank.auction(starting_player_index, current_gameboard, asset)
         # add to game history
-        current_gameboard['history']['function'].append(bank.Bank.auction)
-        params = dict()
-        params['self'] = current_gameboard['bank']
-        params['starting_player_index'] = starting_player_index
-        params['current_gameboard'] = current_gameboard
-        params['asset'] = asset
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(bank.Bank.auction,
+                                                ('self', 'starting_player_index', 'current_gameboard', 'asset'),
+                                                (current_gameboard['bank'], starting_player_index, current_gameboard, asset),
+                                                None, current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['failure_code'] # this is a failure code even though you may still succeed in buying the property at auction
     else:
         logger.debug('Charging '+player.player_name+ ' amount '+str(asset.price)+' for asset '+asset.name)
         player.charge_player(asset.price, current_gameboard, bank_flag=True)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = asset.price
-        params['description'] = 'buy property'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                (player, asset.price, 'buy property'), None,
+                                                current_gameboard['time_step_indicator'])
 
         asset.update_asset_owner(player, current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(asset.update_asset_owner)
-        params = dict()
-        params['self'] = asset
-        params['player'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(asset.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                (asset, player, current_gameboard), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' ownership has been updated! Resetting option_to_buy for player and returning code successful action code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['successful_action']
 
@@ -250,12 +204,9 @@ def buy_property_rightplayer(player, asset, current_gameboard):
         logger.debug(asset.name+' is not owned by Bank! Resetting option_to_buy for player and returning code failure code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['failure_code']
 
@@ -283,60 +234,42 @@ def buy_property_rightplayer(player, asset, current_gameboard):
         starting_player_index = (index_current_player + 1) % len(current_gameboard['players'])  # the next player's index. this player will start the auction
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' is going up for auction since '+ player.player_name+ ' does not have enough cash to purchase this property. Conducting auction and returning failure code')
         bank.Bank.auction(starting_player_index, current_gameboard, asset)
         # add to game history
-        current_gameboard['history']['function'].append(bank.Bank.auction)
-        params = dict()
-        params['self'] = current_gameboard['bank']
-        params['starting_player_index'] = starting_player_index
-        params['current_gameboard'] = current_gameboard
-        params['asset'] = asset
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(bank.Bank.auction,
+                                                ('self', 'starting_player_index', 'current_gameboard', 'asset'),
+                                                (current_gameboard['bank'], starting_player_index, current_gameboard, asset),
+                                                None, current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['failure_code'] # this is a failure code even though you may still succeed in buying the property at auction
     else:
         logger.debug('Charging '+player.player_name+ ' amount '+str(asset.price)+' for asset '+asset.name)
         player.charge_player(asset.price, current_gameboard, bank_flag=True)
         # add to game history
-        current_gameboard['history']['function'].append(player.charge_player)
-        params = dict()
-        params['self'] = player
-        params['amount'] = asset.price
-        params['description'] = 'buy property'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                (player, asset.price, 'buy property'), None,
+                                                current_gameboard['time_step_indicator'])
 
         asset.update_asset_owner(player, current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(asset.update_asset_owner)
-        params = dict()
-        params['self'] = asset
-        params['player'] = player
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(asset.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                (asset, player, current_gameboard), None,
+                                                current_gameboard['time_step_indicator'])
 
         logger.debug(asset.name+ ' ownership has been updated! Resetting option_to_buy for player and returning code successful action code')
         player.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(player.reset_option_to_buy)
-        params = dict()
-        params['self'] = player
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(player.reset_option_to_buy, ('self',), (player,), None,
+                                                current_gameboard['time_step_indicator'])
 
         return flag_config.flag_config_dict['successful_action']
 
@@ -411,14 +344,10 @@ def improvePropertyRed_novelty(player, asset, current_gameboard, add_house=True,
                 current_gameboard['bank'].total_houses += asset.num_houses
                 logger.debug('Bank now has ' + str(current_gameboard['bank'].total_houses) + ' houses and ' + str(current_gameboard['bank'].total_hotels) + ' hotels left.')
                 # add to game history
-                current_gameboard['history']['function'].append(player.charge_player)
-                params = dict()
-                params['self'] = player
-                params['amount'] = asset.price_per_house
-                params['description'] = 'improvements'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                        (player, asset.price_per_house, 'improvements'), None,
+                                                        current_gameboard['time_step_indicator'])
 
                 logger.debug('Updating houses and hotels on the asset')
                 asset.num_houses = 0
@@ -459,14 +388,10 @@ def improvePropertyRed_novelty(player, asset, current_gameboard, add_house=True,
                 current_gameboard['bank'].total_houses -= 1
                 logger.debug('Bank now has ' + str(current_gameboard['bank'].total_houses) + ' houses and ' + str(current_gameboard['bank'].total_hotels) + ' hotels left.')
                 # add to game history
-                current_gameboard['history']['function'].append(player.charge_player)
-                params = dict()
-                params['self'] = player
-                params['amount'] = asset.price_per_house
-                params['description'] = 'improvements'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(player.charge_player, ('self', 'amount', 'description'),
+                                                        (player, asset.price_per_house, 'improvements'), None,
+                                                        current_gameboard['time_step_indicator'])
 
                 logger.debug('Updating houses and hotels on the asset')
                 asset.num_houses += 1
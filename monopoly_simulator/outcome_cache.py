@@ -0,0 +1,110 @@
+"""
+This file contains an on-disk cache of game outcomes. A game is fully determined by its seed, the game schema, the novelty
+that is injected into it (if any), the agents that play it and the code of the simulator itself, so its game result dict
+(see gameplay.simulate_game_instance) can be stored under a hash of all of these and reused whenever the same game is
+requested again, e.g., when a new agent is added to a matrix of agents that were already played against each other.
+
+The cache is content-addressed: the key of a game is a sha256 hash over the seed, the content of the schema file, the
+source code of the novelty injection function and of every agent module, and the source code of the simulator modules
+listed in engine_modules. Changing any of these therefore invalidates the cached games it affects, without the need to
+clear the cache by hand. Every cached game is a small json file cache_dir/<first two hex digits>/<key>.json.
+"""
+
+import hashlib
+import inspect
+import importlib
+import json
+import os
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.outcome_cache')
+
+# the simulator modules whose code decides how a game plays out
+engine_modules = ['monopoly_simulator.gameplay', 'monopoly_simulator.initialize_game_elements',
+                  'monopoly_simulator.action_choices', 'monopoly_simulator.card_utility_actions',
+                  'monopoly_simulator.player', 'monopoly_simulator.location', 'monopoly_simulator.bank',
+                  'monopoly_simulator.card', 'monopoly_simulator.dice', 'monopoly_simulator.agent',
+                  'monopoly_simulator.agent_helper_functions', 'monopoly_simulator.novelty_functions',
+                  'monopoly_simulator.novelty_generator', 'monopoly_simulator.flag_config']
+
+_source_hashes = dict()  # key is a module or function name, value is the sha256 hash of its source code
+
+
+def _source_hash(name, obj):
+    if name not in _source_hashes:
+        _source_hashes[name] = hashlib.sha256(inspect.getsource(obj).encode('utf-8')).hexdigest()
+    return _source_hashes[name]
+
+
+def _file_hash(file_path):
+    with open(file_path, 'rb') as fileread:
+        return hashlib.sha256(fileread.read()).hexdigest()
+
+
+def engine_source_hashes():
+    """
+    The source hashes of the simulator modules in engine_modules. They are computed once per process; a tournament
+    that forks its workers (see tournament_runner.fork_server) computes them before forking.
+    :return: A list of hex digests, in the order of engine_modules.
+    """
+    return [_source_hash(module_name, importlib.import_module(module_name)) for module_name in engine_modules]
+
+
+def game_cache_key(game_seed, game_schema_file_path, novelty_info, inject_novelty_function, player_agents):
+    """
+    Compute the cache key of a game.
+    :param game_seed: The numpy seed of the game.
+    :param game_schema_file_path: String. Path to the game schema json file the board is set up from.
+    :param novelty_info: boolean that specifies if the agent will be notified when novelty is injected or not.
+    :param inject_novelty_function: function that injects novelty into the gameboard before the game starts, or None.
+    :param player_agents: A dict. Key is a player name, value is the agent module that player uses.
+    :return: String. The hex digest of the key.
+    """
+    key = dict()
+    key['seed'] = int(game_seed)
+    key['schema'] = _file_hash(game_schema_file_path)
+    key['novelty_info'] = bool(novelty_info)
+    key['novelty'] = None
+    if inject_novelty_function is not None:
+        novelty_function_name = inject_novelty_function.__module__ + '.' + inject_novelty_function.__qualname__
+        key['novelty'] = [novelty_function_name, _source_hash(novelty_function_name, inject_novelty_function)]
+    key['agents'] = dict()
+    for player_name in sorted(player_agents):
+        agent_module = player_agents[player_name]
+        key['agents'][player_name] = [agent_module.__name__, _source_hash(agent_module.__name__, agent_module)]
+    key['engine'] = engine_source_hashes()
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _cache_file(cache_dir, key):
+    return os.path.join(cache_dir, key[0:2], key + '.json')
+
+
+def read_cached_result(cache_dir, key):
+    """
+    Look up a game in the cache.
+    :param cache_dir: String. The cache folder.
+    :param key: String. The cache key of the game (see game_cache_key).
+    :return: The cached game result dict, or None if the game is not in the cache.
+    """
+    try:
+        with open(_cache_file(cache_dir, key), 'r') as fileread:
+            return json.load(fileread)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_cached_result(cache_dir, key, game_result):
+    """
+    Store the result of a game in the cache. The file is written under a temporary name and then renamed, so
+    concurrent workers never read a partially written result.
+    :param cache_dir: String. The cache folder.
+    :param key: String. The cache key of the game (see game_cache_key).
+    :param game_result: A dict. The game result dict built by gameplay.simulate_game_instance.
+    :return: None
+    """
+    cache_file = _cache_file(cache_dir, key)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    temporary_file = cache_file + '.' + str(os.getpid()) + '.tmp'
+    with open(temporary_file, 'w') as filewrite:
+        json.dump(game_result, filewrite)
+    os.replace(temporary_file, cache_file)
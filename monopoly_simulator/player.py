@@ -174,18 +174,17 @@ class Player(object):
         :return: None
         """
         logger.debug('Beginning bankruptcy proceedings for '+self.player_name)
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self)  # the offer dicts are saved with the player
+            current_gameboard['undo_stack'].save_items(current_gameboard, 'chance_cards', 'community_chest_cards')
         self.current_position = None
         self.status = 'lost'
         self.current_cash = 0
         self.discharge_assets_to_bank(current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(self.discharge_assets_to_bank)
-        params = dict()
-        params['self'] = self
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(self.discharge_assets_to_bank, ('self', 'current_gameboard'),
+                                                (self, current_gameboard), None, current_gameboard['time_step_indicator'])
 
         self.num_total_houses = 0
         self.num_total_hotels = 0
@@ -235,6 +234,8 @@ class Player(object):
             logger.error("Exception")
             raise Exception
 
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self)
         self.assets.add(asset)
         logger.debug('total no. of assets now owned by player: '+str(len(self.assets)))
 
@@ -283,6 +284,8 @@ class Player(object):
         when removing the asset. asset.owned_by is not updated either, make sure to invoke it (e.g., to reflect the new owner
         or to hand it over to the bank) AFTER this function returns
         (if you do it before, an exception will be raised, since we check whether the asset is owned by the player)
+        This function does not get the gameboard, so its callers (the Location functions) save the player onto the undo
+        stack (see undo_stack.py) before calling it.
         :param asset: A purchaseable Location instance (railroad, utility or real estate)
         :return: None
         """
@@ -338,6 +341,8 @@ class Player(object):
             raise Exception
         logger.debug(self.player_name+ ' is being charged amount: '+str(amount))
         logger.debug('Before charge, player has cash '+str(self.current_cash))
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self, current_gameboard['bank'] if bank_flag else None)
         self.current_cash -= amount
         logger.debug(self.player_name+ ' now has cash: '+str(self.current_cash))
         if bank_flag:
@@ -354,6 +359,10 @@ class Player(object):
         :return: None
         """
         logger.debug('Discharging assets of '+self.player_name+' to bank.')
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self, current_gameboard['bank'])
+            if self.assets:
+                current_gameboard['undo_stack'].save(*self.assets)
         if self.assets:
             for asset in self.assets: # since asset is returning to bank, we can set its mortgage status to False regardless.
                 logger.debug('discharging asset '+asset.name)
@@ -389,6 +398,8 @@ class Player(object):
         :return: None
         """
         current_location = current_gameboard['location_sequence'][self.current_position] # get the Location object corresponding to player's current position
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self)  # for the option to buy
         if current_location.loc_class == 'do_nothing': # we now look at each location class case by case
             logger.debug(self.player_name+' is on a do_nothing location, namely '+current_location.name+'. Nothing to process. Returning...')
             return
@@ -408,13 +419,10 @@ class Player(object):
                 logger.debug(current_location.name+ ' is owned by '+current_location.owned_by.player_name+' and is not mortgaged. Proceeding to calculate and pay rent.')
                 self.calculate_and_pay_rent_dues(current_gameboard)
                 # add to game history
-                current_gameboard['history']['function'].append(self.calculate_and_pay_rent_dues)
-                params = dict()
-                params['self'] = self
-                params['current_gameboard'] = current_gameboard
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(self.calculate_and_pay_rent_dues, ('self', 'current_gameboard'),
+                                                        (self, current_gameboard), None,
+                                                        current_gameboard['time_step_indicator'])
                 return
 
         elif current_location.loc_class == 'tax':
@@ -422,14 +430,9 @@ class Player(object):
             tax_due = TaxLocation.calculate_tax(current_location, self, current_gameboard)
             self.charge_player(tax_due, current_gameboard, bank_flag=True)
             # add to game history
-            current_gameboard['history']['function'].append(self.charge_player)
-            params = dict()
-            params['self'] = self
-            params['amount'] = tax_due
-            params['description'] = 'tax'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(self.charge_player, ('self', 'amount', 'description'),
+                                                    (self, tax_due, 'tax'), None, current_gameboard['time_step_indicator'])
             return
 
         elif current_location.loc_class == 'railroad':
@@ -448,27 +451,21 @@ class Player(object):
                 logger.debug(current_location.name+ ' is owned by '+ current_location.owned_by.player_name+ ' and is not mortgaged. Proceeding to calculate and pay dues.')
                 dues = RailroadLocation.calculate_railroad_dues(current_location, current_gameboard)
                 # add to game history
-                current_gameboard['history']['function'].append(RailroadLocation.calculate_railroad_dues)
-                params = dict()
-                params['asset'] = current_location
-                params['current_gameboard'] = current_gameboard
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(dues)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(RailroadLocation.calculate_railroad_dues,
+                                                        ('asset', 'current_gameboard'),
+                                                        (current_location, current_gameboard), dues,
+                                                        current_gameboard['time_step_indicator'])
 
                 recipient = current_location.owned_by
                 code = recipient.receive_cash(dues, current_gameboard, bank_flag=False)
                 # add to game history
                 if code == action_choices.flag_config_dict['successful_action']:
-                    current_gameboard['history']['function'].append(recipient.receive_cash)
-                    params = dict()
-                    params['self'] = recipient
-                    params['amount'] = dues
-                    params['number of railroads'] = recipient.num_railroads_possessed
-                    params['description'] = 'railroad dues'
-                    current_gameboard['history']['param'].append(params)
-                    current_gameboard['history']['return'].append(code)
-                    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                    if current_gameboard['history'].full:
+                        current_gameboard['history'].record(recipient.receive_cash,
+                                                            ('self', 'amount', 'number of railroads', 'description'),
+                                                            (recipient, dues, recipient.num_railroads_possessed, 'railroad dues'),
+                                                            code, current_gameboard['time_step_indicator'])
                 else:
                     logger.debug("Not sure what happened! Something broke!")
                     logger.error("Exception")
@@ -476,15 +473,11 @@ class Player(object):
 
                 self.charge_player(dues, current_gameboard, bank_flag=False)
                 # add to game history
-                current_gameboard['history']['function'].append(self.charge_player)
-                params = dict()
-                params['self'] = self
-                params['amount'] = dues
-                params['number of railroads'] = recipient.num_railroads_possessed
-                params['description'] = 'railroad dues'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(self.charge_player,
+                                                        ('self', 'amount', 'number of railroads', 'description'),
+                                                        (self, dues, recipient.num_railroads_possessed, 'railroad dues'),
+                                                        None, current_gameboard['time_step_indicator'])
                 return
 
         elif current_location.loc_class == 'utility':
@@ -503,28 +496,21 @@ class Player(object):
                 logger.debug(current_location.name+ ' is owned by '+ current_location.owned_by.player_name+ ' and is not mortgaged. Proceeding to calculate and pay dues.')
                 dues = UtilityLocation.calculate_utility_dues(current_location, current_gameboard, current_gameboard['current_die_total'])
                 # add to game history
-                current_gameboard['history']['function'].append(UtilityLocation.calculate_utility_dues)
-                params = dict()
-                params['asset'] = current_location
-                params['current_gameboard'] = current_gameboard
-                params['die_total'] = current_gameboard['current_die_total']
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(dues)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(UtilityLocation.calculate_utility_dues,
+                                                        ('asset', 'current_gameboard', 'die_total'),
+                                                        (current_location, current_gameboard, current_gameboard['current_die_total']),
+                                                        dues, current_gameboard['time_step_indicator'])
 
                 recipient = current_location.owned_by
                 code = recipient.receive_cash(dues, current_gameboard, bank_flag=False)
                 # add to game history
                 if code == action_choices.flag_config_dict['successful_action']:
-                    current_gameboard['history']['function'].append(recipient.receive_cash)
-                    params = dict()
-                    params['self'] = recipient
-                    params['amount'] = dues
-                    params['number of utilities'] = recipient.num_utilities_possessed
-                    params['description'] = 'utility dues'
-                    current_gameboard['history']['param'].append(params)
-                    current_gameboard['history']['return'].append(code)
-                    current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                    if current_gameboard['history'].full:
+                        current_gameboard['history'].record(recipient.receive_cash,
+                                                            ('self', 'amount', 'number of utilities', 'description'),
+                                                            (recipient, dues, recipient.num_utilities_possessed, 'utility dues'),
+                                                            code, current_gameboard['time_step_indicator'])
                 else:
                     logger.debug("Not sure what happened! Something broke!")
                     logger.error("Exception")
@@ -532,28 +518,21 @@ class Player(object):
 
                 self.charge_player(dues, current_gameboard, bank_flag=False)
                 # add to game history
-                current_gameboard['history']['function'].append(self.charge_player)
-                params = dict()
-                params['self'] = self
-                params['amount'] = dues
-                params['number of utilities'] = recipient.num_utilities_possessed
-                params['description'] = 'utility dues'
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(None)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].full:
+                    current_gameboard['history'].record(self.charge_player,
+                                                        ('self', 'amount', 'number of utilities', 'description'),
+                                                        (self, dues, recipient.num_utilities_possessed, 'utility dues'),
+                                                        None, current_gameboard['time_step_indicator'])
                 return
 
         elif current_location.loc_class == 'action':
             logger.debug(self.player_name+ ' is on an action location, namely '+ current_location.name+ '. Performing action...')
             current_location.perform_action(self, current_gameboard)
             # add to game history
-            current_gameboard['history']['function'].append(current_location.perform_action)
-            params = dict()
-            params['player'] = self
-            params['current_gameboard'] = current_gameboard
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(current_location.perform_action, ('player', 'current_gameboard'),
+                                                    (self, current_gameboard), None,
+                                                    current_gameboard['time_step_indicator'])
             return
 
         else:
@@ -570,6 +549,8 @@ class Player(object):
         """
         logger.debug('Player is currently in position '+current_gameboard['location_sequence'][self.current_position].name)
         logger.debug(' and is moving to position '+current_gameboard['location_sequence'][new_position].name)
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self)
         self.current_position = new_position
 
     def send_to_jail(self, current_gameboard):
@@ -580,6 +561,8 @@ class Player(object):
         """
         logger.debug(self.player_name+' is being sent to jail.')
         jail_position = current_gameboard['jail_position']
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self)
         card_utility_actions._set_send_to_jail(self, current_gameboard)
         self.current_position = jail_position
 
@@ -593,26 +576,19 @@ class Player(object):
         logger.debug('calculating and paying rent dues for '+ self.player_name+ ' who is in property '+current_loc.name+' which is owned by '+current_loc.owned_by.player_name)
         rent = RealEstateLocation.calculate_rent(current_loc, current_gameboard)
         # add to game history
-        current_gameboard['history']['function'].append(RealEstateLocation.calculate_rent)
-        params = dict()
-        params['asset'] = current_loc
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(rent)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(RealEstateLocation.calculate_rent, ('asset', 'current_gameboard'),
+                                                (current_loc, current_gameboard), rent,
+                                                current_gameboard['time_step_indicator'])
 
         recipient = current_loc.owned_by
         code = recipient.receive_cash(rent, current_gameboard, bank_flag=False)
         # add to game history
         if code == action_choices.flag_config_dict['successful_action']:
-            current_gameboard['history']['function'].append(recipient.receive_cash)
-            params = dict()
-            params['self'] = recipient
-            params['amount'] = rent
-            params['description'] = 'rent'
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(recipient.receive_cash, ('self', 'amount', 'description'),
+                                                    (recipient, rent, 'rent'), None,
+                                                    current_gameboard['time_step_indicator'])
         else:
             logger.debug("Not sure what happened! Something broke!")
             logger.error("Exception")
@@ -620,14 +596,9 @@ class Player(object):
 
         self.charge_player(rent, current_gameboard, bank_flag=False)
         # add to game history
-        current_gameboard['history']['function'].append(self.charge_player)
-        params = dict()
-        params['self'] = self
-        params['amount'] = rent
-        params['description'] = 'rent'
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(self.charge_player, ('self', 'amount', 'description'), (self, rent, 'rent'),
+                                                None, current_gameboard['time_step_indicator'])
 
     def receive_cash(self, amount, current_gameboard, bank_flag=False):
         """
@@ -640,6 +611,8 @@ class Player(object):
             logger.error("Exception")
             raise Exception
 
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self, current_gameboard['bank'] if bank_flag else None)
         if bank_flag:
             if current_gameboard['bank'].total_cash_with_bank - amount >= 0:
                 logger.debug(self.player_name+ ' is receiving amount: '+ str(amount))
@@ -939,19 +912,18 @@ class Player(object):
 
         t = (action_to_execute, parameters_temp)
         # add to game history
-        current_gameboard['history']['function'].append(self.agent.make_pre_roll_move)
-        params = dict()
-        params['player'] = self
-        params['current_gameboard'] = current_gameboard
-        params['allowable_moves'] = allowable_actions
         if isinstance(code, int):
             code = [code]
-        params['code'] = code
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(t)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].decisions:
+            current_gameboard['history'].record(self.agent.make_pre_roll_move,
+                                                ('player', 'current_gameboard', 'allowable_moves', 'code'),
+                                                (self, current_gameboard, allowable_actions, code), t,
+                                                current_gameboard['time_step_indicator'])
 
         if action_to_execute == 'skip_turn':
+            if current_gameboard['undo_stack'] is not None and \
+                    (self.is_property_offer_outstanding or self.is_trade_offer_outstanding):
+                current_gameboard['undo_stack'].save(self)
             if self.is_property_offer_outstanding:
                 # player is clearly unwilling to accept the offer, so we negate it
                 self.is_property_offer_outstanding = False
@@ -974,6 +946,9 @@ class Player(object):
         while count < 4: # the player is allowed up to 4 actions before we force conclude actions.
             count += 1
             if action_to_execute == "concluded_actions":
+                if current_gameboard['undo_stack'] is not None and \
+                        (self.is_property_offer_outstanding or self.is_trade_offer_outstanding):
+                    current_gameboard['undo_stack'].save(self)
                 if self.is_property_offer_outstanding:
                     # player is clearly unwilling to accept the offer, so we negate it
                     self.is_property_offer_outstanding = False
@@ -1023,19 +998,18 @@ class Player(object):
 
                 t = (action_to_execute, parameters_temp)
                 # add to game history
-                current_gameboard['history']['function'].append(self.agent.make_pre_roll_move)
-                params = dict()
-                params['player'] = self
-                params['current_gameboard'] = current_gameboard
-                params['allowable_moves'] = allowable_actions
                 if isinstance(code, int):
                     code = [code]
-                params['code'] = code
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(t)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].decisions:
+                    current_gameboard['history'].record(self.agent.make_pre_roll_move,
+                                                        ('player', 'current_gameboard', 'allowable_moves', 'code'),
+                                                        (self, current_gameboard, allowable_actions, code), t,
+                                                        current_gameboard['time_step_indicator'])
 
         # if we got here, we resolve property offers and move on.
+        if current_gameboard['undo_stack'] is not None and \
+                (self.is_property_offer_outstanding or self.is_trade_offer_outstanding):
+            current_gameboard['undo_stack'].save(self)
         if self.is_property_offer_outstanding:
             # player is clearly unwilling to accept the offer, so we negate it
             self.is_property_offer_outstanding = False
@@ -1089,19 +1063,18 @@ class Player(object):
 
         t = (action_to_execute, parameters_temp)
         # add to game history
-        current_gameboard['history']['function'].append(self.agent.make_out_of_turn_move)
-        params = dict()
-        params['player'] = self
-        params['current_gameboard'] = current_gameboard
-        params['allowable_moves'] = allowable_actions
         if isinstance(code, int):
             code = [code]
-        params['code'] = code
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(t)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].decisions:
+            current_gameboard['history'].record(self.agent.make_out_of_turn_move,
+                                                ('player', 'current_gameboard', 'allowable_moves', 'code'),
+                                                (self, current_gameboard, allowable_actions, code), t,
+                                                current_gameboard['time_step_indicator'])
 
         if action_to_execute == "skip_turn":
+            if current_gameboard['undo_stack'] is not None and \
+                    (self.is_property_offer_outstanding or self.is_trade_offer_outstanding):
+                current_gameboard['undo_stack'].save(self)
             if self.is_property_offer_outstanding:
                 # player is clearly unwilling to accept the offer, so we negate it
                 self.is_property_offer_outstanding = False
@@ -1124,6 +1097,9 @@ class Player(object):
         while count < 4:  # the player is allowed up to 4 actions before we force conclude actions.
             count += 1
             if action_to_execute == "concluded_actions":
+                if current_gameboard['undo_stack'] is not None and \
+                        (self.is_property_offer_outstanding or self.is_trade_offer_outstanding):
+                    current_gameboard['undo_stack'].save(self)
                 if self.is_property_offer_outstanding:
                     # player is clearly unwilling to accept the offer, so we negate it
                     self.is_property_offer_outstanding = False
@@ -1173,19 +1149,18 @@ class Player(object):
 
                 t = (action_to_execute, parameters_temp)
                 # add to game history
-                current_gameboard['history']['function'].append(self.agent.make_out_of_turn_move)
-                params = dict()
-                params['player'] = self
-                params['current_gameboard'] = current_gameboard
-                params['allowable_moves'] = allowable_actions
                 if isinstance(code, int):
                     code = [code]
-                params['code'] = code
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(t)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].decisions:
+                    current_gameboard['history'].record(self.agent.make_out_of_turn_move,
+                                                        ('player', 'current_gameboard', 'allowable_moves', 'code'),
+                                                        (self, current_gameboard, allowable_actions, code), t,
+                                                        current_gameboard['time_step_indicator'])
 
         # if we got here, we resolve property offers and move on.
+        if current_gameboard['undo_stack'] is not None and \
+                (self.is_property_offer_outstanding or self.is_trade_offer_outstanding):
+            current_gameboard['undo_stack'].save(self)
         if self.is_property_offer_outstanding:
             # player is clearly unwilling to accept the offer, so we negate it
             self.is_property_offer_outstanding = False
@@ -1230,17 +1205,13 @@ class Player(object):
 
         t = (action_to_execute, parameters_temp)
         # add to game history
-        current_gameboard['history']['function'].append(self.agent.make_post_roll_move)
-        params = dict()
-        params['player'] = self
-        params['current_gameboard'] = current_gameboard
-        params['allowable_moves'] = allowable_actions
         if isinstance(code, int):
             code = [code]
-        params['code'] = code
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(t)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].decisions:
+            current_gameboard['history'].record(self.agent.make_post_roll_move,
+                                                ('player', 'current_gameboard', 'allowable_moves', 'code'),
+                                                (self, current_gameboard, allowable_actions, code), t,
+                                                current_gameboard['time_step_indicator'])
 
         if action_to_execute == "concluded_actions":
             self._force_buy_outcome(current_gameboard) # if option to buy is not set, this will make no difference.
@@ -1268,17 +1239,13 @@ class Player(object):
 
                 t = (action_to_execute, parameters_temp)
                 # add to game history
-                current_gameboard['history']['function'].append(self.agent.make_post_roll_move)
-                params = dict()
-                params['player'] = self
-                params['current_gameboard'] = current_gameboard
-                params['allowable_moves'] = allowable_actions
                 if isinstance(code, int):
                     code = [code]
-                params['code'] = code
-                current_gameboard['history']['param'].append(params)
-                current_gameboard['history']['return'].append(t)
-                current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+                if current_gameboard['history'].decisions:
+                    current_gameboard['history'].record(self.agent.make_post_roll_move,
+                                                        ('player', 'current_gameboard', 'allowable_moves', 'code'),
+                                                        (self, current_gameboard, allowable_actions, code), t,
+                                                        current_gameboard['time_step_indicator'])
                 # logger.debug(action_to_execute)
 
         self._force_buy_outcome(current_gameboard) # if we got here, we need to conclude actions
@@ -1315,18 +1282,19 @@ class Player(object):
 
         while successful_tries > 0:
             action_to_execute, parameters = self.agent.handle_negative_cash_balance(self, current_gameboard)
+            if action_to_execute is not None and action_to_execute != "make_trade_offer":
+                # the history keeps a snapshot of the params, so they are populated (in place) before they are recorded
+                action_to_execute_temp = Player._resolve_function_names_to_pointers(action_to_execute, self, current_gameboard)
+                parameters_temp = Player._populate_param_dict(parameters, self, current_gameboard)
             t = (action_to_execute, parameters)
             # add to game history
-            current_gameboard['history']['function'].append(self.agent.handle_negative_cash_balance)
-            params = dict()
-            params['player'] = self
-            params['current_gameboard'] = current_gameboard
             if isinstance(code, int):
                 code = [code]
-            params['code'] = code
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(t)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].decisions:
+                current_gameboard['history'].record(self.agent.handle_negative_cash_balance,
+                                                    ('player', 'current_gameboard', 'code'),
+                                                    (self, current_gameboard, code), t,
+                                                    current_gameboard['time_step_indicator'])
 
             if action_to_execute is None:
                 return parameters    # done handling negative cash balance, parameters will be an int (successful action code or failure code
@@ -1336,8 +1304,6 @@ class Player(object):
                     code = action_choices.flag_config_dict['failure_code']
                     logger.debug("Cannot make a trade offer while handling negative cash balance!!!")
                 else:
-                    action_to_execute_temp = Player._resolve_function_names_to_pointers(action_to_execute, self, current_gameboard)
-                    parameters_temp = Player._populate_param_dict(parameters, self, current_gameboard)
                     code = self._execute_action(action_to_execute_temp, parameters_temp, current_gameboard)
                     logger.debug('Received code '+ str(code)+ '. Continuing iteration...')
 
@@ -1370,14 +1336,13 @@ class Player(object):
         if self._option_to_buy is True:
             self._own_or_auction(current_gameboard, current_gameboard['location_sequence'][self.current_position])
 
+        if current_gameboard['undo_stack'] is not None:
+            current_gameboard['undo_stack'].save(self)
         self.reset_option_to_buy()
         # add to game history
-        current_gameboard['history']['function'].append(self.reset_option_to_buy)
-        params = dict()
-        params['self'] = self
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(None)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(self.reset_option_to_buy, ('self',), (self,), None,
+                                                current_gameboard['time_step_indicator'])
         return
 
     def _own_or_auction(self, current_gameboard, asset):
@@ -1392,27 +1357,19 @@ class Player(object):
 
         dec = self.agent.make_buy_property_decision(self, current_gameboard, asset) # your agent has to make a decision here
         # add to game history
-        current_gameboard['history']['function'].append(self.agent.make_buy_property_decision)
-        params = dict()
-        params['asset'] = asset
-        params['player'] = self
-        params['current_gameboard'] = current_gameboard
-        current_gameboard['history']['param'].append(params)
-        current_gameboard['history']['return'].append(dec)
-        current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+        if current_gameboard['history'].full:
+            current_gameboard['history'].record(self.agent.make_buy_property_decision,
+                                                ('asset', 'player', 'current_gameboard'), (asset, self, current_gameboard),
+                                                dec, current_gameboard['time_step_indicator'])
 
         logger.debug(self.player_name+' decides to purchase? '+str(dec))
         if dec is True:
             asset.update_asset_owner(self, current_gameboard)
             # add to game history
-            current_gameboard['history']['function'].append(asset.update_asset_owner)
-            params = dict()
-            params['self'] = asset
-            params['player'] = self
-            params['current_gameboard'] = current_gameboard
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(asset.update_asset_owner, ('self', 'player', 'current_gameboard'),
+                                                    (asset, self, current_gameboard), None,
+                                                    current_gameboard['time_step_indicator'])
             return
 
         else:
@@ -1423,15 +1380,11 @@ class Player(object):
             # worry about conducting a valid auction in this function.
             Bank.auction(starting_player_index, current_gameboard, asset)
             # add to game history
-            current_gameboard['history']['function'].append(Bank.auction)
-            params = dict()
-            params['self'] = current_gameboard['bank']
-            params['starting_player_index'] = starting_player_index
-            params['current_gameboard'] = current_gameboard
-            params['asset'] = asset
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(None)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].full:
+                current_gameboard['history'].record(Bank.auction,
+                                                    ('self', 'starting_player_index', 'current_gameboard', 'asset'),
+                                                    (current_gameboard['bank'], starting_player_index, current_gameboard, asset),
+                                                    None, current_gameboard['time_step_indicator'])
             return
 
     def _execute_action(self, action_to_execute, parameters, current_gameboard):
@@ -1448,20 +1401,17 @@ class Player(object):
         """
         logger.debug('Executing _execute_action for '+ self.player_name)
         if parameters:
+            if current_gameboard['undo_stack'] is not None:   # e.g., the to_player of make_sell_property_offer
+                current_gameboard['undo_stack'].save(*[v for v in parameters.values() if isinstance(v, Player)])
             p = action_to_execute(**parameters)
             # add to game history
-            current_gameboard['history']['function'].append(action_to_execute)
-            params = parameters.copy()
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(p)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].summary:
+                current_gameboard['history'].record(action_to_execute, tuple(parameters.keys()), tuple(parameters.values()), p,
+                                                    current_gameboard['time_step_indicator'])
             return p
         else:
             p = action_to_execute()
             # add to game history
-            current_gameboard['history']['function'].append(action_to_execute)
-            params = dict()
-            current_gameboard['history']['param'].append(params)
-            current_gameboard['history']['return'].append(p)
-            current_gameboard['history']['time_step'].append(current_gameboard['time_step_indicator'])
+            if current_gameboard['history'].summary:
+                current_gameboard['history'].record(action_to_execute, (), (), p, current_gameboard['time_step_indicator'])
             return p
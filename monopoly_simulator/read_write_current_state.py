@@ -9,6 +9,7 @@ from monopoly_simulator.card_utility_actions import * # functions from this modu
 import sys
 from monopoly_simulator.player import Player
 from monopoly_simulator import card
+from monopoly_simulator.game_history import GameHistory
 from monopoly_simulator import action_choices
 from monopoly_simulator.flag_config import flag_config_dict
 
@@ -34,6 +35,7 @@ def read_in_current_state_from_file(infile, player_decision_agents):
     _initialize_dies(current_gameboard, game_schema)
     _initialize_cards(current_gameboard, game_schema)
     _initialize_game_history_structs(current_gameboard)
+    current_gameboard['undo_stack'] = None  # see undo_stack.py
     current_gameboard['type'] = "current_gameboard"
     return current_gameboard
 
@@ -726,8 +728,4 @@ def _initialize_cards(current_gameboard, game_schema):
 
 
 def _initialize_game_history_structs(current_gameboard):
-    current_gameboard['history'] = dict()
-    current_gameboard['history']['function'] = list()
-    current_gameboard['history']['param'] = list()
-    current_gameboard['history']['return'] = list()
-    current_gameboard['history']['time_step'] = list()
+    current_gameboard['history'] = GameHistory()
@@ -1,9 +1,12 @@
 import json
+import weakref
 import numpy
 from monopoly_simulator.player import Player
 from monopoly_simulator.bank import Bank
 from monopoly_simulator.location import Location, RealEstateLocation, UtilityLocation, RailroadLocation
 
+_history_cache = dict()  # the serialized events of the history that was serialized last (see _serialized_history_events)
+
 
 def _prune_serialize_history(pruned_gameboard_serial_obj):
     del pruned_gameboard_serial_obj['bank']
@@ -27,192 +30,226 @@ def _prune_serialize_history(pruned_gameboard_serial_obj):
     return pruned_gameboard_serial_obj
 
 
-def _serialize_history(current_gameboard):
-    history = list()
-
-    for idx in range(len(current_gameboard['history']['function'])):
-        hist_dict = dict()
-        func_name = current_gameboard['history']['function'][idx].__name__
-        hist_dict['function'] = func_name
+def _serialize_history_event(history, idx):
+    hist_dict = dict()
+    func_name = history.get_function(idx).__name__
+    hist_dict['function'] = func_name
 
-        param_obj = current_gameboard['history']['param'][idx]
-        hist_dict['param'] = dict()
+    param_obj = history.get_params(idx)
+    hist_dict['param'] = dict()
 
-        for k, v in param_obj.items():
-            if k == 'player':
+    for k, v in param_obj.items():
+        if k == 'player':
+            hist_dict['param'][k] = v.player_name
+        elif k == 'allowable_moves':
+            hist_dict['param'][k] = list(v)
+        elif k == 'code':
+            hist_dict['param'][k] = v
+        elif k == 'asset':
+            hist_dict['param'][k] = v.name
+        elif k == 'self':
+            if isinstance(v, Player):
                 hist_dict['param'][k] = v.player_name
-            elif k == 'allowable_moves':
-                hist_dict['param'][k] = list(v)
-            elif k == 'code':
-                hist_dict['param'][k] = v
-            elif k == 'asset':
+            elif isinstance(v, Location):
                 hist_dict['param'][k] = v.name
-            elif k == 'self':
-                if isinstance(v, Player):
-                    hist_dict['param'][k] = v.player_name
-                elif isinstance(v, Location):
-                    hist_dict['param'][k] = v.name
-                elif isinstance(v, Bank):
-                    hist_dict['param'][k] = 'bank'
-                else:
-                    print('This self is not included. Please add to history!', v)
-            elif k == 'amount':
-                hist_dict['param'][k] = float(v)
-            elif k == 'current_gameboard':
-                hist_dict['param'][k] = 'current_gameboard'
-            elif k == 'from_player':
-                if v is not None:
-                    hist_dict['param'][k] = v.player_name
-                else:
-                    hist_dict['param'][k] = None
-            elif k == 'to_player':
-                if v is not None:
-                    hist_dict['param'][k] = v.player_name
-                else:
-                    hist_dict['param'][k] = None
-            elif k == 'offer':
+            elif isinstance(v, Bank):
+                hist_dict['param'][k] = 'bank'
+            else:
+                print('This self is not included. Please add to history!', v)
+        elif k == 'amount':
+            hist_dict['param'][k] = float(v)
+        elif k == 'current_gameboard':
+            hist_dict['param'][k] = 'current_gameboard'
+        elif k == 'from_player':
+            if v is not None:
+                hist_dict['param'][k] = v.player_name
+            else:
+                hist_dict['param'][k] = None
+        elif k == 'to_player':
+            if v is not None:
+                hist_dict['param'][k] = v.player_name
+            else:
+                hist_dict['param'][k] = None
+        elif k == 'offer':
+            hist_dict['param'][k] = dict()
+            for k1, v1 in v.items():
+                if k1 == 'property_set_offered' or k1 == 'property_set_wanted':
+                    hist_dict['param'][k][k1] = list()
+                    for prop in v1:
+                        hist_dict['param'][k][k1].append(prop.name)
+                elif k1 == 'cash_offered' or k1 == 'cash_wanted':
+                    hist_dict['param'][k][k1] = float(v1)
+        elif k == 'add_house':
+            hist_dict['param'][k] = v
+        elif k == 'add_hotel':
+            hist_dict['param'][k] = v
+        elif k == 'rel_move':
+            hist_dict['param'][k] = int(v)
+        elif k == 'new_position':
+            hist_dict['param'][k] = int(v)
+        elif k == 'check_for_go':
+            hist_dict['param'][k] = v
+        elif k == 'die_total':
+            hist_dict['param'][k] = int(v)
+        elif k == 'card':
+            hist_dict['param'][k] = v.name
+        elif k == 'current_bid':
+            hist_dict['param'][k] = float(v)
+        elif k == 'pack':
+            hist_dict['param'][k] = v
+        elif k == "starting_player_index":
+            hist_dict['param'][k] = v
+        elif k == 'die_objects' or k == 'choice':
+            pass
+        elif k == 'description':
+            hist_dict['param'][k] = v
+        elif k == 'number of railroads':
+            hist_dict['param'][k] = v
+        elif k == 'number of utilities':
+            hist_dict['param'][k] = v
+        elif k == 'sell_house':
+            hist_dict['param'][k] = v
+        elif k == 'sell_hotel':
+            hist_dict['param'][k] = v
+        #------------------------phase2------------------------
+        elif k == 'schema_type':
+            hist_dict['param'][k] = v
+        elif k == 'action_params_dict':
+            if v is not None:
                 hist_dict['param'][k] = dict()
                 for k1, v1 in v.items():
-                    if k1 == 'property_set_offered' or k1 == 'property_set_wanted':
-                        hist_dict['param'][k][k1] = list()
-                        for prop in v1:
-                            hist_dict['param'][k][k1].append(prop.name)
-                    elif k1 == 'cash_offered' or k1 == 'cash_wanted':
-                        hist_dict['param'][k][k1] = float(v1)
-            elif k == 'add_house':
-                hist_dict['param'][k] = v
-            elif k == 'add_hotel':
-                hist_dict['param'][k] = v
-            elif k == 'rel_move':
-                hist_dict['param'][k] = int(v)
-            elif k == 'new_position':
-                hist_dict['param'][k] = int(v)
-            elif k == 'check_for_go':
-                hist_dict['param'][k] = v
-            elif k == 'die_total':
-                hist_dict['param'][k] = int(v)
-            elif k == 'card':
-                hist_dict['param'][k] = v.name
-            elif k == 'current_bid':
-                hist_dict['param'][k] = float(v)
-            elif k == 'pack':
-                hist_dict['param'][k] = v
-            elif k == "starting_player_index":
-                hist_dict['param'][k] = v
-            elif k == 'die_objects' or k == 'choice':
-                pass
-            elif k == 'description':
-                hist_dict['param'][k] = v
-            elif k == 'number of railroads':
-                hist_dict['param'][k] = v
-            elif k == 'number of utilities':
-                hist_dict['param'][k] = v
-            elif k == 'sell_house':
-                hist_dict['param'][k] = v
-            elif k == 'sell_hotel':
-                hist_dict['param'][k] = v
-            #------------------------phase2------------------------
-            elif k == 'schema_type':
-                hist_dict['param'][k] = v
-            elif k == 'action_params_dict':
-                if v is not None:
-                    hist_dict['param'][k] = dict()
-                    for k1, v1 in v.items():
-                        if k1 == 'location':
-                            hist_dict['param'][k][k1] = v1.name
-            ### add interaction serialization
-            elif k == 'interaction_params_dict':
-                if v is not None:
-                    hist_dict['param'][k] = dict()
-                    for k1, v1 in v.items():
-                        if k1 == 'location':
-                            hist_dict['param'][k][k1] = v1.name
-                        elif k1 == 'to_location':
-                            hist_dict['param'][k][k1] = v1.name
-                        elif k1 == 'from_player':
-                            hist_dict['param'][k][k1] = v1.player_name
-            # elif k == 'interactions':
-            #     if v is not None:
-            #         hist_dict['param'][k] = dict()
-            #         for k1, v1 in v.items():
-            #             hist_dict['param'][k][k1] = v1
-            # elif k == 'interaction_id' or 'decision':
-            #     hist_dict['param'][k] = v
-            #------------------------------------------------------
-            else:
-                print('This param object not included, key: ', k, " value: ", v, " function name: ", func_name)
-
-        return_obj = current_gameboard['history']['return'][idx]
-
-        if return_obj is None:
-            hist_dict['return'] = None
-        elif isinstance(return_obj, int):
-            hist_dict['return'] = int(return_obj)
-        elif isinstance(return_obj, list):   # list of code
-            hist_dict['return'] = list()
-            for i in return_obj:
-                hist_dict['return'].append(int(i))
-        elif isinstance(return_obj, float):    # amounts
-            hist_dict['return'] = float(return_obj)
-        elif isinstance(return_obj, numpy.int64):    # random generator
-            hist_dict['return'] = int(return_obj)
-        elif isinstance(return_obj, bool):              # return from make_buy_property_offer()
-            hist_dict['return'] = return_obj
-        elif isinstance(return_obj, tuple):     # return from agent is a tuple of (action to execute, params)
-            hist_dict['return'] = dict()
-            for item in return_obj:
-                if isinstance(item, list):   # trade offer tuples contain 2 lists (for trade offers to multiple players)
-                    function_list = list()
-                    param_list = list()
-                    for f in item:                             # --> one for the function, the other for params
-                        if not isinstance(f, dict):             # names of action to execute
-                            function_list.append(f)
-                        else:
-                            prm_dict = dict()                   # trade offer params
-                            for k, v in f.items():
-                                if k == 'from_player':
-                                    prm_dict[k] = v.player_name
-                                elif k == 'to_player':
-                                    prm_dict[k] = v.player_name
-                                elif k == 'offer':
-                                    prm_dict[k] = dict()
-                                    for k1, v1 in v.items():
-                                        if k1 == 'property_set_offered' or k1 == 'property_set_wanted':
-                                            prm_dict[k][k1] = list()
-                                            for prop in v1:
-                                                prm_dict[k][k1].append(prop.name)
-                                        elif k1 == 'cash_offered' or k1 == 'cash_wanted':
-                                            prm_dict[k][k1] = float(v1)
-                            param_list.append(prm_dict)
-                    hist_dict['return']['function'] = function_list
-                    hist_dict['return']['param'] = param_list
-                elif isinstance(item, int):
-                    hist_dict['return']['param'] = item     # handle negative cash balance returns (None, int) if it is done handling negative cash balance
-                elif item is None:
-                    hist_dict['return']['function'] = None    # handle negative cash balance returns (None, int) if it is done handling negative cash balance
-                elif isinstance(item, str):
-                    hist_dict['return']['function'] = item
-                elif isinstance(item, dict):
-                    hist_dict['return']['param'] = dict()
-                    for k, v in item.items():
-                        if k == 'player':
-                            hist_dict['return']['param'][k] = v.player_name
-                        elif k == 'asset':
-                            hist_dict['return']['param'][k] = v.name
-                        elif k == 'code':
-                            hist_dict['return']['param'][k] = v
-
-                else:
-                    print("This return val not included in return history ", item)
+                    if k1 == 'location':
+                        hist_dict['param'][k][k1] = v1.name
+        ### add interaction serialization
+        elif k == 'interaction_params_dict':
+            if v is not None:
+                hist_dict['param'][k] = dict()
+                for k1, v1 in v.items():
+                    if k1 == 'location':
+                        hist_dict['param'][k][k1] = v1.name
+                    elif k1 == 'to_location':
+                        hist_dict['param'][k][k1] = v1.name
+                    elif k1 == 'from_player':
+                        hist_dict['param'][k][k1] = v1.player_name
+        # elif k == 'interactions':
+        #     if v is not None:
+        #         hist_dict['param'][k] = dict()
+        #         for k1, v1 in v.items():
+        #             hist_dict['param'][k][k1] = v1
+        # elif k == 'interaction_id' or 'decision':
+        #     hist_dict['param'][k] = v
+        #------------------------------------------------------
         else:
-            print("This return val not included in return history: ", return_obj, type(return_obj))
-        hist_dict['time_step'] = current_gameboard['history']['time_step'][idx]
-        history.append(hist_dict)
-    return history
+            print('This param object not included, key: ', k, " value: ", v, " function name: ", func_name)
+
+    return_obj = history.get_return(idx)
+
+    if return_obj is None:
+        hist_dict['return'] = None
+    elif isinstance(return_obj, int):
+        hist_dict['return'] = int(return_obj)
+    elif isinstance(return_obj, list):   # list of code
+        hist_dict['return'] = list()
+        for i in return_obj:
+            hist_dict['return'].append(int(i))
+    elif isinstance(return_obj, float):    # amounts
+        hist_dict['return'] = float(return_obj)
+    elif isinstance(return_obj, numpy.int64):    # random generator
+        hist_dict['return'] = int(return_obj)
+    elif isinstance(return_obj, bool):              # return from make_buy_property_offer()
+        hist_dict['return'] = return_obj
+    elif isinstance(return_obj, tuple):     # return from agent is a tuple of (action to execute, params)
+        hist_dict['return'] = dict()
+        for item in return_obj:
+            if isinstance(item, list):   # trade offer tuples contain 2 lists (for trade offers to multiple players)
+                function_list = list()
+                param_list = list()
+                for f in item:                             # --> one for the function, the other for params
+                    if not isinstance(f, dict):             # names of action to execute
+                        function_list.append(f)
+                    else:
+                        prm_dict = dict()                   # trade offer params
+                        for k, v in f.items():
+                            if k == 'from_player':
+                                prm_dict[k] = v.player_name
+                            elif k == 'to_player':
+                                prm_dict[k] = v.player_name
+                            elif k == 'offer':
+                                prm_dict[k] = dict()
+                                for k1, v1 in v.items():
+                                    if k1 == 'property_set_offered' or k1 == 'property_set_wanted':
+                                        prm_dict[k][k1] = list()
+                                        for prop in v1:
+                                            prm_dict[k][k1].append(prop.name)
+                                    elif k1 == 'cash_offered' or k1 == 'cash_wanted':
+                                        prm_dict[k][k1] = float(v1)
+                        param_list.append(prm_dict)
+                hist_dict['return']['function'] = function_list
+                hist_dict['return']['param'] = param_list
+            elif isinstance(item, int):
+                hist_dict['return']['param'] = item     # handle negative cash balance returns (None, int) if it is done handling negative cash balance
+            elif item is None:
+                hist_dict['return']['function'] = None    # handle negative cash balance returns (None, int) if it is done handling negative cash balance
+            elif isinstance(item, str):
+                hist_dict['return']['function'] = item
+            elif isinstance(item, dict):
+                hist_dict['return']['param'] = dict()
+                for k, v in item.items():
+                    if k == 'player':
+                        hist_dict['return']['param'][k] = v.player_name
+                    elif k == 'asset':
+                        hist_dict['return']['param'][k] = v.name
+                    elif k == 'code':
+                        hist_dict['return']['param'][k] = v
+
+            else:
+                print("This return val not included in return history ", item)
+    else:
+        print("This return val not included in return history: ", return_obj, type(return_obj))
+    hist_dict['time_step'] = history.get_time_step(idx)
+    return hist_dict
 
 
-def serialize_gameboard(current_gameboard):
-    history_serial_obj = _serialize_history(current_gameboard)
+def _serialized_history_events(history):
+    """
+    Bring the cache of serialized history events up to date and return it. Only the events recorded since the last call
+    are serialized; the events the history dropped since then (by clearing it or by its window) are dropped from the
+    cache, and a different history (e.g., of the next game) starts a new cache.
+    :param history: A game_history.GameHistory object.
+    :return: A list. The serialized event of every event held by the history, in order.
+    """
+    if _history_cache.get('history') is None or _history_cache['history']() is not history:
+        _history_cache['history'] = weakref.ref(history)
+        _history_cache['first_event'] = history.first_event_number()
+        _history_cache['events'] = list()
+    events = _history_cache['events']
+    first_event = history.first_event_number()
+    if first_event > _history_cache['first_event']:
+        del events[:first_event - _history_cache['first_event']]
+        _history_cache['first_event'] = first_event
+    for idx in range(len(events), history.num_events()):
+        events.append(_serialize_history_event(history, idx))
+    return events
+
+
+def _serialize_history(current_gameboard, reader=None):
+    history = current_gameboard['history']
+    if reader is None:
+        indices = range(history.num_events())
+    else:
+        indices = history.new_event_indices(reader)   # only the events the reader has not seen yet
+    return _serialized_history_events(history)[indices.start:indices.stop]
+
+
+def serialize_gameboard(current_gameboard, reader=None):
+    """
+    Serialize the gameboard for a remote agent.
+    :param current_gameboard: A dict. The global data structure representing the current game board.
+    :param reader: If given (usually the name of the player the gameboard is sent to), the serialized history only holds
+    the events recorded since the last gameboard serialized for this reader, instead of every event of the history.
+    :return: A dict. The serialized gameboard.
+    """
+    history_serial_obj = _serialize_history(current_gameboard, reader)
     current_gameboard_serial_obj = dict()
     bank_serial_obj = current_gameboard['bank'].serialize()
     players_serial_obj = dict()
@@ -265,8 +302,75 @@ def serialize_gameboard(current_gameboard):
     current_gameboard_serial_obj['schema'] = current_gameboard['schema']
     #-----------------------------------------------------------------------
     current_gameboard_serial_obj['history'] = history_serial_obj
+    current_gameboard_serial_obj['history_level'] = current_gameboard['history'].level   # which events the history holds
     pruned_gameboard_serial_obj = _prune_serialize_history(current_gameboard_serial_obj)
     with open('result.json', 'w') as fp:
         json.dump(pruned_gameboard_serial_obj, fp)
     fp.close()
     return pruned_gameboard_serial_obj
+
+
+def gameboard_delta(old_serial_obj, new_serial_obj):
+    """
+    Compute what changed between two serialized gameboards, so that a remote agent that already has the old one can be
+    sent only the changes (see apply_gameboard_delta). A delta is a dict with (some of) the keys:
+        - 'set': a dict of the entries that are new or whose value was replaced,
+        - 'del': a list of the keys of the entries that were removed,
+        - 'sub': a dict of the entries holding a dict or list that changed only in part, each with its own delta; the
+        delta of a list that only grew is {'append': the new items}.
+    :param old_serial_obj: A dict. The serialized gameboard the remote agent has.
+    :param new_serial_obj: A dict. The serialized gameboard to send.
+    :return: A dict. The delta (empty if nothing changed).
+    """
+    return _dict_delta(old_serial_obj, new_serial_obj)
+
+
+def apply_gameboard_delta(serial_obj, delta):
+    """
+    Apply a delta computed by gameboard_delta to the old serialized gameboard, in place.
+    :param serial_obj: A dict. The old serialized gameboard. It is turned into the new one.
+    :param delta: A dict. The delta.
+    :return: A dict. serial_obj.
+    """
+    if 'set' in delta:
+        serial_obj.update(delta['set'])
+    for key in delta.get('del', list()):
+        del serial_obj[key]
+    for key, sub_delta in delta.get('sub', dict()).items():
+        if 'append' in sub_delta:
+            serial_obj[key].extend(sub_delta['append'])
+        else:
+            apply_gameboard_delta(serial_obj[key], sub_delta)
+    return serial_obj
+
+
+_unchanged = object()
+_replaced = object()
+
+
+def _dict_delta(old, new):
+    delta = dict()
+    for key, value in new.items():
+        if key in old:
+            sub_delta = _value_delta(old[key], value)
+            if sub_delta is _unchanged:
+                continue
+            if sub_delta is not _replaced:
+                delta.setdefault('sub', dict())[key] = sub_delta
+                continue
+        delta.setdefault('set', dict())[key] = value
+    deleted = [key for key in old if key not in new]
+    if deleted:
+        delta['del'] = deleted
+    return delta
+
+
+def _value_delta(old, new):
+    if type(old) is dict and type(new) is dict:
+        delta = _dict_delta(old, new)
+        return delta if delta else _unchanged
+    if type(old) is list and type(new) is list and 0 < len(old) < len(new) and new[:len(old)] == old:
+        return {'append': new[len(old):]}   # e.g., the die rolls
+    if type(old) is type(new) and old == new:
+        return _unchanged
+    return _replaced
@@ -1,6 +1,8 @@
 from monopoly_simulator.agent import Agent
 import socket
-from monopoly_simulator.serialization import serialize_gameboard
+from monopoly_simulator.serialization import serialize_gameboard, gameboard_delta
+from monopoly_simulator.framed_socket import FramedSocket
+import copy
 import json
 import sys
 import logging
@@ -49,21 +51,89 @@ def _populate_param_dict(param_dict, player, current_gameboard):
     return param_dict
 
 
+_resync_function = 'resync_gameboard'   # what a client in delta mode replies with if it cannot apply a delta
+
+
+def _is_resync_request(return_from_client):
+    """
+    Check whether the reply of the client is a resync request ({"function": "resync_gameboard"}) rather than the answer
+    to the request. Most answers are JSON too, but some (e.g., of make_buy_property_decision) are not.
+    :param return_from_client: A string. The reply of the client.
+    :return: A Boolean.
+    """
+    try:
+        result = json.loads(return_from_client)
+    except ValueError:
+        return False
+    return isinstance(result, dict) and result.get('function') == _resync_function
+
+
+def _send_request(agent, serial_dict_to_client, serial_gameboard, current_gameboard):
+    """
+    Send a decision request with the serialized gameboard to the client and return its reply. If the agent plays in delta
+    mode (see ServerAgent), the gameboard is sent as the changes since the gameboard of the last request the client
+    replied to, and the history as the events the client has not been sent yet, to append to its history; a client that
+    cannot apply the changes replies with a resync request, and the request is sent again with the full gameboard.
+    :param agent: The ServerAgent.
+    :param serial_dict_to_client: A dict. The request, without the gameboard.
+    :param serial_gameboard: A dict. The gameboard serialized for the player (its history only holds the new events).
+    :param current_gameboard: A dict. The gameboard, to serialize in full (with every event of its history) for a
+    client that does not have it.
+    :return: A string. The reply of the client.
+    """
+    if agent.delta_gameboard and agent.acked_gameboard is not None:
+        serial_dict_to_client['gameboard_delta'] = _gameboard_delta(agent, serial_gameboard)
+        serial_dict_to_client['base_version'] = agent.gameboard_version
+    elif agent.delta_gameboard:
+        serial_dict_to_client['current_gameboard'] = serialize_gameboard(current_gameboard)
+    else:
+        serial_dict_to_client['current_gameboard'] = serial_gameboard
+    if agent.delta_gameboard:
+        serial_dict_to_client['gameboard_version'] = agent.gameboard_version + 1
+    string_serial_dict_to_client = json.dumps(serial_dict_to_client)
+    agent.conn.send_message(string_serial_dict_to_client)
+    return_from_client = agent.conn.recv_message()
+
+    if agent.delta_gameboard:
+        if _is_resync_request(return_from_client):
+            logger.debug('Client asked for the full gameboard. Resending the request with it.')
+            serial_dict_to_client.pop('gameboard_delta', None)
+            serial_dict_to_client.pop('base_version', None)
+            serial_dict_to_client['current_gameboard'] = serialize_gameboard(current_gameboard)
+            string_serial_dict_to_client = json.dumps(serial_dict_to_client)
+            agent.conn.send_message(string_serial_dict_to_client)
+            return_from_client = agent.conn.recv_message()
+        _acknowledge_gameboard(agent, serial_gameboard)
+    return return_from_client
+
+
+def _gameboard_delta(agent, serial_gameboard):
+    # the client appends the new events to the history it has; the rest of the gameboard is compared with the last one
+    delta = gameboard_delta(agent.acked_gameboard, dict(serial_gameboard, history=list()))
+    if serial_gameboard['history']:
+        delta.setdefault('sub', dict())['history'] = {'append': serial_gameboard['history']}
+    return delta
+
+
+def _acknowledge_gameboard(agent, serial_gameboard):
+    # the schema is the gameboard's own dict (not a copy made by serialize_gameboard), so it is copied to notice changes.
+    # The history is not kept: the client has every event it was sent, and is only sent new ones
+    agent.acked_gameboard = dict(serial_gameboard, history=list())
+    agent.acked_gameboard['schema'] = copy.deepcopy(serial_gameboard['schema'])
+    agent.gameboard_version += 1
+
+
 def make_pre_roll_move(player, current_gameboard, allowable_moves, code):
     current_gameboard['time_step_indicator'] += 1
-    serial_gameboard = serialize_gameboard(current_gameboard)
+    serial_gameboard = serialize_gameboard(current_gameboard, player.player_name)
     serial_dict_to_client = dict()
     serial_dict_to_client['player'] = player.player_name
-    serial_dict_to_client['current_gameboard'] = serial_gameboard
     serial_dict_to_client['allowable_moves'] = list(allowable_moves)
     serial_dict_to_client['code'] = code
 
     serial_dict_to_client['function'] = "make_pre_roll_move"
-    string_serial_dict_to_client = json.dumps(serial_dict_to_client)
-    player.agent.conn.sendall(bytes(string_serial_dict_to_client, encoding="utf-8"))
-
-    return_from_client = player.agent.conn.recv(50024)
-    result = json.loads(return_from_client.decode("utf-8"))
+    return_from_client = _send_request(player.agent, serial_dict_to_client, serial_gameboard, current_gameboard)
+    result = json.loads(return_from_client)
     func_name = result['function']
     param_dict = result['param_dict']
 
@@ -72,19 +142,15 @@ def make_pre_roll_move(player, current_gameboard, allowable_moves, code):
 
 def make_out_of_turn_move(player, current_gameboard, allowable_moves, code):
     current_gameboard['time_step_indicator'] += 1
-    serial_gameboard = serialize_gameboard(current_gameboard)
+    serial_gameboard = serialize_gameboard(current_gameboard, player.player_name)
     serial_dict_to_client = dict()
     serial_dict_to_client['player'] = player.player_name
-    serial_dict_to_client['current_gameboard'] = serial_gameboard
     serial_dict_to_client['allowable_moves'] = list(allowable_moves)
     serial_dict_to_client['code'] = code
 
     serial_dict_to_client['function'] = "make_out_of_turn_move"
-    string_serial_dict_to_client = json.dumps(serial_dict_to_client)
-    player.agent.conn.sendall(bytes(string_serial_dict_to_client, encoding="utf-8"))
-
-    return_from_client = player.agent.conn.recv(50024)
-    result = json.loads(return_from_client.decode("utf-8"))
+    return_from_client = _send_request(player.agent, serial_dict_to_client, serial_gameboard, current_gameboard)
+    result = json.loads(return_from_client)
     func_name = result['function']
     param_dict = result['param_dict']
     if func_name == 'make_trade_offer' and 'current_gameboard' not in param_dict:
@@ -95,19 +161,15 @@ def make_out_of_turn_move(player, current_gameboard, allowable_moves, code):
 
 def make_post_roll_move(player, current_gameboard, allowable_moves, code):
     current_gameboard['time_step_indicator'] += 1
-    serial_gameboard = serialize_gameboard(current_gameboard)
+    serial_gameboard = serialize_gameboard(current_gameboard, player.player_name)
     serial_dict_to_client = dict()
     serial_dict_to_client['player'] = player.player_name
-    serial_dict_to_client['current_gameboard'] = serial_gameboard
     serial_dict_to_client['allowable_moves'] = list(allowable_moves)
     serial_dict_to_client['code'] = code
 
     serial_dict_to_client['function'] = "make_post_roll_move"
-    string_serial_dict_to_client = json.dumps(serial_dict_to_client)
-    player.agent.conn.sendall(bytes(string_serial_dict_to_client, encoding="utf-8"))
-
-    return_from_client = player.agent.conn.recv(50024)
-    result = json.loads(return_from_client.decode("utf-8"))
+    return_from_client = _send_request(player.agent, serial_dict_to_client, serial_gameboard, current_gameboard)
+    result = json.loads(return_from_client)
     func_name = result['function']
     param_dict = result['param_dict']
 
@@ -116,52 +178,40 @@ def make_post_roll_move(player, current_gameboard, allowable_moves, code):
 
 def make_buy_property_decision(player, current_gameboard, asset):
     current_gameboard['time_step_indicator'] += 1
-    serial_gameboard = serialize_gameboard(current_gameboard)
+    serial_gameboard = serialize_gameboard(current_gameboard, player.player_name)
     serial_dict_to_client = dict()
     serial_dict_to_client['player'] = player.player_name
-    serial_dict_to_client['current_gameboard'] = serial_gameboard
     serial_dict_to_client['asset'] = asset.name
 
     serial_dict_to_client['function'] = "make_buy_property_decision"
-    string_serial_dict_to_client = json.dumps(serial_dict_to_client)
-    player.agent.conn.sendall(bytes(string_serial_dict_to_client, encoding="utf-8"))
-
-    return_from_client = player.agent.conn.recv(50024)
-    buy_prop_decision_flag = bool(return_from_client.decode("utf-8"))
+    return_from_client = _send_request(player.agent, serial_dict_to_client, serial_gameboard, current_gameboard)
+    buy_prop_decision_flag = bool(return_from_client)
     return buy_prop_decision_flag
 
 
 def make_bid(player, current_gameboard, asset, current_bid):
     current_gameboard['time_step_indicator'] += 1
-    serial_gameboard = serialize_gameboard(current_gameboard)
+    serial_gameboard = serialize_gameboard(current_gameboard, player.player_name)
     serial_dict_to_client = dict()
     serial_dict_to_client['player'] = player.player_name
-    serial_dict_to_client['current_gameboard'] = serial_gameboard
     serial_dict_to_client['asset'] = asset.name
     serial_dict_to_client['current_bid'] = current_bid
 
     serial_dict_to_client['function'] = "make_bid"
-    string_serial_dict_to_client = json.dumps(serial_dict_to_client)
-    player.agent.conn.sendall(bytes(string_serial_dict_to_client, encoding="utf-8"))
-
-    return_from_client = player.agent.conn.recv(50024)
-    bid_amt = float(return_from_client.decode("utf-8"))
+    return_from_client = _send_request(player.agent, serial_dict_to_client, serial_gameboard, current_gameboard)
+    bid_amt = float(return_from_client)
     return bid_amt
 
 
 def handle_negative_cash_balance(player, current_gameboard):
     current_gameboard['time_step_indicator'] += 1
-    serial_gameboard = serialize_gameboard(current_gameboard)
+    serial_gameboard = serialize_gameboard(current_gameboard, player.player_name)
     serial_dict_to_client = dict()
     serial_dict_to_client['player'] = player.player_name
-    serial_dict_to_client['current_gameboard'] = serial_gameboard
 
     serial_dict_to_client['function'] = "handle_negative_cash_balance"
-    string_serial_dict_to_client = json.dumps(serial_dict_to_client)
-    player.agent.conn.sendall(bytes(string_serial_dict_to_client, encoding="utf-8"))
-
-    return_from_client = player.agent.conn.recv(50024)
-    result = json.loads(return_from_client.decode("utf-8"))
+    return_from_client = _send_request(player.agent, serial_dict_to_client, serial_gameboard, current_gameboard)
+    result = json.loads(return_from_client)
     func_name = result['function']
     param_dict = result['param_dict']
 
@@ -187,21 +237,30 @@ class ServerAgent(Agent):
     and send the result back to the ServerAgent.
     """
 
-    def __init__(self, address=('localhost', 6010), authkey=b"password"):
+    def __init__(self, address=('localhost', 6010), authkey=b"password", delta_gameboard=False):
         """
         Create a new ServerAgent on a particular port. If you are playing a game with multiple server agents, make sure
         each is operating on a different port.
         @param address: Tuple, the address and port number. Defaults to localhost:6000
         @param authkey: Byte string, the password used to authenticate the client. Defaults to "password"
+        @param delta_gameboard: Boolean. If True, the full serialized gameboard is only sent at startup (and whenever
+        the client asks for it); every decision request carries the changes since the gameboard of the last request the
+        client replied to instead ('gameboard_delta', see serialization.gameboard_delta), with 'base_version' (the
+        version of the gameboard the changes apply to) and 'gameboard_version'. The history events of a request are sent
+        as an append to the history of the client's gameboard, which thus holds every event since startup. The client
+        must support it (the ClientAgent of client_agent_serial.py does).
         """
         super().__init__(**_build_decision_agent_methods_dict())
+        self.delta_gameboard = delta_gameboard
+        self.acked_gameboard = None   # the serialized gameboard of the last request the client replied to
+        self.gameboard_version = 0
         print("Waiting for connection...")
         self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.listener.bind((address[0], address[1]))
         self.listener.listen()
         conn, addr = self.listener.accept()
-        self.conn = conn
+        self.conn = FramedSocket(conn)
         print('Connection accepted by client')
 
     def __getstate__(self):
@@ -209,21 +268,35 @@ class ServerAgent(Agent):
         out = self.__dict__.copy()
         out['listener'] = None
         out['conn'] = None
+        out['acked_gameboard'] = None
         return out
 
+    def resync_gameboard(self):
+        """Send the full serialized gameboard with the next request (delta mode only)."""
+        self.acked_gameboard = None
+
     def startup(self, current_gameboard, indicator=None):
         """Performs normal Agent startup and signals for the client agent to do the same"""
         print("startup")
         super().startup(current_gameboard, indicator)
-        serial_gameboard = serialize_gameboard(current_gameboard)
+        # serialized for the player, so that the requests only carry the history events recorded after this gameboard
+        reader = None
+        for player in current_gameboard['players']:
+            if player.agent is self:
+                reader = player.player_name
+        serial_gameboard = serialize_gameboard(current_gameboard, reader)
         serial_dict_to_client = dict()
         serial_dict_to_client['current_gameboard'] = serial_gameboard
         serial_dict_to_client['indicator'] = indicator
         serial_dict_to_client['function'] = "startup"
+        if self.delta_gameboard:   # the full gameboard of the game, the requests send changes to it
+            serial_dict_to_client['gameboard_version'] = self.gameboard_version + 1
         json_serial_dict_to_client = json.dumps(serial_dict_to_client)
-        self.conn.sendall(bytes(json_serial_dict_to_client, encoding="utf-8"))
-        return_from_client = self.conn.recv(1024)
-        result = return_from_client.decode("utf-8")
+        self.conn.send_message(json_serial_dict_to_client)
+        return_from_client = self.conn.recv_message()
+        if self.delta_gameboard:
+            _acknowledge_gameboard(self, serial_gameboard)
+        result = return_from_client
         return result
 
     def shutdown(self):
@@ -232,11 +305,11 @@ class ServerAgent(Agent):
         serial_dict_to_client = dict()
         serial_dict_to_client['function'] = "shutdown"
         json_serial_dict_to_client = json.dumps(serial_dict_to_client)
-        self.conn.sendall(bytes(json_serial_dict_to_client, encoding="utf-8"))
-        return_from_client = self.conn.recv(1024)
+        self.conn.send_message(json_serial_dict_to_client)
+        return_from_client = self.conn.recv_message()
 
-        return_from_client_cha = str(return_from_client.decode("utf-8"))[0]
-        return_from_client_string = str(return_from_client.decode("utf-8"))
+        return_from_client_cha = return_from_client[0]
+        return_from_client_string = return_from_client
         logger.debug("return_from_client_cha = " + return_from_client_cha)
         logger.debug("return_from_client_string = " + return_from_client_string)
         if return_from_client_cha == '1':
@@ -254,7 +327,7 @@ class ServerAgent(Agent):
         serial_dict_to_client = dict()
         serial_dict_to_client['function'] = "end_tournament"
         json_serial_dict_to_client = json.dumps(serial_dict_to_client)
-        self.conn.sendall(bytes(json_serial_dict_to_client, encoding="utf-8"))
+        self.conn.send_message(json_serial_dict_to_client)
         self.conn.close()
         self.listener.close()
         return super().shutdown()
@@ -264,7 +337,7 @@ class ServerAgent(Agent):
         serial_dict_to_client = dict()
         serial_dict_to_client['function'] = "start_tournament"
         json_serial_dict_to_client = json.dumps(serial_dict_to_client)
-        self.conn.sendall(bytes(json_serial_dict_to_client, encoding="utf-8"))
-        return_from_client = self.conn.recv(1024)
-        result = int(return_from_client.decode("utf-8"))
+        self.conn.send_message(json_serial_dict_to_client)
+        return_from_client = self.conn.recv_message()
+        result = int(return_from_client)
         return result
@@ -3,11 +3,19 @@ from monopoly_simulator import gameplay, action_choices, novelty_functions
 from monopoly_simulator import gameplay_socket
 from monopoly_simulator import novelty_generator
 from monopoly_simulator import background_agent_v3_1
+from monopoly_simulator import background_agent_v3_1_action_novelty
+from monopoly_simulator import background_agent_v3_1_interaction_accept_offer
+from monopoly_simulator import background_agent_v3_1_interaction_make_offer
+from monopoly_simulator import metrics_helper
 from monopoly_simulator.server_agent_serial import ServerAgent
 from monopoly_simulator.logging_info import log_file_create
+from monopoly_simulator import tournament_runner
+from monopoly_simulator import tournament_statistics
+from monopoly_simulator import work_queue
 import os
 import shutil
 import json
+import itertools
 # import action_choices
 # import novelty_functions
 
@@ -307,6 +315,438 @@ def play_tournament_with_novelty_buy_property_right(tournament_log_folder=None,
     print('pre_novelty winners', winners)
     print('post_novelty_winners', new_winners)
 
+def _stopping_rule_metadata(stopping_rule):
+    # the evaluation stored in the stopping rule by a previous run is not part of the tournament description
+    if stopping_rule is None:
+        return None
+    return {k: v for k, v in stopping_rule.items() if k != 'evaluation'}
+
+
+def play_tournament_without_novelty_parallel(tournament_log_folder=None, meta_seed=5, num_games=100, num_workers=None, resume=False,
+                                             retry_failed=False, stopping_rule=None):
+    """
+    Parallel version of play_tournament_without_novelty. The games are spread across a pool of worker processes, each game
+    is logged into the same log file as in the serial version, and the winners are returned in seed order. Every finished
+    (or failed) game is recorded in tournament_manifest.jsonl in the logging folder, so an interrupted tournament can be resumed.
+    The game record of every finished game (winner, elimination order, turn count, final cash and net worth, ...) is
+    appended to tournament_results.jsonl, which metrics_helper reads instead of parsing the game logs.
+    :param tournament_log_folder: String. The path to a folder.
+    :param meta_seed: This is the seed we will use to generate a sequence of seeds, that will (in turn) spawn the games in gameplay/simulate_game_instance
+    :param num_games: The number of games to simulate in a tournament
+    :param num_workers: The number of worker processes. If None, one worker per cpu is used.
+    :param resume: boolean. If True and the tournament was already (partially) logged in this folder, the folder is not cleared
+    and only the games missing from its tournament_manifest.jsonl are played.
+    :param retry_failed: boolean. If True, games recorded as failed in the manifest are played again when resuming.
+    :param stopping_rule: dict created by tournament_statistics.create_stopping_rule. If given, the tournament is played
+    adaptively: it stops as soon as the rule is met, and num_games is only the upper cap on the number of games.
+    :return: list of winners, in the order of the tournament seeds. In an adaptive tournament, only the winners of the
+    games the stopping rule was evaluated on.
+    """
+
+    if not tournament_log_folder:
+        print("No logging folder specified, cannot log tournaments. Provide a logging folder path.")
+        raise Exception
+
+    tournament_seeds = tournament_runner.generate_tournament_seeds(meta_seed, num_games)
+
+    folder_name = "../tournament_logs" + tournament_log_folder
+    metadata_dict = {
+        "function": "play_tournament_without_novelty_parallel",
+        "parameters": {
+            "meta_seed": meta_seed,
+            "num_game": num_games,
+            "stopping_rule": _stopping_rule_metadata(stopping_rule)
+        }
+    }
+    tournament_runner.prepare_tournament_folder(folder_name, metadata_dict, resume)
+    manifest_file = folder_name + "tournament_manifest.jsonl"
+    results_file = folder_name + "tournament_results.jsonl"
+
+    game_jobs = list()
+    for t in range(len(tournament_seeds)):
+        filename = folder_name + "meta_seed_" + str(meta_seed) + '_num_games_' + str(t + 1) + '.log'
+        game_jobs.append(tournament_runner.create_game_job(t, tournament_seeds[t], filename))
+
+    winners = tournament_runner.run_game_jobs(game_jobs, num_workers, manifest_file, retry_failed, results_file,
+                                              stopping_rule, tournament_runner.game_length_file)
+    if stopping_rule is not None:
+        winners = winners[0:stopping_rule['evaluation']['num_games_without_novelty']]
+    print(winners)
+    return winners
+
+
+def play_tournament_with_novelty_1_parallel(tournament_log_folder=None, meta_seed=5, num_games=100, novelty_index=23, novelty_info=False,
+                                            inject_novelty_function=None, num_workers=None, resume=False, retry_failed=False,
+                                            stopping_rule=None):
+    """
+    Parallel version of play_tournament_with_novelty_1. The games are spread across a pool of worker processes, each game
+    is logged into the same log file as in the serial version, and the winners are returned in seed order. Every finished
+    (or failed) game is recorded in tournament_manifest.jsonl in the logging folder, so an interrupted tournament can be resumed.
+    The game record of every finished game (winner, elimination order, turn count, final cash and net worth, ...) is
+    appended to tournament_results.jsonl, which metrics_helper reads instead of parsing the game logs.
+    :param tournament_log_folder: String. The path to a folder.
+    :param meta_seed: This is the seed we will use to generate a sequence of seeds, that will (in turn) spawn the games in gameplay/simulate_game_instance
+    :param num_games: The number of games to simulate in a tournament
+    :param novelty_index: an integer between 1 and num_games-1. We will play this many games BEFORE introducing novelty.
+    :param novelty_info: boolean that specifies if the agent will be notified when novelty is injected or not.
+    :param inject_novelty_function: module level function that injects the novelty. Defaults to improvePropertyRed_novelty
+    :param num_workers: The number of worker processes. If None, one worker per cpu is used.
+    :param resume: boolean. If True and the tournament was already (partially) logged in this folder, the folder is not cleared
+    and only the games missing from its tournament_manifest.jsonl are played.
+    :param retry_failed: boolean. If True, games recorded as failed in the manifest are played again when resuming.
+    :param stopping_rule: dict created by tournament_statistics.create_stopping_rule (typically with statistic
+    'novelty_difference'). If given, the tournament is played adaptively: games before and after the novelty are played
+    alternately and the tournament stops as soon as the rule is met. novelty_index and num_games - novelty_index are then
+    only the upper caps on the number of games before and after the novelty.
+    :return: tuple of (pre-novelty winners, post-novelty winners), each in the order of the tournament seeds. In an
+    adaptive tournament, only the winners of the games the stopping rule was evaluated on.
+    """
+
+    if not tournament_log_folder:
+        print("No logging folder specified, cannot log tournaments. Provide a logging folder path.")
+        raise Exception
+
+    if inject_novelty_function is None:
+        inject_novelty_function = improvePropertyRed_novelty
+
+    tournament_seeds = tournament_runner.generate_tournament_seeds(meta_seed, num_games)
+
+    folder_name = "../tournament_logs" + tournament_log_folder
+    metadata_dict = {
+        "function": "play_tournament_with_novelty_1_parallel",
+        "parameters": {
+            "meta_seed": meta_seed,
+            "novelty_index": novelty_index,
+            "num_game": num_games,
+            "novelty_info": novelty_info,
+            "inject_novelty_function": inject_novelty_function.__name__,
+            "stopping_rule": _stopping_rule_metadata(stopping_rule)
+        }
+    }
+    tournament_runner.prepare_tournament_folder(folder_name, metadata_dict, resume)
+    manifest_file = folder_name + "tournament_manifest.jsonl"
+    results_file = folder_name + "tournament_results.jsonl"
+
+    game_jobs = list()
+    for t in range(0, novelty_index):
+        filename = folder_name + "meta_seed_" + str(meta_seed) + '_without_novelty' + '_num_games_' + str(t + 1) + '.log'
+        game_jobs.append(tournament_runner.create_game_job(t, tournament_seeds[t], filename, novelty_info))
+    for t in range(novelty_index, len(tournament_seeds)):
+        filename = folder_name + "meta_seed_" + str(meta_seed) + '_with_novelty' + '_num_games_' + str(t + 1) + '.log'
+        game_jobs.append(tournament_runner.create_game_job(t, tournament_seeds[t], filename, novelty_info, inject_novelty_function))
+
+    all_winners = tournament_runner.run_game_jobs(game_jobs, num_workers, manifest_file, retry_failed, results_file,
+                                                  stopping_rule, tournament_runner.game_length_file)
+    winners = all_winners[0:novelty_index]
+    new_winners = all_winners[novelty_index:]
+    if stopping_rule is not None:
+        winners = winners[0:stopping_rule['evaluation']['num_games_without_novelty']]
+        new_winners = new_winners[0:stopping_rule['evaluation']['num_games_with_novelty']]
+
+    print('pre_novelty winners', winners)
+    print('post_novelty_winners', new_winners)
+    return winners, new_winners
+
+
+def play_tournament_without_novelty_queue(tournament_log_folder=None, meta_seed=5, num_games=100, num_local_workers=None,
+                                          resume=False, lease_time=600):
+    """
+    Version of play_tournament_without_novelty_parallel that can be drained by several machines. The games are put in a
+    work queue (work_queue.py) in the tournament folder, and num_local_workers worker processes are started on this
+    machine to drain it. Workers on other machines that share the tournament folder can join at any time by running
+    work_queue.py on the queue file (tournament_queue.sqlite). Once the queue is drained, the game records are exported
+    to tournament_results.jsonl.
+    :param tournament_log_folder: String. The path to a folder.
+    :param meta_seed: This is the seed we will use to generate a sequence of seeds, that will (in turn) spawn the games in gameplay/simulate_game_instance
+    :param num_games: The number of games to simulate in a tournament
+    :param num_local_workers: The number of worker processes started on this machine. If None, one worker per cpu is used.
+    :param resume: boolean. If True and the tournament was already (partially) logged in this folder, its queue is kept and
+    only the games that are not finished yet are played.
+    :param lease_time: Seconds after which a game claimed by a worker that died is handed out again.
+    :return: list of winners, in the order of the tournament seeds.
+    """
+
+    if not tournament_log_folder:
+        print("No logging folder specified, cannot log tournaments. Provide a logging folder path.")
+        raise Exception
+
+    tournament_seeds = tournament_runner.generate_tournament_seeds(meta_seed, num_games)
+
+    folder_name = "../tournament_logs" + tournament_log_folder
+    metadata_dict = {
+        "function": "play_tournament_without_novelty_queue",
+        "parameters": {
+            "meta_seed": meta_seed,
+            "num_game": num_games
+        }
+    }
+    tournament_runner.prepare_tournament_folder(folder_name, metadata_dict, resume)
+    queue_file = folder_name + "tournament_queue.sqlite"
+
+    game_jobs = list()
+    for t in range(len(tournament_seeds)):
+        filename = folder_name + "meta_seed_" + str(meta_seed) + '_num_games_' + str(t + 1) + '.log'
+        game_jobs.append(tournament_runner.create_game_job(t, tournament_seeds[t], filename))
+    work_queue.create_work_queue(queue_file, game_jobs, length_file=tournament_runner.game_length_file)
+
+    work_queue.run_local_queue_workers(queue_file, num_local_workers, lease_time)
+
+    work_queue.export_results(queue_file, folder_name + "tournament_results.jsonl")
+    game_results, game_records = work_queue.read_queue_results(queue_file)
+    winners = list()
+    for t in range(len(tournament_seeds)):
+        if t in game_results:
+            winners.append(game_results[t].get('winner'))
+        else:
+            winners.append(None)
+    print(winners)
+    return winners
+
+
+def play_tournament_with_novelty_paired_parallel(tournament_log_folder=None, meta_seed=5, num_games=100, novelty_info=False,
+                                                 inject_novelty_function=None, num_workers=None, resume=False, retry_failed=False):
+    """
+    Paired version of play_tournament_with_novelty_1_parallel. Instead of playing different seeds before and after the
+    novelty, every seed is played twice: once without and once with the novelty. The two games of a pair are handed out
+    one after the other (pairs are ordered longest first as a unit, see tournament_runner.order_by_expected_length) and
+    set up from the board prototype of the worker, so a pair only costs the gameplay of its two games. The effect of the novelty is reported as the mean per-seed paired difference in win rate, with a confidence
+    interval (see tournament_statistics.summarize_paired_novelty).
+    :param tournament_log_folder: String. The path to a folder.
+    :param meta_seed: This is the seed we will use to generate a sequence of seeds, that will (in turn) spawn the games in gameplay/simulate_game_instance
+    :param num_games: The number of seeds to play. Every seed is played twice.
+    :param novelty_info: boolean that specifies if the agent will be notified when novelty is injected or not.
+    :param inject_novelty_function: module level function that injects the novelty. Defaults to improvePropertyRed_novelty
+    :param num_workers: The number of worker processes. If None, one worker per cpu is used.
+    :param resume: boolean. If True and the tournament was already (partially) logged in this folder, the folder is not cleared
+    and only the games missing from its tournament_manifest.jsonl are played.
+    :param retry_failed: boolean. If True, games recorded as failed in the manifest are played again when resuming.
+    :return: tuple of (winners without novelty, winners with novelty, summary). The two lists of winners are in the order
+    of the tournament seeds, summary is the dict returned by tournament_statistics.summarize_paired_novelty.
+    """
+
+    if not tournament_log_folder:
+        print("No logging folder specified, cannot log tournaments. Provide a logging folder path.")
+        raise Exception
+
+    if inject_novelty_function is None:
+        inject_novelty_function = improvePropertyRed_novelty
+
+    tournament_seeds = tournament_runner.generate_tournament_seeds(meta_seed, num_games)
+
+    folder_name = "../tournament_logs" + tournament_log_folder
+    metadata_dict = {
+        "function": "play_tournament_with_novelty_paired_parallel",
+        "parameters": {
+            "meta_seed": meta_seed,
+            "num_game": num_games,
+            "novelty_info": novelty_info,
+            "inject_novelty_function": inject_novelty_function.__name__
+        }
+    }
+    tournament_runner.prepare_tournament_folder(folder_name, metadata_dict, resume)
+    manifest_file = folder_name + "tournament_manifest.jsonl"
+    results_file = folder_name + "tournament_results.jsonl"
+
+    game_jobs = list()
+    for t in range(len(tournament_seeds)):
+        filename = folder_name + "meta_seed_" + str(meta_seed) + '_without_novelty' + '_num_games_' + str(t + 1) + '.log'
+        game_jobs.append(tournament_runner.create_game_job(2 * t, tournament_seeds[t], filename, novelty_info, pair=t))
+        filename = folder_name + "meta_seed_" + str(meta_seed) + '_with_novelty' + '_num_games_' + str(t + 1) + '.log'
+        game_jobs.append(tournament_runner.create_game_job(2 * t + 1, tournament_seeds[t], filename, novelty_info,
+                                                           inject_novelty_function, pair=t))
+
+    all_winners = tournament_runner.run_game_jobs(game_jobs, num_workers, manifest_file, retry_failed, results_file,
+                                                  length_file=tournament_runner.game_length_file)
+    winners = all_winners[0::2]
+    new_winners = all_winners[1::2]
+
+    summary = tournament_statistics.summarize_paired_novelty(winners, new_winners,
+                                                            ['player_1', 'player_2', 'player_3', 'player_4'])
+    print('pre_novelty winners', winners)
+    print('post_novelty_winners', new_winners)
+    for player_name in ['player_1', 'player_2', 'player_3', 'player_4']:
+        print(player_name, 'paired novelty effect', summary[player_name]['mean_difference'], summary[player_name]['interval'])
+    return winners, new_winners, summary
+
+
+def play_tournament_seat_rotation_parallel(tournament_log_folder=None, meta_seed=5, num_games=100, agent_combination=None,
+                                           rotation='latin_square', num_workers=None, resume=False, retry_failed=False):
+    """
+    Seat rotation tournament. Every seed is played once per seat arrangement (see tournament_runner.generate_seat_arrangements),
+    i.e., the same dice and card streams are replayed with the agents swapping players. This takes the luck of the turn
+    order out of the comparison between agents, so a given confidence is reached with fewer seeds. The games are played in
+    parallel, with the same manifest and results files as play_tournament_without_novelty_parallel.
+    :param tournament_log_folder: String. The path to a folder.
+    :param meta_seed: This is the seed we will use to generate a sequence of seeds, that will (in turn) spawn the games in gameplay/simulate_game_instance
+    :param num_games: The number of seeds to play. Every seed is played once per seat arrangement.
+    :param agent_combination: A list of four agent modules (like the lists in agent_combination_1). Defaults to four
+    background_agent_v3_1 agents.
+    :param rotation: String. 'latin_square' (4 arrangements per seed) or 'all' (all 24 permutations per seed).
+    :param num_workers: The number of worker processes. If None, one worker per cpu is used.
+    :param resume: boolean. If True and the tournament was already (partially) logged in this folder, the folder is not cleared
+    and only the games missing from its tournament_manifest.jsonl are played.
+    :param retry_failed: boolean. If True, games recorded as failed in the manifest are played again when resuming.
+    :return: dict with one entry per agent ('agent_1' to 'agent_4', in the order of agent_combination), see
+    tournament_statistics.summarize_seat_rotation.
+    """
+
+    if not tournament_log_folder:
+        print("No logging folder specified, cannot log tournaments. Provide a logging folder path.")
+        raise Exception
+
+    if agent_combination is None:
+        agent_combination = [background_agent_v3_1, background_agent_v3_1, background_agent_v3_1, background_agent_v3_1]
+    agent_labels = ['agent_' + str(i + 1) for i in range(len(agent_combination))]
+    seat_arrangements = tournament_runner.generate_seat_arrangements(len(agent_combination), rotation)
+    tournament_seeds = tournament_runner.generate_tournament_seeds(meta_seed, num_games)
+
+    folder_name = "../tournament_logs" + tournament_log_folder
+    metadata_dict = {
+        "function": "play_tournament_seat_rotation_parallel",
+        "parameters": {
+            "meta_seed": meta_seed,
+            "num_game": num_games,
+            "agent_combination": [agent.__name__ for agent in agent_combination],
+            "rotation": rotation
+        }
+    }
+    tournament_runner.prepare_tournament_folder(folder_name, metadata_dict, resume)
+    manifest_file = folder_name + "tournament_manifest.jsonl"
+    results_file = folder_name + "tournament_results.jsonl"
+
+    game_jobs = list()
+    for t in range(len(tournament_seeds)):
+        for a in range(len(seat_arrangements)):
+            player_agents = dict()
+            for p in range(len(seat_arrangements[a])):
+                player_agents['player_' + str(p + 1)] = agent_combination[seat_arrangements[a][p]].__name__
+            filename = folder_name + "meta_seed_" + str(meta_seed) + '_num_games_' + str(t + 1) + '_seats_' + str(a + 1) + '.log'
+            game_jobs.append(tournament_runner.create_game_job(len(game_jobs), tournament_seeds[t], filename,
+                                                               player_agents=player_agents))
+
+    winners = tournament_runner.run_game_jobs(game_jobs, num_workers, manifest_file, retry_failed, results_file,
+                                              length_file=tournament_runner.game_length_file)
+
+    seed_outcomes = list()
+    for t in range(len(tournament_seeds)):
+        outcomes = list()
+        for a in range(len(seat_arrangements)):
+            winner = winners[t * len(seat_arrangements) + a]
+            if winner is None:
+                outcomes.append(None)
+            else:
+                outcomes.append(seat_arrangements[a][int(winner.split('_')[1]) - 1])
+        seed_outcomes.append(outcomes)
+
+    summary = tournament_statistics.summarize_seat_rotation(seed_outcomes, agent_labels)
+    for agent_label in agent_labels:
+        print(agent_label, summary[agent_label])
+    return summary
+
+
+def play_agent_matrix_parallel(tournament_log_folder=None, meta_seed=5, num_games=100, agent_pool=None, rotation='latin_square',
+                               num_workers=None, resume=False, retry_failed=False, agent_combinations=None):
+    """
+    Round robin of a pool of agents. Every combination of four agents from the pool (an agent can fill several seats, so
+    e.g. three background agents and one variant is a combination) plays the same num_games seeds, each seed once per seat
+    arrangement (see play_tournament_seat_rotation_parallel), and all the games of all the combinations are scheduled on
+    one shared pool of worker processes. This replaces running one tournament per agent combination (as
+    play_tournament_with_novelty_2 does for agent_combination_1).
+    :param tournament_log_folder: String. The path to a folder.
+    :param meta_seed: This is the seed we will use to generate a sequence of seeds, that will (in turn) spawn the games in gameplay/simulate_game_instance
+    :param num_games: The number of seeds every combination plays.
+    :param agent_pool: A list of agent modules. Defaults to the agents of agent_combinations if given, otherwise to
+    background_agent_v3_1 and its action novelty and interaction variants.
+    :param agent_combinations: A list of combinations to play, each a list of four agent modules of the pool. If None,
+    every combination of four agents of the pool is played (with n agents in the pool, (n + 3)! / (4! (n - 1)!) of them).
+    :param rotation: String. 'latin_square' (4 arrangements per seed) or 'all' (all 24 permutations per seed).
+    :param num_workers: The number of worker processes. If None, one worker per cpu is used.
+    :param resume: boolean. If True and the tournament was already (partially) logged in this folder, the folder is not cleared
+    and only the games missing from its tournament_manifest.jsonl are played.
+    :param retry_failed: boolean. If True, games recorded as failed in the manifest are played again when resuming.
+    :return: tuple of (table, combination_tables). table is the consolidated win and rank table over all games (see
+    tournament_statistics.summarize_agent_matrix), combination_tables is a list with one (agent names, table) pair per
+    combination of agents, with the names of the distinct agents of the combination. The consolidated table is also written to agent_matrix_table.json in the logging folder.
+    """
+
+    if not tournament_log_folder:
+        print("No logging folder specified, cannot log tournaments. Provide a logging folder path.")
+        raise Exception
+
+    if agent_pool is None and agent_combinations is not None:
+        agent_pool = list()
+        for agent_combination in agent_combinations:
+            agent_pool.extend(agent for agent in agent_combination if agent not in agent_pool)
+    if agent_pool is None:
+        agent_pool = [background_agent_v3_1, background_agent_v3_1_action_novelty,
+                      background_agent_v3_1_interaction_accept_offer, background_agent_v3_1_interaction_make_offer]
+    if not agent_pool:
+        print("The agent pool needs at least one agent.")
+        raise Exception
+    agent_names = [agent.__name__ for agent in agent_pool]
+    if agent_combinations is None:
+        agent_combinations = list(itertools.combinations_with_replacement(range(len(agent_pool)), 4))
+    else:
+        for agent_combination in agent_combinations:
+            if len(agent_combination) != 4 or any(agent not in agent_pool for agent in agent_combination):
+                print("Every agent combination needs four agents of the agent pool.")
+                raise Exception
+        agent_combinations = [tuple(agent_pool.index(agent) for agent in agent_combination)
+                              for agent_combination in agent_combinations]
+    seat_arrangements = tournament_runner.generate_seat_arrangements(4, rotation)
+    tournament_seeds = tournament_runner.generate_tournament_seeds(meta_seed, num_games)
+
+    folder_name = "../tournament_logs" + tournament_log_folder
+    metadata_dict = {
+        "function": "play_agent_matrix_parallel",
+        "parameters": {
+            "meta_seed": meta_seed,
+            "num_game": num_games,
+            "agent_pool": agent_names,
+            "agent_combinations": [[agent_names[i] for i in agent_combination] for agent_combination in agent_combinations],
+            "rotation": rotation
+        }
+    }
+    tournament_runner.prepare_tournament_folder(folder_name, metadata_dict, resume)
+    manifest_file = folder_name + "tournament_manifest.jsonl"
+    results_file = folder_name + "tournament_results.jsonl"
+
+    game_jobs = list()
+    combination_of_job = list()
+    for c in range(len(agent_combinations)):
+        for t in range(len(tournament_seeds)):
+            for a in range(len(seat_arrangements)):
+                player_agents = dict()
+                for p in range(4):
+                    player_agents['player_' + str(p + 1)] = agent_names[agent_combinations[c][seat_arrangements[a][p]]]
+                filename = folder_name + "meta_seed_" + str(meta_seed) + '_comb_' + str(c + 1) + '_num_games_' + str(t + 1) + \
+                           '_seats_' + str(a + 1) + '.log'
+                game_jobs.append(tournament_runner.create_game_job(len(game_jobs), tournament_seeds[t], filename,
+                                                                   player_agents=player_agents))
+                combination_of_job.append(c)
+
+    tournament_runner.run_game_jobs(game_jobs, num_workers, manifest_file, retry_failed, results_file,
+                                    length_file=tournament_runner.game_length_file)
+
+    game_records = [r for r in metrics_helper.read_game_results(results_file) if r['index'] < len(game_jobs)]
+    table = tournament_statistics.summarize_agent_matrix(game_records, agent_names)
+    combination_tables = list()
+    for c in range(len(agent_combinations)):
+        combination_names = [agent_names[i] for i in sorted(set(agent_combinations[c]))]
+        combination_records = [r for r in game_records if combination_of_job[r['index']] == c]
+        combination_tables.append((combination_names,
+                                   tournament_statistics.summarize_agent_matrix(combination_records, combination_names)))
+
+    out_file = open(folder_name + "agent_matrix_table.json", "w")
+    json.dump(table, out_file, indent=4)
+    out_file.close()
+    print('agent, games, wins, win rate, mean rank')
+    for agent_name in agent_names:
+        print(agent_name, table[agent_name]['num_games'], table[agent_name]['wins'], table[agent_name]['win_rate'],
+              table[agent_name]['mean_rank'])
+    return table, combination_tables
+
+
 def class_novelty_1(current_gameboard):
     classCardNovelty = novelty_generator.TypeClassNovelty()
     novel_cc = dict()
@@ -336,5 +776,7 @@ except:
 
 #Specify the name of the folder in which the tournament games has to be logged in the following format: "/name_of_your_folder/"
 # play_tournament_without_novelty('/tournament_without_novelty_4/', meta_seed=10, num_games=10)
-play_tournament_with_novelty_2(tournament_log_folder='/tournament_with_novelty/', meta_seed=15, num_games=2, novelty_index=1, novelty_info=True)
+# play_tournament_without_novelty_parallel('/tournament_without_novelty_parallel/', meta_seed=10, num_games=100, num_workers=8)
+if __name__ == "__main__":
+    play_tournament_with_novelty_2(tournament_log_folder='/tournament_with_novelty/', meta_seed=15, num_games=2, novelty_index=1, novelty_info=True)
 
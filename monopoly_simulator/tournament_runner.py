@@ -0,0 +1,702 @@
+"""
+This file contains the machinery used by test_harness.py to play the games of a tournament in parallel. Every game of a
+tournament is described by a 'game job' (a dict) and the jobs are spread across a pool of worker processes. Each worker
+plays its job through gameplay.play_game_in_tournament, writing the same per-game log file that the serial tournaments
+in test_harness.py write.
+
+Every finished game also produces a game record (the game result dict built by gameplay.simulate_game_instance: seed,
+winner, elimination order, turn and die roll counts, final cash and net worth, wall time, cash cap termination), which can
+be appended to a results file, one json line per game, so that win rates and ranks never have to be parsed out of logs.
+
+Tournaments can be checkpointed in a manifest file (one json line per game, appended as soon as the game completes).
+Restarting a tournament with the same manifest only plays the games that are not in the manifest yet. A game that raises
+an exception is recorded with status 'failed' instead of aborting the whole tournament.
+
+Games are handed out longest first. The number of turns of every finished game is recorded in a game length file shared
+by all tournaments, and when the same game (same seed, novelty and agents) is scheduled again, its recorded length is used
+to start the long games early, so that the tournament does not end with a few long games running on otherwise idle cores.
+
+Worker processes are recycled: a worker exits after it has played max_games_per_worker games, or as soon as its resident
+memory exceeds max_worker_rss_mb after a game, and a fresh worker takes its place. A worker only exits after its result
+has been sent back, so no finished game is lost. This keeps the memory of long tournaments flat, whatever the games and
+agents leave behind in the worker (loggers, agent memory, history).
+
+In fork server mode (fork_server = True) the tournament process itself serves as the fork server of its workers: before
+the first worker is started it imports every module the games need (the simulator, the agents and the novelty injection
+functions of the jobs), parses the schema into the board prototype, then freezes its heap (gc.freeze) and forks the
+workers. A new worker therefore starts with everything in place and plays its first game right away, and since the
+garbage collector of a worker never visits the frozen objects, their pages stay shared copy-on-write across all workers.
+Fork server mode needs the 'fork' start method, which is not available on Windows.
+
+A tournament can also be played adaptively: given a stopping rule (see tournament_statistics.create_stopping_rule), the
+runner re-evaluates the rule every time a game finishes and stops the tournament as soon as the rule is met. Only the
+games at the front of the job list that have all finished are evaluated, so that games which happen to finish early
+(e.g., short games) do not bias the decision.
+
+While a tournament runs, its live counters (games completed and failed, games and turns per second, mean game length,
+running win rate of every agent, ETA) can be scraped from a local HTTP endpoint by setting telemetry_port (see
+tournament_telemetry.py).
+"""
+
+import multiprocessing
+import numpy as np
+import os
+import shutil
+import json
+import traceback
+import importlib
+import itertools
+import collections
+import multiprocessing.connection
+import gc
+from monopoly_simulator import gameplay
+from monopoly_simulator import tournament_statistics
+from monopoly_simulator import tournament_telemetry
+from monopoly_simulator import action_choices
+from monopoly_simulator import outcome_cache
+from monopoly_simulator.logging_info import log_file_create
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.tournament_runner')
+
+# snapshot of the action_choices namespace, taken when this module is imported (i.e., before any novelty is injected)
+_action_choices_defaults = dict(vars(action_choices))
+_worker_state = dict()  # per-process state built once when a worker starts up (e.g., the board prototype)
+game_length_file = '../tournament_logs/game_lengths.jsonl'  # lengths of the games played so far, used to schedule long games first
+max_games_per_worker = 500  # a worker process is replaced after playing this many games (None: never)
+max_worker_rss_mb = 2048  # a worker process is replaced once its resident memory exceeds this many MB (None: never)
+outcome_cache_dir = None  # folder of the outcome cache (see outcome_cache.py) new game jobs use, None to always play the games
+force_recompute = False  # if True, new game jobs are played even if their outcome is cached (and the cache is refreshed)
+fork_server = False  # if True, workers are forked from this process after it preloaded and froze everything games need
+telemetry_port = None  # if set, run_game_jobs serves live tournament counters on http://127.0.0.1:<port>/metrics
+history_export_dir = None  # if set, new game jobs record their full history and export it to a .npz shard in this folder
+
+
+def generate_tournament_seeds(meta_seed, num_games):
+    """
+    Generate the sequence of game seeds for a tournament. This is the same sequence that the play_tournament_* functions
+    in test_harness.py derive from meta_seed, but it does not touch the global numpy random state.
+    :param meta_seed: This is the seed we will use to generate a sequence of seeds, that will (in turn) spawn the games in gameplay/simulate_game_instance
+    :param num_games: The number of games to simulate in a tournament
+    :return: A list of num_games integer seeds.
+    """
+    big_list = list(range(0, 1000000))
+    np.random.RandomState(meta_seed).shuffle(big_list)
+    return big_list[0:num_games]
+
+
+def prepare_tournament_folder(folder_name, metadata_dict, resume=False):
+    """
+    Create the tournament log folder and write the tournament metadata into it. If resume is False, an existing folder is
+    cleared first (this is what the serial tournaments in test_harness.py do). If resume is True, an existing folder is kept
+    as it is, so that the games already recorded in its manifest are not played again. We refuse to resume a tournament
+    whose metadata differs from the one on disk, since the recorded games would then belong to a different tournament.
+    :param folder_name: String. The path to the tournament log folder (ending with '/').
+    :param metadata_dict: A dict. The tournament metadata, written to tournament_meta_data.json
+    :param resume: A boolean. Whether to resume the tournament that was previously logged in folder_name.
+    :return: None
+    """
+    json_filename = folder_name + "tournament_meta_data.json"
+    if resume and os.path.isfile(json_filename):
+        in_file = open(json_filename, "r")
+        previous_metadata_dict = json.load(in_file)
+        in_file.close()
+        if previous_metadata_dict != metadata_dict:
+            logger.error("Cannot resume tournament in " + folder_name + ", its metadata differs from the requested tournament.")
+            logger.error("Exception")
+            raise Exception
+        print('Resuming tournament logged in ' + folder_name)
+        return
+
+    try:
+        os.makedirs(folder_name)
+        print('Logging gameplay')
+    except:
+        print('Given logging folder already exists. Clearing folder before logging new files.')
+        shutil.rmtree(folder_name)
+        os.makedirs(folder_name)
+
+    out_file = open(json_filename, "w")
+    json.dump(metadata_dict, out_file, indent=4)
+    out_file.close()
+
+
+def generate_seat_arrangements(num_players=4, rotation='latin_square'):
+    """
+    Generate the seat arrangements of a seat rotation tournament, in which every seed is played once per arrangement.
+    Since the dice and card streams of a game only depend on its seed, the games of one seed only differ in which agent
+    plays which player (and hence in which turn position each agent gets).
+    :param num_players: An integer. The number of players of a game.
+    :param rotation: String. 'latin_square' for the num_players cyclic rotations (every agent plays every player exactly
+    once per seed), or 'all' for all num_players! permutations.
+    :return: A list of tuples. Entry i of a tuple is the index of the agent that plays player_(i+1).
+    """
+    if rotation == 'latin_square':
+        return [tuple((i + r) % num_players for i in range(num_players)) for r in range(num_players)]
+    elif rotation == 'all':
+        return list(itertools.permutations(range(num_players)))
+    else:
+        logger.error("Unknown seat rotation " + str(rotation))
+        logger.error("Exception")
+        raise Exception
+
+
+def create_game_job(index, seed, log_file, novelty_info=False, inject_novelty_function=None, player_agents=None,
+                    cache_dir=None, recompute=None, history_npz_file=None, pair=None):
+    """
+    Create the description of a single tournament game that can be sent to a worker process.
+    :param index: An integer. The position of the game in the tournament; results are returned in this order.
+    :param seed: An integer. The game seed that is passed on to gameplay.play_game_in_tournament
+    :param log_file: String. The path of the log file the game gets logged into.
+    :param novelty_info: boolean that specifies if the agent will be notified when novelty is injected or not.
+    :param inject_novelty_function: A module level function (it must be picklable) that injects novelty into the
+    gameboard, or None if the game is played without novelty.
+    :param player_agents: A dict or None. Key is a player name, value is the full name of the agent module that player
+    uses (e.g., 'monopoly_simulator.background_agent_v3_1'). Modules are passed by name since they cannot be sent to the
+    worker processes. If None, background agents play in all four seats.
+    :param cache_dir: String. The outcome cache folder of the game (see gameplay.play_game_in_tournament). Defaults to
+    outcome_cache_dir.
+    :param recompute: boolean. Whether to play the game even if its outcome is cached. Defaults to force_recompute.
+    :param history_npz_file: String. The path of the .npz shard the history of the game is exported to (see
+    history_export.py). Defaults to a shard named after the log file in history_export_dir, or no export if that is None.
+    :param pair: An integer or None. Jobs with the same pair are kept next to each other when the jobs are ordered by
+    expected length (see order_by_expected_length), e.g., the two games of a seed in a paired tournament.
+    :return: A dict representing the game job.
+    """
+    game_job = dict()
+    game_job['index'] = index
+    game_job['seed'] = seed
+    game_job['log_file'] = log_file
+    game_job['novelty_info'] = novelty_info
+    game_job['inject_novelty_function'] = inject_novelty_function
+    game_job['player_agents'] = player_agents
+    game_job['outcome_cache_dir'] = cache_dir if cache_dir is not None else outcome_cache_dir
+    game_job['force_recompute'] = recompute if recompute is not None else force_recompute
+    if history_npz_file is None and history_export_dir is not None:
+        history_npz_file = os.path.join(history_export_dir, os.path.splitext(os.path.basename(log_file))[0] + '.npz')
+    game_job['history_npz_file'] = history_npz_file
+    game_job['pair'] = pair
+    return game_job
+
+
+def read_tournament_manifest(manifest_file):
+    """
+    Read the games recorded in a tournament manifest. A line that was only partially written (e.g., because the
+    tournament was killed while writing it) is ignored, so that game will simply be played again.
+    :param manifest_file: String. The path to the manifest file.
+    :return: A dict. Key is the game index, value is the game result dict recorded for that game. If the same index
+    was recorded more than once, the last record wins.
+    """
+    game_results = dict()
+    if not os.path.isfile(manifest_file):
+        return game_results
+    with open(manifest_file, 'r') as fileread:
+        for line in fileread:
+            try:
+                game_result = json.loads(line)
+            except ValueError:
+                continue
+            game_results[game_result['index']] = game_result
+    return game_results
+
+
+def _append_json_line(file_name, record):
+    with open(file_name, 'a') as filewrite:
+        filewrite.write(json.dumps(record) + '\n')
+        filewrite.flush()
+        os.fsync(filewrite.fileno())
+
+
+def _close_game_logger(game_logger):
+    handlers_copy = game_logger.handlers[:]
+    for handler in handlers_copy:
+        game_logger.removeHandler(handler)
+        handler.close()
+        handler.flush()
+
+
+def _initialize_worker():
+    """
+    Runs once in every worker process. The game schema is parsed and the board is set up only once per worker (the board
+    prototype); every game then plays on a clone of it. Novelty injection functions (see test_harness.py) monkey patch
+    functions in action_choices, so the module namespace is restored from the snapshot taken at import time, here and
+    after every game. Otherwise a novelty injected in one game would leak into the next game played by the same worker,
+    and a novelty injected in the parent process before the workers were started (e.g., by a serial tournament, whose
+    novelties are never undone) into every game of a forked worker.
+    :return: None
+    """
+    _restore_action_choices()
+    if 'board_prototype' not in _worker_state:
+        _worker_state['board_prototype'] = gameplay.set_up_board_prototype('../monopoly_game_schema_v1-2.json')
+
+
+def _preload_fork_server(game_jobs):
+    """
+    Prepare this process to fork the workers of the given game jobs (fork server mode): import the agent modules and the
+    modules of the novelty injection functions of the jobs, build the board prototype and hash the simulator sources for
+    the outcome cache, then move every object that exists at this point into the permanent generation of the garbage
+    collector (gc.freeze), so that collections in the forked workers do not write to, and thereby copy, the shared pages.
+    :param game_jobs: A list of dicts created by create_game_job
+    :return: None
+    """
+    module_names = set(outcome_cache.engine_modules)
+    module_names.add('monopoly_simulator.background_agent_v3_1')
+    for game_job in game_jobs:
+        if game_job['player_agents'] is not None:
+            module_names.update(game_job['player_agents'].values())
+        if game_job['inject_novelty_function'] is not None:
+            module_names.add(game_job['inject_novelty_function'].__module__)
+    for module_name in sorted(module_names):
+        importlib.import_module(module_name)
+    if 'board_prototype' not in _worker_state:
+        _worker_state['board_prototype'] = gameplay.set_up_board_prototype('../monopoly_game_schema_v1-2.json')
+    if any(game_job['outcome_cache_dir'] is not None for game_job in game_jobs):
+        outcome_cache.engine_source_hashes()
+    gc.collect()
+    gc.freeze()
+
+
+def _worker_context():
+    """
+    The multiprocessing context worker processes are started from: the 'fork' context in fork server mode (if this
+    platform supports it), otherwise the default one.
+    """
+    if fork_server:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('fork')
+        logger.debug('fork start method not available, fork server mode is disabled')
+    return multiprocessing.get_context()
+
+
+def _restore_action_choices():
+    for k, v in _action_choices_defaults.items():
+        if getattr(action_choices, k, None) is not v:
+            setattr(action_choices, k, v)
+
+
+def resident_memory_mb():
+    """
+    The resident memory (RSS) of the calling process. On Linux it is read from /proc; elsewhere we fall back on the peak
+    resident memory reported by the resource module.
+    :return: A float. The resident memory in MB.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as fileread:
+            return int(fileread.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (IOError, OSError, ValueError):
+        import resource
+        import sys
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            return max_rss / (1024 * 1024)  # bytes on mac
+        return max_rss / 1024  # kilobytes elsewhere
+
+
+def play_game_job(game_job):
+    """
+    Play a single game job. This is the function that gets executed inside the worker processes. Exceptions raised by the
+    game are caught and reported in the returned result, so one broken game does not bring down the tournament.
+    :param game_job: A dict created by create_game_job
+    :return: A dict with the keys index, seed, log_file, status ('finished' or 'failed'), winner (the name of the player
+    who won the game, or None), error (the traceback of a failed game, otherwise None), game_record (the game result
+    dict of a finished game, extended with the index, log_file, novelty and player_agents of the job, otherwise None),
+    worker_pid and worker_rss_mb (the process that played the game and its resident memory after the game).
+    """
+    game_result = dict()
+    game_result['index'] = game_job['index']
+    game_result['seed'] = game_job['seed']
+    game_result['log_file'] = game_job['log_file']
+    game_result['winner'] = None
+    game_result['error'] = None
+    game_result['game_record'] = None
+
+    game_logger = log_file_create(game_job['log_file'])
+    try:
+        player_agents = None
+        if game_job['player_agents'] is not None:
+            player_agents = dict()
+            for player_name, module_name in game_job['player_agents'].items():
+                player_agents[player_name] = importlib.import_module(module_name)
+        game_record = gameplay.play_game_in_tournament(game_job['seed'], game_job['novelty_info'],
+                                                       game_job['inject_novelty_function'],
+                                                       _worker_state['board_prototype'], return_game_result=True,
+                                                       player_agents=player_agents,
+                                                       outcome_cache_dir=game_job['outcome_cache_dir'],
+                                                       force_recompute=game_job['force_recompute'],
+                                                       history_npz_file=game_job.get('history_npz_file'))
+        if game_record is not None:
+            game_record['index'] = game_job['index']
+            game_record['log_file'] = game_job['log_file']
+            game_record['novelty'] = game_job['inject_novelty_function'] is not None
+            game_record['player_agents'] = game_job['player_agents']
+            game_result['winner'] = game_record['winner']
+            game_result['game_record'] = game_record
+        game_result['status'] = 'finished'
+    except Exception:
+        game_result['status'] = 'failed'
+        game_result['error'] = traceback.format_exc()
+        logger.error('Game with seed ' + str(game_job['seed']) + ' failed:\n' + game_result['error'])
+    finally:
+        _close_game_logger(game_logger)
+        _restore_action_choices()
+    game_result['worker_pid'] = os.getpid()
+    game_result['worker_rss_mb'] = round(resident_memory_mb(), 1)
+    return game_result
+
+
+def _worker_process(connection, max_games, max_rss_mb):
+    """
+    The main loop of a worker process: receive a game job, play it, send back its result, until the parent sends None or
+    the worker has to be recycled. The decision to recycle is sent along with the result, and the worker exits right after.
+    """
+    _initialize_worker()
+    num_games = 0
+    while True:
+        game_job = connection.recv()
+        if game_job is None:
+            break
+        game_result = play_game_job(game_job)
+        num_games += 1
+        recycle = (max_games is not None and num_games >= max_games) or \
+                  (max_rss_mb is not None and game_result['worker_rss_mb'] >= max_rss_mb)
+        connection.send((game_result, recycle))
+        if recycle:
+            break
+    connection.close()
+
+
+def _play_in_worker_processes(game_jobs, num_workers, max_games, max_rss_mb):
+    """
+    Play the game jobs in num_workers worker processes, handing out one job at a time, and replacing every worker that
+    asks to be recycled or that dies. A job whose worker died (e.g., killed for running out of memory) is reported as failed.
+    This is a generator of game results, in the order in which the games finish. Closing it terminates the workers.
+    Every worker runs in one of num_workers slots (a worker that replaces another takes over its slot), and the slot of
+    the worker that played a game is added to its result as worker_slot.
+    """
+    remaining_jobs = collections.deque(game_jobs)
+    workers = dict()  # key is the parent end of the worker's pipe, value is [worker process, job in flight, slot]
+    context = _worker_context()
+    frozen = context.get_start_method() == 'fork' and fork_server
+
+    def start_worker(slot):
+        parent_connection, child_connection = context.Pipe()
+        worker = context.Process(target=_worker_process, args=(child_connection, max_games, max_rss_mb))
+        worker.daemon = True
+        worker.start()
+        child_connection.close()
+        workers[parent_connection] = [worker, None, slot]
+        hand_out_job(parent_connection)
+
+    def hand_out_job(connection):
+        if remaining_jobs:
+            workers[connection][1] = remaining_jobs.popleft()
+            connection.send(workers[connection][1])
+        else:
+            connection.send(None)
+            retire_worker(connection)
+
+    def retire_worker(connection):
+        worker = workers.pop(connection)[0]
+        connection.close()
+        worker.join()
+
+    try:
+        if frozen:
+            _preload_fork_server(game_jobs)
+        for i in range(num_workers):
+            if remaining_jobs:
+                start_worker(i)
+        while workers:
+            for connection in multiprocessing.connection.wait(list(workers)):
+                worker, game_job, slot = workers[connection]
+                try:
+                    game_result, recycle = connection.recv()
+                except EOFError:
+                    retire_worker(connection)
+                    logger.error('Worker process ' + str(worker.pid) + ' died (exit code ' + str(worker.exitcode) + ')')
+                    if remaining_jobs:
+                        start_worker(slot)
+                    if game_job is not None:
+                        game_result = dict()
+                        game_result['index'] = game_job['index']
+                        game_result['seed'] = game_job['seed']
+                        game_result['log_file'] = game_job['log_file']
+                        game_result['winner'] = None
+                        game_result['error'] = 'Worker process died (exit code ' + str(worker.exitcode) + ')'
+                        game_result['game_record'] = None
+                        game_result['status'] = 'failed'
+                        game_result['worker_pid'] = worker.pid
+                        game_result['worker_rss_mb'] = None
+                        game_result['worker_slot'] = slot
+                        yield game_result
+                    continue
+                workers[connection][1] = None
+                game_result['worker_slot'] = slot
+                if recycle:
+                    retire_worker(connection)
+                    print('Recycled worker process ' + str(worker.pid) + ' (resident memory ' +
+                          str(game_result['worker_rss_mb']) + ' MB)')
+                    if remaining_jobs:
+                        start_worker(slot)
+                else:
+                    hand_out_job(connection)
+                yield game_result
+    finally:
+        for connection in list(workers):
+            workers[connection][0].terminate()
+            workers[connection][0].join()
+            connection.close()
+        if frozen:
+            gc.unfreeze()
+
+
+def _evaluate_stopping_rule(stopping_rule, game_jobs, winners, done):
+    """
+    Evaluate the stopping rule on the games played so far. For 'novelty_difference', the jobs without novelty and the
+    jobs with novelty are considered separately, and for each of them only the leading jobs that have all finished are
+    counted. For 'win_rate', only the leading jobs that have all finished in the order they are handed out in
+    (_interleave_by_novelty) are counted, so that the games counted at a checkpoint of the rule never change.
+    :return: The evaluation dict returned by tournament_statistics.evaluate_stopping_rule, extended with the number of
+    counted games without novelty (num_games_without_novelty) and with novelty (num_games_with_novelty).
+    """
+    winners_without_novelty = list()
+    winners_with_novelty = list()
+    if stopping_rule['statistic'] == 'win_rate':
+        positions = [i for i in range(len(game_jobs)) if game_jobs[i]['inject_novelty_function'] is None]
+        positions_with_novelty = [i for i in range(len(game_jobs)) if game_jobs[i]['inject_novelty_function'] is not None]
+        ordered_winners = list()
+        for i in _interleave(positions, positions_with_novelty):
+            if i not in done:
+                break
+            ordered_winners.append(winners[i])
+            if game_jobs[i]['inject_novelty_function'] is None:
+                winners_without_novelty.append(winners[i])
+            else:
+                winners_with_novelty.append(winners[i])
+        evaluation = tournament_statistics.evaluate_stopping_rule(stopping_rule, winners_without_novelty,
+                                                                  winners_with_novelty, ordered_winners)
+    else:
+        prefix_open = {False: True, True: True}
+        for i in range(len(game_jobs)):
+            novelty = game_jobs[i]['inject_novelty_function'] is not None
+            if not prefix_open[novelty]:
+                continue
+            if i not in done:
+                prefix_open[novelty] = False
+            elif novelty:
+                winners_with_novelty.append(winners[i])
+            else:
+                winners_without_novelty.append(winners[i])
+        evaluation = tournament_statistics.evaluate_stopping_rule(stopping_rule, winners_without_novelty,
+                                                                  winners_with_novelty)
+    evaluation['num_games_without_novelty'] = len(winners_without_novelty)
+    evaluation['num_games_with_novelty'] = len(winners_with_novelty)
+    return evaluation
+
+
+def _game_length_key(game_job):
+    # a game is identified by everything that determines how it plays out
+    novelty_function_name = None
+    if game_job['inject_novelty_function'] is not None:
+        novelty_function_name = game_job['inject_novelty_function'].__module__ + '.' + game_job['inject_novelty_function'].__name__
+    return json.dumps([game_job['seed'], game_job['novelty_info'], novelty_function_name, game_job['player_agents']],
+                      sort_keys=True)
+
+
+def read_game_lengths(length_file):
+    """
+    Read the game lengths recorded in a game length file.
+    :param length_file: String. The path to the game length file.
+    :return: A dict. Key is a game key (see _game_length_key), value is the mean number of turns recorded for that game.
+    """
+    recorded_lengths = dict()
+    if not os.path.isfile(length_file):
+        return recorded_lengths
+    with open(length_file, 'r') as fileread:
+        for line in fileread:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record['key'] not in recorded_lengths:
+                recorded_lengths[record['key']] = list()
+            recorded_lengths[record['key']].append(record['num_turns'])
+    game_lengths = dict()
+    for key, lengths in recorded_lengths.items():
+        game_lengths[key] = sum(lengths) / len(lengths)
+    return game_lengths
+
+
+def order_by_expected_length(game_jobs, length_file):
+    """
+    Order the jobs longest first (largest processing time first), using the game lengths recorded in length_file. Jobs
+    without a recorded length are expected to take as long as the average recorded game. The order of jobs with the
+    same expected length is kept. Jobs with the same pair (see create_game_job) are ordered as one unit, by their total
+    expected length, and stay next to each other in their original order.
+    :param game_jobs: A list of dicts created by create_game_job
+    :param length_file: String. The path to the game length file.
+    :return: A new list with the same jobs.
+    """
+    game_lengths = read_game_lengths(length_file)
+    expected_lengths = [game_lengths.get(_game_length_key(game_job)) for game_job in game_jobs]
+    known_lengths = [length for length in expected_lengths if length is not None]
+    if not known_lengths:
+        return list(game_jobs)
+    average_length = sum(known_lengths) / len(known_lengths)
+    units = collections.OrderedDict()  # key is a pair (or the position of a job without pair), value is a list of positions
+    for i in range(len(game_jobs)):
+        if game_jobs[i].get('pair') is not None:
+            units.setdefault(('pair', game_jobs[i]['pair']), list()).append(i)
+        else:
+            units[('job', i)] = [i]
+    unit_lengths = dict()
+    for unit, positions in units.items():
+        unit_lengths[unit] = sum(expected_lengths[i] if expected_lengths[i] is not None else average_length
+                                 for i in positions)
+    order = sorted(units, key=lambda unit: -unit_lengths[unit])
+    return [game_jobs[i] for unit in order for i in units[unit]]
+
+
+def _interleave_by_novelty(game_jobs):
+    """
+    Order the jobs so that jobs without and with novelty alternate, keeping their relative order. In an adaptive
+    tournament this lets both sets of games progress at the same pace.
+    """
+    jobs_without_novelty = [j for j in game_jobs if j['inject_novelty_function'] is None]
+    jobs_with_novelty = [j for j in game_jobs if j['inject_novelty_function'] is not None]
+    return _interleave(jobs_without_novelty, jobs_with_novelty)
+
+
+def _interleave(items_1, items_2):
+    # items_1[0], items_2[0], items_1[1], items_2[1], ..., followed by the rest of the longer list
+    interleaved_items = list()
+    for i in range(max(len(items_1), len(items_2))):
+        if i < len(items_1):
+            interleaved_items.append(items_1[i])
+        if i < len(items_2):
+            interleaved_items.append(items_2[i])
+    return interleaved_items
+
+
+def run_game_jobs(game_jobs, num_workers=None, manifest_file=None, retry_failed=False, results_file=None,
+                  stopping_rule=None, length_file=None, max_games=None, max_rss_mb=None, metrics_port=None):
+    """
+    Play a list of game jobs across a pool of worker processes. Games are handed out one at a time, so a long game
+    does not hold up other jobs, and results are written back by job index. Worker processes are recycled after max_games
+    games or once they exceed max_rss_mb. With num_workers=1 the games are played in this process, one after the other.
+    :param game_jobs: A list of dicts created by create_game_job
+    :param num_workers: An integer. The number of worker processes. If None, one worker per cpu is used.
+    :param manifest_file: String. Path to the tournament manifest. If given, every game result is appended to it as soon
+    as the game completes, and games that are already recorded in it are not played again.
+    :param retry_failed: A boolean. If True, games recorded as 'failed' in the manifest are played again.
+    :param results_file: String. Path to a results file. If given, the game record of every finished game is appended
+    to it as soon as the game completes (see metrics_helper.read_game_results).
+    :param stopping_rule: A dict created by tournament_statistics.create_stopping_rule, or None to play all the jobs. If
+    given, the tournament stops as soon as the rule is met; games still in progress at that point are abandoned and games
+    not started yet are not played. The final evaluation of the rule is stored in stopping_rule['evaluation'], including
+    the number of leading jobs without novelty (num_games_without_novelty) and with novelty (num_games_with_novelty) it
+    was based on.
+    :param length_file: String. Path to a game length file (usually game_length_file). If given, the jobs are handed out
+    longest first according to the lengths recorded in it (except in an adaptive tournament, whose jobs must be played in
+    order), and the length of every finished game is appended to it.
+    :param max_games: An integer. A worker process is replaced after this many games. Defaults to max_games_per_worker.
+    :param max_rss_mb: A number. A worker process is replaced once its resident memory exceeds this many MB after a game.
+    Defaults to max_worker_rss_mb.
+    :param metrics_port: An integer. If given, the live counters of the tournament are served on this local port in the
+    Prometheus text format (see tournament_telemetry.py) while the games are played. Defaults to the module level
+    telemetry_port.
+    :return: A list of winners, in the order of the game jobs (not in the order in which the games finished). The winner
+    of a failed game, or of a game that was not played because the stopping rule was met, is None.
+    """
+    winners = [None] * len(game_jobs)
+    position = dict()  # key is a job index, value is the position of the job in game_jobs
+    for i in range(len(game_jobs)):
+        position[game_jobs[i]['index']] = i
+
+    pending_jobs = list()
+    done = set()  # positions of the jobs that have finished (or failed)
+    recorded_results = dict()
+    if manifest_file:
+        recorded_results = read_tournament_manifest(manifest_file)
+    for game_job in game_jobs:
+        game_result = recorded_results.get(game_job['index'])
+        if game_result is None or game_result['seed'] != game_job['seed'] or \
+                (retry_failed and game_result['status'] == 'failed'):
+            pending_jobs.append(game_job)
+        else:
+            winners[position[game_job['index']]] = game_result['winner']
+            done.add(position[game_job['index']])
+    if len(pending_jobs) < len(game_jobs):
+        print(str(len(game_jobs) - len(pending_jobs)) + ' games already recorded in manifest, playing the remaining ' +
+              str(len(pending_jobs)) + ' games.')
+    if length_file and stopping_rule is None:
+        pending_jobs = order_by_expected_length(pending_jobs, length_file)
+    if stopping_rule is not None:
+        pending_jobs = _interleave_by_novelty(pending_jobs)
+        stopping_rule['evaluation'] = _evaluate_stopping_rule(stopping_rule, game_jobs, winners, done)
+        if stopping_rule['evaluation']['stop']:
+            print('Stopping rule already met by the games recorded in manifest.')
+            pending_jobs = list()
+    if len(pending_jobs) == 0:
+        return winners
+
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+    num_workers = max(1, min(num_workers, len(pending_jobs)))
+
+    if max_games is None:
+        max_games = max_games_per_worker
+    if max_rss_mb is None:
+        max_rss_mb = max_worker_rss_mb
+    if metrics_port is None:
+        metrics_port = telemetry_port
+
+    telemetry = tournament_telemetry.TournamentTelemetry(len(pending_jobs))
+    telemetry_server = None
+    if metrics_port is not None:
+        telemetry_server = tournament_telemetry.start_telemetry_server(telemetry, metrics_port)
+
+    if num_workers == 1:
+        _initialize_worker()
+        game_results = map(play_game_job, pending_jobs)
+    else:
+        game_results = _play_in_worker_processes(pending_jobs, num_workers, max_games, max_rss_mb)
+
+    try:
+        count = 0
+        for game_result in game_results:
+            count += 1
+            winners[position[game_result['index']]] = game_result['winner']
+            done.add(position[game_result['index']])
+            game_record = game_result.pop('game_record')
+            telemetry.record_game(game_result, game_record, game_result.get('worker_slot', 0))
+            if results_file and game_record is not None:
+                _append_json_line(results_file, game_record)
+            if length_file and game_record is not None:
+                _append_json_line(length_file, {'key': _game_length_key(game_jobs[position[game_result['index']]]),
+                                                'num_turns': game_record['num_turns']})
+            if manifest_file:
+                _append_json_line(manifest_file, game_result)
+            if game_result['status'] == 'failed':
+                print('Gameplay failed for seed: ', str(game_result['seed']),
+                      ' ---> ' + str(count) + '/' + str(len(pending_jobs)) + ' games done')
+            else:
+                print('Finished gameplay for seed: ', str(game_result['seed']),
+                      ' ---> ' + str(count) + '/' + str(len(pending_jobs)) + ' games done (worker rss ' +
+                      str(game_result['worker_rss_mb']) + ' MB)')
+            if stopping_rule is not None:
+                stopping_rule['evaluation'] = _evaluate_stopping_rule(stopping_rule, game_jobs, winners, done)
+                if stopping_rule['evaluation']['stop']:
+                    print('Stopping rule met after ' + str(stopping_rule['evaluation']['num_games']) + ' games: estimate ' +
+                          str(stopping_rule['evaluation']['estimate']) + ', interval ' +
+                          str(stopping_rule['evaluation']['interval']))
+                    if 'checkpoint' in stopping_rule['evaluation']:
+                        print('Threshold test rejected at checkpoint ' + str(stopping_rule['evaluation']['checkpoint']) +
+                              ': interval ' + str(stopping_rule['evaluation']['checkpoint_interval']))
+                    break
+    finally:
+        if num_workers > 1:
+            game_results.close()
+        if telemetry_server is not None:
+            tournament_telemetry.stop_telemetry_server(telemetry_server)
+
+    return winners
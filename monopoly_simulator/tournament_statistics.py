@@ -0,0 +1,327 @@
+"""
+This file contains the statistics used to analyze tournaments while they are being played (see tournament_runner.py).
+Win rates are estimated with Wilson score intervals, which behave well even for small numbers of games and win rates
+close to 0 or 1. Differences between two win rates (e.g., before and after a novelty) use Newcombe's hybrid score
+interval built from the two Wilson intervals.
+
+A stopping rule (see create_stopping_rule) is a dict that tells the tournament runner when it has played enough games:
+once the confidence interval of the quantity we are interested in is narrow enough (margin), or lies entirely on one side
+of a threshold, the remaining games of the tournament are not played. The threshold test is only made at a few
+checkpoints with Bonferroni adjusted confidence levels: the runner evaluates the rule after every game, and checking a
+plain 95% interval that often would stop on a difference that does not exist far more often than 5% of the time.
+"""
+
+import math
+from monopoly_simulator import metrics_helper
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.tournament_statistics')
+
+
+def normal_quantile(p):
+    """
+    The inverse of the standard normal cumulative distribution function, computed by bisection.
+    :param p: A float strictly between 0 and 1.
+    :return: A float z such that P(Z <= z) = p for a standard normal Z.
+    """
+    if p <= 0 or p >= 1:
+        logger.error("Exception")
+        raise Exception
+    low = -10.0
+    high = 10.0
+    for i in range(100):
+        mid = (low + high) / 2
+        if 0.5 * (1 + math.erf(mid / math.sqrt(2))) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def wilson_interval(wins, num_games, confidence=0.95):
+    """
+    Wilson score interval for a win rate.
+    :param wins: An integer. The number of games won.
+    :param num_games: An integer. The number of games played.
+    :param confidence: A float. The confidence level of the interval.
+    :return: A tuple (low, high). If no games were played, the interval is (0.0, 1.0).
+    """
+    if num_games == 0:
+        return 0.0, 1.0
+    z = normal_quantile(1 - (1 - confidence) / 2)
+    p = wins / num_games
+    denominator = 1 + z * z / num_games
+    center = (p + z * z / (2 * num_games)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / num_games + z * z / (4 * num_games * num_games)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def difference_interval(wins_1, num_games_1, wins_2, num_games_2, confidence=0.95):
+    """
+    Newcombe's hybrid score interval for the difference of two independent win rates (win rate 2 - win rate 1).
+    :param wins_1: An integer. The number of games won in the first set of games.
+    :param num_games_1: An integer. The number of games in the first set.
+    :param wins_2: An integer. The number of games won in the second set of games.
+    :param num_games_2: An integer. The number of games in the second set.
+    :param confidence: A float. The confidence level of the interval.
+    :return: A tuple (low, high). If either set is empty, the interval is (-1.0, 1.0).
+    """
+    if num_games_1 == 0 or num_games_2 == 0:
+        return -1.0, 1.0
+    p_1 = wins_1 / num_games_1
+    p_2 = wins_2 / num_games_2
+    low_1, high_1 = wilson_interval(wins_1, num_games_1, confidence)
+    low_2, high_2 = wilson_interval(wins_2, num_games_2, confidence)
+    difference = p_2 - p_1
+    low = difference - math.sqrt((p_2 - low_2) ** 2 + (high_1 - p_1) ** 2)
+    high = difference + math.sqrt((high_2 - p_2) ** 2 + (p_1 - low_1) ** 2)
+    return max(-1.0, low), min(1.0, high)
+
+
+def mean_interval(values, confidence=0.95):
+    """
+    Normal approximation confidence interval for the mean of independent observations.
+    :param values: A list of numbers.
+    :param confidence: A float. The confidence level of the interval.
+    :return: A tuple (mean, (low, high)). With fewer than two values the interval is unbounded (-inf, inf), and with no
+    values the mean is None.
+    """
+    if len(values) == 0:
+        return None, (-math.inf, math.inf)
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, (-math.inf, math.inf)
+    variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    half_width = normal_quantile(1 - (1 - confidence) / 2) * math.sqrt(variance / len(values))
+    return mean, (mean - half_width, mean + half_width)
+
+
+def summarize_seat_rotation(seed_outcomes, agent_labels, confidence=0.95):
+    """
+    Aggregate the outcome of a seat rotation tournament per agent. Every seed was played once per seat arrangement, so
+    the seeds (and not the games) are the independent observations: the win rate of an agent is the mean over the seeds
+    of the fraction of the seed's games it won, and the interval is computed from the spread of these fractions between
+    seeds. Since the luck of the seat is averaged out within each seed, this interval is typically narrower than the one
+    we would get from as many games on different seeds.
+    :param seed_outcomes: A list with one entry per seed. Each entry is a list with one entry per seat arrangement: the
+    index (into agent_labels) of the agent that won that game, or None if the game failed or had no winner.
+    :param agent_labels: A list of strings naming the agents.
+    :param confidence: A float. The confidence level of the intervals.
+    :return: A dict. Key is an agent label, value is a dict with the keys num_games, wins, win_rate and interval.
+    """
+    summary = dict()
+    for agent_index in range(len(agent_labels)):
+        fractions = list()
+        num_games = 0
+        wins = 0
+        for outcomes in seed_outcomes:
+            valid_outcomes = [o for o in outcomes if o is not None]
+            if not valid_outcomes:
+                continue
+            num_games += len(valid_outcomes)
+            wins += valid_outcomes.count(agent_index)
+            fractions.append(valid_outcomes.count(agent_index) / len(valid_outcomes))
+        win_rate, (low, high) = mean_interval(fractions, confidence)
+        agent_summary = dict()
+        agent_summary['num_games'] = num_games
+        agent_summary['wins'] = wins
+        agent_summary['win_rate'] = win_rate
+        agent_summary['interval'] = (max(0.0, low), min(1.0, high))
+        summary[agent_labels[agent_index]] = agent_summary
+    return summary
+
+
+def summarize_paired_novelty(winners_without_novelty, winners_with_novelty, player_names, confidence=0.95):
+    """
+    Analyze a paired novelty tournament, in which every seed was played once without and once with the novelty. For
+    every player and seed, the paired difference is 1 if the player only won the game with novelty, -1 if it only won
+    the game without novelty and 0 otherwise. Everything the novelty does not change (dice, cards, turn order) cancels out
+    within a pair, so the mean paired difference estimates the effect of the novelty on the player's win rate with much
+    less noise than comparing games on different seeds.
+    :param winners_without_novelty: A list of winners (player names, or None for a failed game), one per seed.
+    :param winners_with_novelty: A list of winners of the games with novelty, on the same seeds in the same order.
+    :param player_names: A list of player names to summarize.
+    :param confidence: A float. The confidence level of the intervals.
+    :return: A dict. Key is a player name, value is a dict with the keys num_pairs, win_rate_without_novelty,
+    win_rate_with_novelty, differences (the per-seed paired differences, None for a pair with a failed game), mean_difference
+    and interval.
+    """
+    summary = dict()
+    valid_pairs = list()
+    for i in range(len(winners_without_novelty)):
+        valid_pairs.append(winners_without_novelty[i] is not None and winners_with_novelty[i] is not None)
+    for player_name in player_names:
+        differences = list()
+        for i in range(len(winners_without_novelty)):
+            if valid_pairs[i]:
+                differences.append(int(winners_with_novelty[i] == player_name) - int(winners_without_novelty[i] == player_name))
+            else:
+                differences.append(None)
+        valid_differences = [d for d in differences if d is not None]
+        mean_difference, (low, high) = mean_interval(valid_differences, confidence)
+        num_pairs = len(valid_differences)
+        player_summary = dict()
+        player_summary['num_pairs'] = num_pairs
+        player_summary['win_rate_without_novelty'] = None
+        player_summary['win_rate_with_novelty'] = None
+        if num_pairs > 0:
+            player_summary['win_rate_without_novelty'] = sum(1 for i in range(len(valid_pairs)) if valid_pairs[i] and
+                                                             winners_without_novelty[i] == player_name) / num_pairs
+            player_summary['win_rate_with_novelty'] = sum(1 for i in range(len(valid_pairs)) if valid_pairs[i] and
+                                                          winners_with_novelty[i] == player_name) / num_pairs
+        player_summary['differences'] = differences
+        player_summary['mean_difference'] = mean_difference
+        player_summary['interval'] = (max(-1.0, low), min(1.0, high))
+        summary[player_name] = player_summary
+    return summary
+
+
+def summarize_agent_matrix(game_records, agent_names, confidence=0.95):
+    """
+    Build the win and rank table of an agent matrix tournament, in which every combination of agents played the same seeds.
+    Agents are identified by the module names in the player_agents of each game record.
+    :param game_records: A list of game record dicts (see gameplay.simulate_game_instance) whose player_agents are set.
+    :param agent_names: A list of agent module names, the rows of the table.
+    :param confidence: A float. The confidence level of the win rate intervals.
+    :return: A dict. Key is an agent module name, value is a dict with the keys num_games, wins, win_rate, interval (Wilson
+    interval of the win rate) and mean_rank. The same agent playing in several seats of a game counts once per seat.
+    """
+    num_games = dict()
+    wins = dict()
+    rank_sums = dict()
+    for agent_name in agent_names:
+        num_games[agent_name] = 0
+        wins[agent_name] = 0
+        rank_sums[agent_name] = 0
+    for game_record in game_records:
+        ranks = metrics_helper.compute_player_ranks(game_record)
+        if not ranks:
+            continue
+        for player_name, agent_name in game_record['player_agents'].items():
+            if agent_name not in num_games:
+                continue
+            num_games[agent_name] += 1
+            rank_sums[agent_name] += ranks[player_name]
+            if game_record['winner'] == player_name:
+                wins[agent_name] += 1
+
+    table = dict()
+    for agent_name in agent_names:
+        agent_row = dict()
+        agent_row['num_games'] = num_games[agent_name]
+        agent_row['wins'] = wins[agent_name]
+        agent_row['win_rate'] = wins[agent_name] / num_games[agent_name] if num_games[agent_name] else None
+        agent_row['interval'] = wilson_interval(wins[agent_name], num_games[agent_name], confidence)
+        agent_row['mean_rank'] = rank_sums[agent_name] / num_games[agent_name] if num_games[agent_name] else None
+        table[agent_name] = agent_row
+    return table
+
+
+def create_stopping_rule(player_name, statistic='win_rate', margin=0.05, threshold=None, confidence=0.95, min_games=30):
+    """
+    Create a stopping rule for an adaptive tournament. The tournament stops as soon as the confidence interval of the
+    statistic has a half width of at most margin, or (if threshold is given) as soon as the threshold test rejects. The
+    number of games of the tournament is the upper cap on the number of games played.
+
+    The threshold is tested at the checkpoints min_games, 2 * min_games, 4 * min_games, ... games (per set of games, for
+    'novelty_difference'), on the first that many counted games: the k-th checkpoint (k = 0, 1, ...) rejects if the
+    interval at confidence 1 - (1 - confidence) / 2 ** (k + 1) lies entirely above or below threshold. As these levels
+    add up to at most 1 - confidence over any number of checkpoints, the chance that a tournament whose true value
+    equals threshold is ever stopped by the threshold test is at most 1 - confidence (up to the approximation of the
+    interval itself), no matter how often the rule is evaluated or how many games the tournament has. The margin test
+    is made on every evaluation and gives no such guarantee; it only decides when the estimate is precise enough.
+    :param player_name: String. The player whose wins are counted, e.g. 'player_1'.
+    :param statistic: String. 'win_rate' for the win rate of player_name over all games, or 'novelty_difference' for the
+    difference between its win rate in the games with novelty and in the games without novelty.
+    :param margin: A float or None. Stop once the half width of the confidence interval is at most this value.
+    :param threshold: A float or None. Stop once the threshold test (see above) rejects this value.
+    :param confidence: A float. The confidence level of the interval.
+    :param min_games: An integer. The minimum number of games (per set of games, for 'novelty_difference') that has to be
+    played before the rule can stop the tournament.
+    :return: A dict representing the stopping rule.
+    """
+    if statistic not in ['win_rate', 'novelty_difference']:
+        logger.error("Unknown statistic " + str(statistic) + " for stopping rule.")
+        logger.error("Exception")
+        raise Exception
+    if margin is None and threshold is None:
+        logger.error("A stopping rule needs a margin, a threshold or both.")
+        logger.error("Exception")
+        raise Exception
+    stopping_rule = dict()
+    stopping_rule['player_name'] = player_name
+    stopping_rule['statistic'] = statistic
+    stopping_rule['margin'] = margin
+    stopping_rule['threshold'] = threshold
+    stopping_rule['confidence'] = confidence
+    stopping_rule['min_games'] = min_games
+    return stopping_rule
+
+
+def evaluate_stopping_rule(stopping_rule, winners_without_novelty, winners_with_novelty, winners=None):
+    """
+    Evaluate a stopping rule on the games played so far. Failed games (winner None) are not counted. The checkpoints of
+    the threshold test are only fixed sets of games if every list of winners passed is in a fixed order, and every call
+    only appends games to the lists of the previous call (e.g., the leading finished games in job order).
+    :param stopping_rule: A dict created by create_stopping_rule
+    :param winners_without_novelty: A list of winners of the games played without novelty.
+    :param winners_with_novelty: A list of winners of the games played with novelty.
+    :param winners: A list or None. For 'win_rate', the winners of all games in one fixed order. If None, the games are
+    counted in the order winners_without_novelty + winners_with_novelty, which is only a fixed order if no game without
+    novelty is added once games with novelty are counted.
+    :return: A dict with the keys stop (boolean), num_games (number of games counted), estimate (the win rate or win rate
+    difference) and interval (a tuple (low, high)). If the threshold test rejected, also checkpoint (the number of games
+    per set of games it rejected at) and checkpoint_interval (the adjusted interval at that checkpoint).
+    """
+    player_name = stopping_rule['player_name']
+    confidence = stopping_rule['confidence']
+    games_without_novelty = [w for w in winners_without_novelty if w is not None]
+    games_with_novelty = [w for w in winners_with_novelty if w is not None]
+
+    evaluation = dict()
+    if stopping_rule['statistic'] == 'win_rate':
+        if winners is None:
+            winners = winners_without_novelty + winners_with_novelty
+        games = [w for w in winners if w is not None]
+        wins = games.count(player_name)
+        evaluation['num_games'] = len(games)
+        evaluation['estimate'] = wins / len(games) if games else None
+        evaluation['interval'] = wilson_interval(wins, len(games), confidence)
+        enough_games = len(games) >= stopping_rule['min_games']
+        num_looks_games = len(games)
+    else:
+        wins_1 = games_without_novelty.count(player_name)
+        wins_2 = games_with_novelty.count(player_name)
+        evaluation['num_games'] = len(games_without_novelty) + len(games_with_novelty)
+        if games_without_novelty and games_with_novelty:
+            evaluation['estimate'] = wins_2 / len(games_with_novelty) - wins_1 / len(games_without_novelty)
+        else:
+            evaluation['estimate'] = None
+        evaluation['interval'] = difference_interval(wins_1, len(games_without_novelty), wins_2, len(games_with_novelty),
+                                                     confidence)
+        enough_games = min(len(games_without_novelty), len(games_with_novelty)) >= stopping_rule['min_games']
+        num_looks_games = min(len(games_without_novelty), len(games_with_novelty))
+
+    low, high = evaluation['interval']
+    evaluation['stop'] = False
+    if enough_games:
+        if stopping_rule['margin'] is not None and (high - low) / 2 <= stopping_rule['margin']:
+            evaluation['stop'] = True
+        if stopping_rule['threshold'] is not None:
+            checkpoint = stopping_rule['min_games']
+            k = 0
+            while checkpoint <= num_looks_games:
+                look_confidence = 1 - (1 - confidence) / 2 ** (k + 1)
+                if stopping_rule['statistic'] == 'win_rate':
+                    look_interval = wilson_interval(games[:checkpoint].count(player_name), checkpoint, look_confidence)
+                else:
+                    look_interval = difference_interval(games_without_novelty[:checkpoint].count(player_name), checkpoint,
+                                                        games_with_novelty[:checkpoint].count(player_name), checkpoint,
+                                                        look_confidence)
+                if look_interval[0] > stopping_rule['threshold'] or look_interval[1] < stopping_rule['threshold']:
+                    evaluation['stop'] = True
+                    evaluation['checkpoint'] = checkpoint
+                    evaluation['checkpoint_interval'] = look_interval
+                    break
+                checkpoint *= 2
+                k += 1
+    return evaluation
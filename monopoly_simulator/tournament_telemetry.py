@@ -0,0 +1,168 @@
+"""
+This file contains the live telemetry of a running tournament. tournament_runner.run_game_jobs (and
+work_queue.run_local_queue_workers) feeds every finished game into a TournamentTelemetry object, and (if
+tournament_runner.telemetry_port is set) serves its counters over a small local HTTP endpoint in the Prometheus text
+exposition format, so monitoring can scrape it, e.g.:
+    curl http://127.0.0.1:9464/metrics
+
+The exposed metrics are the number of games planned, completed and failed, games and turns per second, the mean game
+length over the last games, the running win rate of every agent, the estimated time to completion, the time since the
+last game finished (to detect stalled workers) and the resident memory of the worker processes. The memory is labeled
+by worker slot rather than by process id: a worker that is recycled hands its slot to its replacement, so the number of
+series stays at the number of workers however many processes a long tournament goes through.
+"""
+
+import collections
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.tournament_telemetry')
+
+
+class TournamentTelemetry(object):
+    def __init__(self, num_games, window=100):
+        """
+        :param num_games: An integer. The number of games the tournament has to play.
+        :param window: An integer. The number of most recent games the rolling mean game length is computed over.
+        """
+        self.num_games = num_games
+        self.num_completed = 0
+        self.num_failed = 0
+        self.num_turns = 0
+        self.start_time = time.time()
+        self.last_game_time = None
+        self.recent_game_lengths = collections.deque(maxlen=window)  # (turns, wall time) of the most recent games
+        self.agent_games = dict()  # key is an agent (module name, or player name if the agents are not known)
+        self.agent_wins = dict()
+        self.worker_rss_mb = dict()  # key is a worker slot, value is the resident memory of its current worker
+        self.lock = threading.Lock()
+
+    def record_game(self, game_result, game_record, worker_slot=None):
+        """
+        Record a finished or failed game.
+        :param game_result: A dict returned by tournament_runner.play_game_job
+        :param game_record: The game record of the game (see gameplay.simulate_game_instance), or None for a failed game.
+        :param worker_slot: An integer or None. The slot of the worker that played the game, None to not record its memory
+        (e.g., a game played on another host).
+        :return: None
+        """
+        with self.lock:
+            self.last_game_time = time.time()
+            if worker_slot is not None:
+                if game_result.get('worker_rss_mb') is not None:
+                    self.worker_rss_mb[worker_slot] = game_result['worker_rss_mb']
+                else:   # the worker died
+                    self.worker_rss_mb.pop(worker_slot, None)
+            if game_result['status'] == 'failed':
+                self.num_failed += 1
+                return
+            self.num_completed += 1
+            if game_record is None:
+                return
+            self.num_turns += game_record['num_turns']
+            self.recent_game_lengths.append((game_record['num_turns'], game_record['wall_time']))
+            for player_name in game_record['final_cash']:
+                agent = player_name
+                if game_record.get('player_agents'):
+                    agent = game_record['player_agents'][player_name]
+                self.agent_games[agent] = self.agent_games.get(agent, 0) + 1
+                if game_record['winner'] == player_name:
+                    self.agent_wins[agent] = self.agent_wins.get(agent, 0) + 1
+
+    def render(self):
+        """
+        Render the counters in the Prometheus text exposition format.
+        :return: String.
+        """
+        with self.lock:
+            now = time.time()
+            elapsed = max(now - self.start_time, 1e-9)
+            num_done = self.num_completed + self.num_failed
+            games_per_second = num_done / elapsed
+            lines = list()
+
+            def add_metric(name, metric_type, help_text, samples):
+                lines.append('# HELP ' + name + ' ' + help_text)
+                lines.append('# TYPE ' + name + ' ' + metric_type)
+                for labels, value in samples:
+                    lines.append(name + labels + ' ' + repr(float(value)))
+
+            add_metric('monopoly_tournament_games_planned', 'gauge', 'Number of games the tournament has to play.',
+                       [('', self.num_games)])
+            add_metric('monopoly_tournament_games_completed_total', 'counter', 'Number of games that finished.',
+                       [('', self.num_completed)])
+            add_metric('monopoly_tournament_games_failed_total', 'counter', 'Number of games that failed.',
+                       [('', self.num_failed)])
+            add_metric('monopoly_tournament_games_per_second', 'gauge', 'Games finished or failed per second since the start.',
+                       [('', games_per_second)])
+            add_metric('monopoly_tournament_turns_per_second', 'gauge', 'Turns played per second since the start.',
+                       [('', self.num_turns / elapsed)])
+            if self.recent_game_lengths:
+                add_metric('monopoly_tournament_game_length_turns', 'gauge', 'Mean number of turns of the most recent games.',
+                           [('', sum(g[0] for g in self.recent_game_lengths) / len(self.recent_game_lengths))])
+                add_metric('monopoly_tournament_game_length_seconds', 'gauge', 'Mean wall time of the most recent games.',
+                           [('', sum(g[1] for g in self.recent_game_lengths) / len(self.recent_game_lengths))])
+            if games_per_second > 0:
+                add_metric('monopoly_tournament_eta_seconds', 'gauge', 'Estimated time until all games are done.',
+                           [('', max(0, self.num_games - num_done) / games_per_second)])
+            if self.last_game_time is not None:
+                add_metric('monopoly_tournament_seconds_since_last_game', 'gauge', 'Seconds since the last game finished.',
+                           [('', now - self.last_game_time)])
+            add_metric('monopoly_tournament_win_rate', 'gauge', 'Running win rate of every agent.',
+                       [('{agent="' + agent + '"}', self.agent_wins.get(agent, 0) / self.agent_games[agent])
+                        for agent in sorted(self.agent_games)])
+            add_metric('monopoly_tournament_worker_rss_megabytes', 'gauge', 'Resident memory of the worker in every slot after its last game.',
+                       [('{slot="' + str(slot) + '"}', self.worker_rss_mb[slot]) for slot in sorted(self.worker_rss_mb)])
+            if self.worker_rss_mb:
+                add_metric('monopoly_tournament_worker_rss_megabytes_max', 'gauge', 'Largest resident memory of the workers.',
+                           [('', max(self.worker_rss_mb.values()))])
+                add_metric('monopoly_tournament_worker_rss_megabytes_mean', 'gauge', 'Mean resident memory of the workers.',
+                           [('', sum(self.worker_rss_mb.values()) / len(self.worker_rss_mb))])
+            return '\n'.join(lines) + '\n'
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def start_telemetry_server(telemetry, port, host='127.0.0.1'):
+    """
+    Serve the telemetry on http://host:port/metrics from a background thread.
+    :param telemetry: A TournamentTelemetry object.
+    :param port: An integer. The port to listen on.
+    :param host: String. The address to listen on. Defaults to the local machine only.
+    :return: The server object, to be passed to stop_telemetry_server.
+    """
+    class TelemetryHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ['/metrics', '/']:
+                self.send_error(404)
+                return
+            body = telemetry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug('telemetry request: ' + format % args)
+
+    server = _ThreadingHTTPServer((host, port), TelemetryHandler)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    print('Serving tournament telemetry on http://' + host + ':' + str(server.server_address[1]) + '/metrics')
+    return server
+
+
+def stop_telemetry_server(server):
+    """
+    Stop a server started by start_telemetry_server.
+    :param server: The server object.
+    :return: None
+    """
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,181 @@
+"""
+This file contains the undo stack that lets a lookahead (search) agent try an action on the real gameboard and take it
+back, instead of deep copying current_gameboard before every trial:
+    undo = attach_undo_stack(current_gameboard)
+    undo.push()
+    action_choices.improve_property(player, asset, current_gameboard)   # or any other action
+    ... evaluate current_gameboard ...
+    undo.undo()    # the gameboard is back to what it was at push()
+    undo.redo()    # and forward again, if the action should be kept after all
+    detach_undo_stack(current_gameboard)
+
+The state-changing primitives (Player.charge_player, receive_cash, add_asset, remove_asset, update_player_position,
+send_to_jail, Location.update_asset_owner, transfer_property_to_bank, transfer_property_between_players and the actions
+in action_choices.py and card_utility_actions.py that change the board) save the objects they are about to change onto
+current_gameboard['undo_stack'] (None when no agent is searching, so they only pay one lookup). An object is saved the
+first time it is changed after a push: its attributes, with a copy of every list, set and dict attribute. undo puts the
+saved attributes back (restoring lists, sets and dicts in place, so references to them stay valid), so both saving and
+undoing cost time in proportion to the objects the actions changed, not to the size of the board.
+
+What is not taken back: the game history (search with the history level set to 'off', see game_history.py), the time
+step indicator, the random streams of the game (dice and card draws made during a trial stay drawn) and the agents'
+own memory. make_sell_property_offer only saves to_player if it gets current_gameboard: moves executed through
+Player._execute_action save the players among their params, but an agent calling it directly should pass the gameboard.
+"""
+
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.undo_stack')
+
+
+class UndoStack(object):
+    def __init__(self):
+        self.undo_points = list()  # one dict per push: key is id() of a saved object (or of a dict and key), value is its saved state
+        self.redo_points = list()  # the undo points taken back by undo, with the state they were taken back from
+
+    def push(self):
+        """
+        Start a new undo point: undo takes the gameboard back to its state at this call. Pushing forgets what could be
+        redone.
+        :return: An integer. The number of open undo points.
+        """
+        self.undo_points.append(dict())
+        del self.redo_points[:]
+        return len(self.undo_points)
+
+    def save(self, *objects):
+        """
+        Save the state of objects (players, locations, the bank...) that are about to be changed, unless they were saved
+        since the last push already. Does nothing if there is no open undo point.
+        :param objects: The objects.
+        :return: None
+        """
+        if not self.undo_points:
+            return
+        undo_point = self.undo_points[-1]
+        for obj in objects:
+            if obj is not None and id(obj) not in undo_point:
+                undo_point[id(obj)] = (obj, None, _snapshot(obj))
+
+    def save_items(self, d, *keys):
+        """
+        Save entries of a dict (e.g., the card packs of the gameboard) that are about to be changed, unless they were
+        saved since the last push already. Does nothing if there is no open undo point.
+        :param d: A dict.
+        :param keys: The keys of the entries.
+        :return: None
+        """
+        if not self.undo_points:
+            return
+        undo_point = self.undo_points[-1]
+        for key in keys:
+            if (id(d), key) not in undo_point:
+                undo_point[(id(d), key)] = (d, key, _snapshot_item(d, key))
+
+    def undo(self):
+        """
+        Take the gameboard back to its state at the last push, and close that undo point.
+        :return: None
+        """
+        if not self.undo_points:
+            logger.error("Nothing to undo.")
+            logger.error("Exception")
+            raise Exception
+        undo_point = self.undo_points.pop()
+        self.redo_points.append((undo_point, _take_back(undo_point)))
+
+    def redo(self):
+        """
+        Put back the changes taken back by the last undo, and open its undo point again.
+        :return: None
+        """
+        if not self.redo_points:
+            logger.error("Nothing to redo.")
+            logger.error("Exception")
+            raise Exception
+        undo_point, redo_point = self.redo_points.pop()
+        _take_back(redo_point)
+        self.undo_points.append(undo_point)
+
+    def commit(self):
+        """
+        Keep the changes made since the last push and close its undo point. The changes are merged into the enclosing
+        undo point (if any), so undoing that one still takes them back.
+        :return: None
+        """
+        if not self.undo_points:
+            logger.error("Nothing to commit.")
+            logger.error("Exception")
+            raise Exception
+        undo_point = self.undo_points.pop()
+        if self.undo_points:
+            for k, v in undo_point.items():
+                self.undo_points[-1].setdefault(k, v)
+        del self.redo_points[:]
+
+
+def attach_undo_stack(current_gameboard):
+    """
+    Make the state-changing primitives save what they change onto a new undo stack.
+    :param current_gameboard: A dict. The global data structure representing the current game board.
+    :return: The UndoStack.
+    """
+    current_gameboard['undo_stack'] = UndoStack()
+    return current_gameboard['undo_stack']
+
+
+def detach_undo_stack(current_gameboard):
+    """
+    Stop saving changes. Whatever was not undone is kept.
+    :param current_gameboard: A dict. The global data structure representing the current game board.
+    :return: None
+    """
+    current_gameboard['undo_stack'] = None
+
+
+def _copy_container(value):
+    value_type = type(value)
+    if value_type is list or value_type is set or value_type is dict:
+        return value_type(value)
+    return None
+
+
+def _snapshot(obj):
+    return [(k, v, _copy_container(v)) for k, v in obj.__dict__.items()]
+
+
+def _snapshot_item(d, key):
+    if key not in d:
+        return None
+    return d[key], _copy_container(d[key])
+
+
+def _restore_value(value, content):
+    if content is not None:   # lists, sets and dicts get their content back in place
+        if type(value) is list:
+            value[:] = content
+        else:
+            value.clear()
+            value.update(content)
+    return value
+
+
+def _take_back(undo_point):
+    """
+    Restore every state saved in an undo point, and return the states that were replaced (as an undo point, so the
+    restore can be taken back in turn).
+    """
+    replaced = dict()
+    for k, (obj, key, state) in undo_point.items():
+        if key is None:
+            replaced[k] = (obj, None, _snapshot(obj))
+            attributes = obj.__dict__
+            attributes.clear()
+            for name, value, content in state:
+                attributes[name] = _restore_value(value, content)
+        else:
+            replaced[k] = (obj, key, _snapshot_item(obj, key))
+            if state is None:
+                obj.pop(key, None)
+            else:
+                obj[key] = _restore_value(state[0], state[1])
+    return replaced
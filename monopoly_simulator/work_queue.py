@@ -0,0 +1,378 @@
+"""
+This file contains a pull based work queue that lets several machines play the games of one tournament. The queue is a
+SQLite database (one row per game job) that lives in the tournament log folder on a shared filesystem. Any number of
+workers, on any number of hosts, call run_queue_worker on the same queue file: every worker repeatedly claims the next
+game, plays it through tournament_runner.play_game_job and commits its result, until the queue is drained. Starting one
+more worker (e.g., on a new host) therefore speeds up a tournament that is already running.
+
+A claimed game is leased to its worker for lease_time seconds. If the worker dies, the lease expires and the game goes
+back to the queue, where the next worker picks it up. Every claim and every result is a single SQLite transaction.
+
+Note that SQLite relies on file locks, which some network filesystems (notably older NFS setups) do not implement
+correctly. Use a filesystem with working POSIX locks for the queue file.
+
+Workers on other hosts are started from the monopoly_simulator folder (the game schema path is relative to it), e.g.:
+    python work_queue.py ../tournament_logs/my_tournament/tournament_queue.sqlite [number of worker processes]
+"""
+
+import sqlite3
+import json
+import time
+import os
+import socket
+import gc
+import importlib
+import multiprocessing
+import multiprocessing.connection
+from monopoly_simulator import tournament_runner
+from monopoly_simulator import tournament_telemetry
+import logging
+logger = logging.getLogger('monopoly_simulator.logging_info.work_queue')
+
+max_failed_workers = 3  # run_local_queue_workers gives up once this many workers in a row exited without committing a game
+
+
+def _connect(queue_file):
+    # isolation_level=None: we issue BEGIN IMMEDIATE ourselves, so that a claim takes the write lock before it reads
+    connection = sqlite3.connect(queue_file, timeout=60, isolation_level=None)
+    return connection
+
+
+def _function_to_name(function):
+    if function is None:
+        return None
+    if function.__module__ == '__main__':
+        logger.error("Novelty injection function " + function.__name__ + " must be defined in an importable module to be queued.")
+        logger.error("Exception")
+        raise Exception
+    return function.__module__ + ':' + function.__name__
+
+
+def _name_to_function(function_name):
+    if function_name is None:
+        return None
+    module_name, name = function_name.split(':')
+    return getattr(importlib.import_module(module_name), name)
+
+
+def create_work_queue(queue_file, game_jobs, max_attempts=3, length_file=None):
+    """
+    Create a queue holding the given game jobs. If the queue file already exists, it is left as it is, so a tournament
+    whose queue was partially drained can be restarted without playing its finished games again.
+    :param queue_file: String. Path to the SQLite queue file.
+    :param game_jobs: A list of dicts created by tournament_runner.create_game_job. Novelty injection functions are stored
+    by name and must be module level functions of an importable module (e.g., test_harness).
+    :param max_attempts: An integer. A game whose worker died (lease expired) this many times is marked as failed instead
+    of being handed out again.
+    :param length_file: String. Path to a game length file (see tournament_runner.order_by_expected_length). If given,
+    workers claim the games that are expected to be longest first, and append the length of every game they finish to it.
+    :return: None
+    """
+    if os.path.isfile(queue_file):
+        print('Work queue ' + queue_file + ' already exists, not adding jobs to it.')
+        return
+    connection = _connect(queue_file)
+    try:
+        connection.execute('BEGIN IMMEDIATE')
+        connection.execute('CREATE TABLE jobs (job_index INTEGER PRIMARY KEY, job TEXT NOT NULL, status TEXT NOT NULL, '
+                           'worker_id TEXT, lease_expires REAL, attempts INTEGER NOT NULL, result TEXT, game_record TEXT, '
+                           'claim_order INTEGER NOT NULL)')
+        connection.execute('CREATE TABLE settings (name TEXT PRIMARY KEY, value TEXT)')
+        connection.execute('INSERT INTO settings VALUES (?, ?)', ('max_attempts', str(max_attempts)))
+        connection.execute('INSERT INTO settings VALUES (?, ?)', ('length_file', length_file))
+        if length_file:
+            game_jobs = tournament_runner.order_by_expected_length(game_jobs, length_file)
+        for claim_order in range(len(game_jobs)):
+            serialized_job = dict(game_jobs[claim_order])
+            serialized_job['inject_novelty_function'] = _function_to_name(serialized_job['inject_novelty_function'])
+            connection.execute('INSERT INTO jobs VALUES (?, ?, ?, NULL, NULL, 0, NULL, NULL, ?)',
+                               (serialized_job['index'], json.dumps(serialized_job), 'pending', claim_order))
+        connection.execute('COMMIT')
+    finally:
+        connection.close()
+
+
+def claim_job(queue_file, worker_id, lease_time=600):
+    """
+    Claim the next game of the queue: the first pending game in claim order, or else a game whose lease has expired.
+    :param queue_file: String. Path to the SQLite queue file.
+    :param worker_id: String. Identifies the worker that holds the lease.
+    :param lease_time: A number. Seconds after which the game goes back to the queue if no result was committed.
+    :return: A game job dict, or None if no game can be claimed right now.
+    """
+    connection = _connect(queue_file)
+    try:
+        connection.execute('BEGIN IMMEDIATE')
+        now = time.time()
+        max_attempts = int(connection.execute("SELECT value FROM settings WHERE name = 'max_attempts'").fetchone()[0])
+        # games whose worker died too often are given up on
+        connection.execute("UPDATE jobs SET status = 'failed', result = ? WHERE status = 'leased' AND lease_expires < ? "
+                           "AND attempts >= ?", (json.dumps({'error': 'lease expired ' + str(max_attempts) + ' times'}),
+                                                 now, max_attempts))
+        row = connection.execute("SELECT job_index, job FROM jobs WHERE status = 'pending' OR (status = 'leased' AND "
+                                 "lease_expires < ?) ORDER BY claim_order LIMIT 1", (now,)).fetchone()
+        if row is None:
+            connection.execute('COMMIT')
+            return None
+        connection.execute("UPDATE jobs SET status = 'leased', worker_id = ?, lease_expires = ?, attempts = attempts + 1 "
+                           "WHERE job_index = ?", (worker_id, now + lease_time, row[0]))
+        connection.execute('COMMIT')
+    finally:
+        connection.close()
+    game_job = json.loads(row[1])
+    game_job['inject_novelty_function'] = _name_to_function(game_job['inject_novelty_function'])
+    return game_job
+
+
+def complete_job(queue_file, worker_id, game_result):
+    """
+    Commit the result of a game. The result is only accepted from the worker that currently holds the lease, or (if
+    the lease expired and nobody else claimed the game in the meantime) from its previous holder.
+    :param queue_file: String. Path to the SQLite queue file.
+    :param worker_id: String. The worker that played the game.
+    :param game_result: A dict returned by tournament_runner.play_game_job
+    :return: A boolean. Whether the result was accepted.
+    """
+    game_result = dict(game_result)
+    game_record = game_result.pop('game_record', None)
+    connection = _connect(queue_file)
+    try:
+        connection.execute('BEGIN IMMEDIATE')
+        cursor = connection.execute("UPDATE jobs SET status = ?, result = ?, game_record = ?, lease_expires = NULL "
+                                    "WHERE job_index = ? AND status = 'leased' AND worker_id = ?",
+                                    (game_result['status'], json.dumps(game_result), json.dumps(game_record),
+                                     game_result['index'], worker_id))
+        connection.execute('COMMIT')
+        return cursor.rowcount == 1
+    finally:
+        connection.close()
+
+
+def _read_setting(queue_file, name):
+    connection = _connect(queue_file)
+    try:
+        row = connection.execute('SELECT value FROM settings WHERE name = ?', (name,)).fetchone()
+        return row[0] if row is not None else None
+    finally:
+        connection.close()
+
+
+def get_queue_status(queue_file):
+    """
+    Count the games of the queue by status.
+    :param queue_file: String. Path to the SQLite queue file.
+    :return: A dict. Key is a status ('pending', 'leased', 'finished' or 'failed'), value is the number of games.
+    """
+    connection = _connect(queue_file)
+    try:
+        queue_status = {'pending': 0, 'leased': 0, 'finished': 0, 'failed': 0}
+        for status, count in connection.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status'):
+            queue_status[status] = count
+        return queue_status
+    finally:
+        connection.close()
+
+
+def read_queue_results(queue_file):
+    """
+    Read the results committed to the queue.
+    :param queue_file: String. Path to the SQLite queue file.
+    :return: A tuple (game_results, game_records). game_results is a dict keyed by game index of the result dicts of
+    the finished and failed games. game_records is the list of game records (see gameplay.simulate_game_instance) of the
+    finished games, sorted by game index.
+    """
+    connection = _connect(queue_file)
+    try:
+        game_results = dict()
+        game_records = list()
+        for job_index, result, game_record in connection.execute("SELECT job_index, result, game_record FROM jobs WHERE "
+                                                                 "status IN ('finished', 'failed') ORDER BY job_index"):
+            game_results[job_index] = json.loads(result)
+            if game_record is not None:
+                game_record = json.loads(game_record)
+                if game_record is not None:
+                    game_records.append(game_record)
+        return game_results, game_records
+    finally:
+        connection.close()
+
+
+def _count_worker_games(queue_file, worker_id):
+    # games whose result was committed by this worker (a finished or failed game is never claimed again, so its
+    # worker_id stays that of the worker that played it)
+    connection = _connect(queue_file)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM jobs WHERE worker_id = ? AND status IN ('finished', 'failed')",
+                                  (worker_id,)).fetchone()[0]
+    finally:
+        connection.close()
+
+
+def _record_new_results(queue_file, telemetry, recorded_jobs, worker_slots):
+    # feed the games committed since the last call into the telemetry (if any), and add them to recorded_jobs
+    connection = _connect(queue_file)
+    try:
+        for job_index, status, worker_id in connection.execute("SELECT job_index, status, worker_id FROM jobs WHERE "
+                                                               "status IN ('finished', 'failed')").fetchall():
+            if job_index in recorded_jobs:
+                continue
+            recorded_jobs.add(job_index)
+            if telemetry is None:
+                continue
+            result, game_record = connection.execute('SELECT result, game_record FROM jobs WHERE job_index = ?',
+                                                     (job_index,)).fetchone()
+            game_result = json.loads(result)
+            game_result['status'] = status   # a game given up on after its lease expired only has an error as result
+            if game_record is not None:
+                game_record = json.loads(game_record)
+            telemetry.record_game(game_result, game_record, worker_slots.get(worker_id))
+    finally:
+        connection.close()
+
+
+def export_results(queue_file, results_file):
+    """
+    Write the game records committed to the queue into a results file (one json line per game), the format read by
+    metrics_helper.read_game_results.
+    :param queue_file: String. Path to the SQLite queue file.
+    :param results_file: String. Path to the results file, which is overwritten.
+    :return: None
+    """
+    game_results, game_records = read_queue_results(queue_file)
+    with open(results_file, 'w') as filewrite:
+        for game_record in game_records:
+            filewrite.write(json.dumps(game_record) + '\n')
+
+
+def run_queue_worker(queue_file, worker_id=None, lease_time=600, poll_interval=5, max_games=None, max_rss_mb=None):
+    """
+    Drain the queue: claim a game, play it and commit its result, over and over. When no game can be claimed but other
+    workers still hold leases, the worker waits poll_interval seconds and tries again, since those leases may expire. It
+    returns once every game is finished or failed, or earlier once it has to be recycled (see tournament_runner.py). If
+    the queue was created with a game length file, the length of every game the worker finishes is appended to it.
+    :param queue_file: String. Path to the SQLite queue file.
+    :param worker_id: String. Identifies this worker in the queue. Defaults to the host name and process id.
+    :param lease_time: A number. Seconds a claimed game stays leased to this worker. It must be longer than the longest game.
+    :param poll_interval: A number. Seconds to wait before looking for expired leases.
+    :param max_games: An integer or None. Return after committing this many games.
+    :param max_rss_mb: A number or None. Return once the resident memory of the process exceeds this many MB after a game.
+    :return: An integer. The number of games this worker played.
+    """
+    if worker_id is None:
+        worker_id = socket.gethostname() + ':' + str(os.getpid())
+    tournament_runner._initialize_worker()
+    length_file = _read_setting(queue_file, 'length_file')
+    count = 0
+    while True:
+        game_job = claim_job(queue_file, worker_id, lease_time)
+        if game_job is None:
+            queue_status = get_queue_status(queue_file)
+            if queue_status['pending'] == 0 and queue_status['leased'] == 0:
+                break
+            time.sleep(poll_interval)
+            continue
+        game_result = tournament_runner.play_game_job(game_job)
+        if complete_job(queue_file, worker_id, game_result):
+            count += 1
+            if length_file and game_result['game_record'] is not None:
+                # one short line per write, so the appends of the workers of a host do not interleave
+                tournament_runner._append_json_line(length_file, {'key': tournament_runner._game_length_key(game_job),
+                                                                  'num_turns': game_result['game_record']['num_turns']})
+            print(worker_id + ' finished gameplay for seed: ', str(game_result['seed']), ' (worker rss ' +
+                  str(game_result['worker_rss_mb']) + ' MB)')
+        else:
+            logger.debug(worker_id + ' lost the lease on the game with seed ' + str(game_result['seed']))
+        if (max_games is not None and count >= max_games) or \
+                (max_rss_mb is not None and game_result['worker_rss_mb'] >= max_rss_mb):
+            break
+    return count
+
+
+def run_local_queue_workers(queue_file, num_workers=None, lease_time=600, metrics_port=None):
+    """
+    Drain the queue with num_workers worker processes on this machine. Workers are recycled like the workers of
+    tournament_runner.run_game_jobs (after tournament_runner.max_games_per_worker games, or once they exceed
+    tournament_runner.max_worker_rss_mb): a worker that returns is replaced as long as the queue has games left. In fork
+    server mode (tournament_runner.fork_server) the workers are forked from this process after it preloaded the simulator
+    and the board prototype. A worker that exits with an error or without committing a game is replaced too, but once
+    max_failed_workers workers in a row did so (e.g., every worker fails to start up), the remaining workers are
+    terminated and an exception is raised instead of starting new workers forever.
+    :param queue_file: String. Path to the SQLite queue file.
+    :param num_workers: An integer. The number of worker processes. If None, one worker per cpu is used.
+    :param lease_time: A number. Seconds a claimed game stays leased to its worker.
+    :param metrics_port: An integer. If given, the live counters of the games committed to the queue (by any host) while
+    the workers run are served on this local port (see tournament_telemetry.py). Only the memory of the local workers is
+    reported. Defaults to tournament_runner.telemetry_port.
+    :return: None
+    """
+    if num_workers is None:
+        num_workers = multiprocessing.cpu_count()
+    if metrics_port is None:
+        metrics_port = tournament_runner.telemetry_port
+    context = tournament_runner._worker_context()
+    frozen = context.get_start_method() == 'fork' and tournament_runner.fork_server
+
+    def start_worker(slot):
+        worker = context.Process(target=run_queue_worker, args=(queue_file, None, lease_time, 5,
+                                                                        tournament_runner.max_games_per_worker,
+                                                                        tournament_runner.max_worker_rss_mb))
+        worker.start()
+        workers[worker.sentinel] = [worker, slot]
+        worker_slots[socket.gethostname() + ':' + str(worker.pid)] = slot
+
+    workers = dict()  # key is the sentinel of a worker process, value is [worker process, slot]
+    worker_slots = dict()  # key is the worker id of a local worker, value is its slot (a replacement takes over the slot)
+    num_failed_workers = 0  # workers in a row that exited with an error or without committing a game
+    recorded_jobs = set()  # indices of the games that were done before the workers started or fed into the telemetry
+    telemetry = None
+    telemetry_server = None
+    if metrics_port is not None:
+        _record_new_results(queue_file, None, recorded_jobs, worker_slots)
+        queue_status = get_queue_status(queue_file)
+        telemetry = tournament_telemetry.TournamentTelemetry(queue_status['pending'] + queue_status['leased'])
+        telemetry_server = tournament_telemetry.start_telemetry_server(telemetry, metrics_port)
+    if frozen:
+        tournament_runner._preload_fork_server(list())
+    try:
+        for i in range(num_workers):
+            start_worker(i)
+        while workers:
+            # with telemetry, wake up every few seconds to pick up the games committed in the meantime
+            sentinels = multiprocessing.connection.wait(list(workers), None if telemetry is None else 5)
+            if telemetry is not None:
+                _record_new_results(queue_file, telemetry, recorded_jobs, worker_slots)
+            for sentinel in sentinels:
+                worker, slot = workers.pop(sentinel)
+                worker.join()
+                queue_status = get_queue_status(queue_file)
+                if queue_status['pending'] == 0 and queue_status['leased'] == 0:
+                    continue
+                num_games = _count_worker_games(queue_file, socket.gethostname() + ':' + str(worker.pid))
+                if worker.exitcode != 0 or num_games == 0:
+                    num_failed_workers += 1
+                    logger.error('Worker process ' + str(worker.pid) + ' exited (exit code ' + str(worker.exitcode) +
+                                 ') after committing ' + str(num_games) + ' games')
+                    if num_failed_workers >= max_failed_workers:
+                        logger.error(str(num_failed_workers) + ' worker processes in a row failed, giving up on queue ' +
+                                     queue_file)
+                        logger.error("Exception")
+                        raise Exception
+                else:
+                    num_failed_workers = 0
+                start_worker(slot)
+    finally:
+        for worker, slot in workers.values():
+            worker.terminate()
+            worker.join()
+        if frozen:
+            gc.unfreeze()
+        if telemetry_server is not None:
+            tournament_telemetry.stop_telemetry_server(telemetry_server)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 2:
+        run_local_queue_workers(sys.argv[1], int(sys.argv[2]))
+    else:
+        run_local_queue_workers(sys.argv[1])
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+repository_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if repository_folder not in sys.path:
+    sys.path.insert(0, repository_folder)
+
+
+@pytest.fixture(autouse=True)
+def simulator_folder(monkeypatch):
+    # the simulator opens the game schema and writes its logs relative to the monopoly_simulator folder
+    monkeypatch.chdir(os.path.join(repository_folder, 'monopoly_simulator'))
+
+
+@pytest.fixture
+def clean_action_choices():
+    # novelty injection functions monkey patch action_choices; undo whatever a test leaves behind
+    from monopoly_simulator import action_choices
+    namespace = dict(vars(action_choices))
+    yield action_choices
+    for k, v in namespace.items():
+        setattr(action_choices, k, v)
@@ -0,0 +1,34 @@
+import shutil
+
+from monopoly_simulator import background_agent_v3_1
+from monopoly_simulator import background_agent_v3_1_interaction_accept_offer
+from monopoly_simulator import test_harness
+from monopoly_simulator import tournament_runner
+
+
+def test_agent_matrix_plays_line_ups_with_repeated_agents(tmp_path, monkeypatch):
+    monkeypatch.setattr(tournament_runner, 'game_length_file', str(tmp_path / 'game_lengths.jsonl'))
+    variant = background_agent_v3_1_interaction_accept_offer
+    try:
+        table, combination_tables = test_harness.play_agent_matrix_parallel(
+            '/_test_agent_matrix/', num_games=1, num_workers=1,
+            agent_combinations=[[background_agent_v3_1, background_agent_v3_1, background_agent_v3_1, variant]])
+    finally:
+        shutil.rmtree('../tournament_logs/_test_agent_matrix/', ignore_errors=True)
+    # one seed, four seat arrangements: the variant plays one seat of every game
+    assert table[variant.__name__]['num_games'] == 4
+    assert table[background_agent_v3_1.__name__]['num_games'] == 12
+    assert combination_tables[0][0] == [background_agent_v3_1.__name__, variant.__name__]
+
+
+def test_agent_matrix_defaults_to_combinations_with_repeated_agents(tmp_path, monkeypatch):
+    monkeypatch.setattr(tournament_runner, 'game_length_file', str(tmp_path / 'game_lengths.jsonl'))
+    try:
+        table, combination_tables = test_harness.play_agent_matrix_parallel(
+            '/_test_agent_matrix/', num_games=1, num_workers=2,
+            agent_pool=[background_agent_v3_1, background_agent_v3_1_interaction_accept_offer])
+    finally:
+        shutil.rmtree('../tournament_logs/_test_agent_matrix/', ignore_errors=True)
+    # 4 + 0, 3 + 1, 2 + 2, 1 + 3 and 0 + 4 seats
+    assert len(combination_tables) == 5
+    assert sum(row['num_games'] for row in table.values()) == 5 * 4 * 4
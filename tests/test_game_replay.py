@@ -0,0 +1,41 @@
+import pytest
+
+from monopoly_simulator import background_agent_v3_1
+from monopoly_simulator import background_agent_v3_1_action_novelty
+from monopoly_simulator import background_agent_v3_1_interaction_accept_offer
+from monopoly_simulator import background_agent_v3_1_interaction_make_offer
+from monopoly_simulator import game_replay
+from monopoly_simulator import gameplay
+from monopoly_simulator import initialize_game_elements
+from monopoly_simulator.agent import Agent
+
+# the agents test_harness plays with
+agent_modules = [background_agent_v3_1, background_agent_v3_1_action_novelty, background_agent_v3_1_interaction_accept_offer,
+                 background_agent_v3_1_interaction_make_offer]
+line_ups = [[agent_module] * 4 for agent_module in agent_modules] + [agent_modules, agent_modules[::-1]]
+
+
+@pytest.fixture
+def board_prototype():
+    return gameplay.set_up_board_prototype('../monopoly_game_schema_v1-2.json')
+
+
+def _record_game(board_prototype, line_up, seed):
+    player_decision_agents = dict()
+    for i in range(4):
+        player_decision_agents['player_' + str(i + 1)] = Agent(**line_up[i].decision_agent_methods)
+    game_elements = initialize_game_elements.clone_board(board_prototype, player_decision_agents)
+    for player_name in player_decision_agents:
+        player_decision_agents[player_name].startup(game_elements)
+    recorder = game_replay.ReplayRecorder()
+    game_result = gameplay.simulate_game_instance(game_elements, np_seed=seed, return_game_result=True, replay=recorder)
+    return game_result, recorder.record
+
+
+@pytest.mark.parametrize('line_up', line_ups, ids=lambda line_up: '-'.join(m.__name__.split('.')[-1] for m in line_up))
+@pytest.mark.parametrize('seed', range(5))
+def test_replay_round_trip(board_prototype, line_up, seed):
+    game_result, record = _record_game(board_prototype, line_up, seed)
+    replayed_result = game_replay.replay_game(game_replay.loads_replay(game_replay.dumps_replay(record)), board_prototype)
+    for k in ['winner', 'num_turns', 'elimination_order', 'final_cash', 'final_net_worth']:
+        assert replayed_result[k] == game_result[k]
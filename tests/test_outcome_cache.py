@@ -0,0 +1,18 @@
+import pytest
+
+from monopoly_simulator import gameplay
+from monopoly_simulator import test_harness
+
+
+@pytest.mark.parametrize('novelty_info, inject_novelty_function', [(False, None), (True, test_harness.improvePropertyRed_novelty),
+                                                                   (True, None)])
+def test_every_startup_branch_caches_the_outcome(tmp_path, clean_action_choices, novelty_info, inject_novelty_function):
+    cache_dir = str(tmp_path / 'outcome_cache')
+    game_result = gameplay.play_game_in_tournament(14353, novelty_info, inject_novelty_function, return_game_result=True,
+                                                   outcome_cache_dir=cache_dir)
+    assert not game_result.get('cached')
+    cached_result = gameplay.play_game_in_tournament(14353, novelty_info, inject_novelty_function,
+                                                     return_game_result=True, outcome_cache_dir=cache_dir)
+    assert cached_result['cached']
+    assert cached_result['winner'] == game_result['winner']
+    assert cached_result['num_turns'] == game_result['num_turns']
@@ -0,0 +1,72 @@
+import json
+
+from monopoly_simulator import background_agent_v3_1
+from monopoly_simulator import client_agent_serial
+from monopoly_simulator import gameplay_socket
+from monopoly_simulator import server_agent_serial
+from monopoly_simulator.agent import Agent
+from monopoly_simulator.serialization import serialize_gameboard
+
+
+class _LoopbackConnection(object):
+    # plays the part of the socket and of the ClientAgent.play_remote_game loop on the other end of it, and checks that the
+    # gameboard the client keeps is the full serialized gameboard of the server at every request
+    def __init__(self, client, lose_gameboard_at):
+        self.client = client
+        self.lose_gameboard_at = lose_gameboard_at
+        self.game_elements = None
+        self.num_requests = 0
+        self.num_resyncs = 0
+        self.reply = None
+
+    def send_message(self, message):
+        data_dict_from_server = json.loads(message)
+        self.num_requests += 1
+        if self.num_requests == self.lose_gameboard_at:
+            self.client.current_gameboard = None
+        if not self.client._update_gameboard(data_dict_from_server):
+            self.num_resyncs += 1
+            self.reply = json.dumps({'function': 'resync_gameboard'})
+            return
+        full_gameboard = json.loads(json.dumps(serialize_gameboard(self.game_elements)))
+        assert data_dict_from_server['current_gameboard'] == full_gameboard
+        result = None
+        if data_dict_from_server['function'] != 'startup':
+            result = getattr(client_agent_serial, data_dict_from_server['function'])(data_dict_from_server)
+        if isinstance(result, (int, float, bool)):
+            self.reply = str(result)
+        else:
+            self.reply = json.dumps(result)
+
+    def recv_message(self):
+        return self.reply
+
+
+def test_delta_gameboard_round_trip():
+    server_agent = server_agent_serial.ServerAgent.__new__(server_agent_serial.ServerAgent)   # without a listener
+    Agent.__init__(server_agent, **server_agent_serial._build_decision_agent_methods_dict())
+    server_agent.delta_gameboard = True
+    server_agent.acked_gameboard = None
+    server_agent.gameboard_version = 0
+    server_agent.conn = _LoopbackConnection(client_agent_serial.ClientAgent(), lose_gameboard_at=40)
+    player_decision_agents = {'player_1': server_agent}
+    for player_name in ['player_2', 'player_3', 'player_4']:
+        player_decision_agents[player_name] = Agent(**background_agent_v3_1.decision_agent_methods)
+    game_elements = gameplay_socket.set_up_board('../monopoly_game_schema_v1-2.json', player_decision_agents)
+    server_agent.conn.game_elements = game_elements
+    # an event recorded before startup is sent with the startup gameboard, and must not be sent again
+    player = game_elements['players'][0]
+    game_elements['history'].record(player.receive_cash, ('self', 'amount', 'description'), (player, 0, 'test'), 1, 0)
+    for agent in player_decision_agents.values():
+        agent.startup(game_elements)
+    gameplay_socket.simulate_game_instance(game_elements, np_seed=11, history_window=None)
+    assert server_agent.conn.num_requests > 40
+    assert server_agent.conn.num_resyncs == 1
+
+
+def test_resync_request_is_parsed():
+    assert server_agent_serial._is_resync_request('{"function":"resync_gameboard"}')
+    assert server_agent_serial._is_resync_request(json.dumps({'function': 'resync_gameboard'}))
+    assert not server_agent_serial._is_resync_request('True')
+    assert not server_agent_serial._is_resync_request('12.5')
+    assert not server_agent_serial._is_resync_request(json.dumps({'function': 'skip_turn', 'param_dict': dict()}))
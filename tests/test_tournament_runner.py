@@ -0,0 +1,54 @@
+import json
+
+from monopoly_simulator import gameplay
+from monopoly_simulator import test_harness
+from monopoly_simulator import tournament_runner
+
+seeds = [576949, 14353]
+
+
+def _play(tmp_path, name, game_jobs, num_workers):
+    # (index, winner, number of turns) of every game played without novelty, sorted by index
+    results_file = str(tmp_path / (name + '_results.jsonl'))
+    tournament_runner.run_game_jobs(game_jobs, num_workers, results_file=results_file)
+    with open(results_file, 'r') as fileread:
+        game_records = [json.loads(line) for line in fileread]
+    return sorted((r['index'], r['winner'], r['num_turns']) for r in game_records if not r['novelty'])
+
+
+def _jobs(tmp_path, name):
+    return [tournament_runner.create_game_job(i, seeds[i], str(tmp_path / (name + '_' + str(i) + '.log')))
+            for i in range(len(seeds))]
+
+
+def test_novelty_in_parent_does_not_leak_into_workers(tmp_path, clean_action_choices):
+    clean = _play(tmp_path, 'clean', _jobs(tmp_path, 'clean'), 2)
+    # a serial novelty game (as in test_harness.play_tournament_with_novelty_1) leaves action_choices patched
+    gameplay.play_game_in_tournament(seeds[0], False, test_harness.improvePropertyRed_novelty)
+    assert clean_action_choices.improve_property is not tournament_runner._action_choices_defaults['improve_property']
+    assert _play(tmp_path, 'workers', _jobs(tmp_path, 'workers'), 2) == clean
+    assert _play(tmp_path, 'serial', _jobs(tmp_path, 'serial'), 1) == clean
+
+
+def test_novelty_game_does_not_leak_into_next_game(tmp_path):
+    clean = _play(tmp_path, 'clean', _jobs(tmp_path, 'clean'), 1)
+    game_jobs = _jobs(tmp_path, 'mixed')
+    game_jobs.insert(0, tournament_runner.create_game_job(len(seeds), seeds[1], str(tmp_path / 'novelty.log'), False,
+                                                          test_harness.improvePropertyRed_novelty))
+    assert _play(tmp_path, 'mixed', game_jobs, 1) == clean
+
+
+def test_order_by_expected_length_keeps_pairs_together(tmp_path):
+    game_jobs = list()
+    for t in range(3):
+        game_jobs.append(tournament_runner.create_game_job(2 * t, 100 + t, 'game.log', pair=t))
+        game_jobs.append(tournament_runner.create_game_job(2 * t + 1, 100 + t, 'game.log', False,
+                                                           test_harness.improvePropertyRed_novelty, pair=t))
+    length_file = str(tmp_path / 'game_lengths.jsonl')
+    # the game with novelty of the first pair is the longest game, but the second pair is the longest pair
+    num_turns = [10, 90, 60, 50, 20, 30]
+    for i in range(len(game_jobs)):
+        tournament_runner._append_json_line(length_file, {'key': tournament_runner._game_length_key(game_jobs[i]),
+                                                          'num_turns': num_turns[i]})
+    ordered_jobs = tournament_runner.order_by_expected_length(game_jobs, length_file)
+    assert [game_job['index'] for game_job in ordered_jobs] == [2, 3, 0, 1, 4, 5]
@@ -0,0 +1,49 @@
+import random
+
+from monopoly_simulator import test_harness
+from monopoly_simulator import tournament_runner
+from monopoly_simulator import tournament_statistics
+
+
+def _winner(rng, win_rate):
+    return 'player_1' if rng.random() < win_rate else 'player_2'
+
+
+def test_threshold_test_keeps_false_stops_below_alpha():
+    # the runner evaluates the rule after every game; at a true win rate equal to the threshold, a plain 95% interval
+    # checked that often stops far more often than 5% of the time
+    stopping_rule = tournament_statistics.create_stopping_rule('player_1', margin=None, threshold=0.25, min_games=30)
+    num_stops = 0
+    for run in range(200):
+        rng = random.Random(run)
+        winners = list()
+        for i in range(240):
+            winners.append(_winner(rng, 0.25))
+            if tournament_statistics.evaluate_stopping_rule(stopping_rule, winners, list())['stop']:
+                num_stops += 1
+                break
+    assert num_stops / 200 <= 0.05
+
+
+def test_threshold_test_stops_on_a_clear_difference():
+    stopping_rule = tournament_statistics.create_stopping_rule('player_1', margin=None, threshold=0.25, min_games=30)
+    rng = random.Random(0)
+    winners = [_winner(rng, 0.6) for i in range(60)]
+    evaluation = tournament_statistics.evaluate_stopping_rule(stopping_rule, winners, list())
+    assert evaluation['stop']
+    assert evaluation['checkpoint'] in [30, 60]
+
+
+def test_win_rate_counts_games_in_handout_order():
+    game_jobs = [tournament_runner.create_game_job(i, i, 'game_' + str(i) + '.log') for i in range(4)]
+    game_jobs += [tournament_runner.create_game_job(i, i, 'game_' + str(i) + '.log', False,
+                                                    test_harness.improvePropertyRed_novelty) for i in range(4, 8)]
+    winners = ['player_1'] * 4 + ['player_2'] * 4
+    stopping_rule = tournament_statistics.create_stopping_rule('player_1', min_games=1)
+    # the games with novelty finished first: only the leading games of the order 0, 4, 1, 5, ... count
+    evaluation = tournament_runner._evaluate_stopping_rule(stopping_rule, game_jobs, winners, {0, 4, 5, 6, 7})
+    assert evaluation['num_games'] == 2
+    assert evaluation['num_games_without_novelty'] == 1
+    assert evaluation['num_games_with_novelty'] == 1
+    evaluation = tournament_runner._evaluate_stopping_rule(stopping_rule, game_jobs, winners, {0, 1, 2, 4})
+    assert evaluation['num_games'] == 3
@@ -0,0 +1,17 @@
+from monopoly_simulator import tournament_runner
+from monopoly_simulator import work_queue
+
+
+def test_queue_workers_record_game_lengths(tmp_path):
+    seeds = [576949, 14353]
+    game_jobs = [tournament_runner.create_game_job(i, seeds[i], str(tmp_path / ('game_' + str(i) + '.log')))
+                 for i in range(len(seeds))]
+    queue_file = str(tmp_path / 'tournament_queue.sqlite')
+    length_file = str(tmp_path / 'game_lengths.jsonl')
+    work_queue.create_work_queue(queue_file, game_jobs, length_file=length_file)
+    assert work_queue.run_queue_worker(queue_file) == 2
+    game_results, game_records = work_queue.read_queue_results(queue_file)
+    game_lengths = tournament_runner.read_game_lengths(length_file)
+    assert len(game_lengths) == 2
+    for game_record in game_records:
+        assert game_lengths[tournament_runner._game_length_key(game_jobs[game_record['index']])] == game_record['num_turns']